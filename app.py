@@ -11,7 +11,16 @@
 # █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ █ #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import (
+    Flask,
+    Request,
+    current_app,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    jsonify,
+)
 from blueprints import (
     hierarchy_bp,
     binary_relations_bp,
@@ -59,6 +68,22 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 # File upload configuration
 app.config["UPLOAD_FOLDER"] = "uploads"
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
+# Large cost matrices are streamed from CSV (*/large_result endpoints)
+app.config["LARGE_MATRIX_MAX_CONTENT_LENGTH"] = 2 * 1024 * 1024 * 1024
+app.config["LARGE_MATRIX_CHUNK_ROWS"] = 2048
+
+
+class LargeUploadRequest(Request):
+    """Lifts the upload size limit only for the large-matrix endpoints"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint and self.endpoint.endswith(".large_result"):
+            return current_app.config["LARGE_MATRIX_MAX_CONTENT_LENGTH"]
+        return super().max_content_length
+
+
+app.request_class = LargeUploadRequest
 ALLOWED_EXTENSIONS = {"xlsx", "xls", "csv"}
 
 db.init_app(app)
@@ -392,6 +417,14 @@ def profile():
     return render_template("profile.html", **context)
 
 
+def delete_hierarchy_trees(tree_ids):
+    """Видалення дерев ієрархії разом з їх вузлами"""
+    if not tree_ids:
+        return
+    HierarchyNode.query.filter(HierarchyNode.tree_id.in_(tree_ids)).delete()
+    HierarchyTree.query.filter(HierarchyTree.id.in_(tree_ids)).delete()
+
+
 @app.route("/delete_result/<int:result_id>", methods=["POST"])
 @login_required
 def delete_result(result_id):
@@ -399,16 +432,32 @@ def delete_result(result_id):
     if result:
         # Видалення пов'язаних записів
         if result.method_name == "Hierarchy":
+            # Дерева, прив'язані до задачі, видаляються разом з нею
+            tree_ids = [
+                tree.id
+                for tree in HierarchyTree.query.filter_by(task_id=result.method_id)
+            ]
+            delete_hierarchy_trees(tree_ids)
+            if tree_ids:
+                Result.query.filter(
+                    Result.method_name == "HierarchyTree",
+                    Result.method_id.in_(tree_ids),
+                ).delete()
             HierarchyCriteriaMatrix.query.filter_by(id=result.method_id).delete()
             HierarchyAlternativesMatrix.query.filter_by(id=result.method_id).delete()
             HierarchyCriteria.query.filter_by(id=result.method_id).delete()
             HierarchyAlternatives.query.filter_by(id=result.method_id).delete()
             HierarchyTask.query.filter_by(id=result.method_id).delete()
             GlobalPrioritiesPlot.query.filter_by(id=result.method_id).delete()
+            HierarchyPriorityOptions.query.filter_by(id=result.method_id).delete()
+        elif result.method_name == "HierarchyTree":
+            delete_hierarchy_trees([result.method_id])
         elif result.method_name == "Binary":
+            BinaryTransitivitySummary.query.filter_by(id=result.method_id).delete()
             BinaryTransitivity.query.filter_by(id=result.method_id).delete()
             BinaryTask.query.filter_by(id=result.method_id).delete()
             BinaryRanj.query.filter_by(id=result.method_id).delete()
+            BinaryMatrixPacked.query.filter_by(id=result.method_id).delete()
             BinaryMatrix.query.filter_by(binary_names_id=result.method_id).delete()
             BinaryNames.query.filter_by(id=result.method_id).delete()
         elif result.method_name == "Experts":
@@ -417,6 +466,7 @@ def delete_result(result_id):
                 experts_name_research_id=result.method_id
             ).delete()
             ExpertsCompetency.query.filter_by(id=result.method_id).delete()
+            ExpertsStream.query.filter_by(id=result.method_id).delete()
             ExpertsNameResearch.query.filter_by(id=result.method_id).delete()
         elif result.method_name == "Laplasa":
             LaplasaCostMatrix.query.filter_by(id=result.method_id).delete()
@@ -431,10 +481,15 @@ def delete_result(result_id):
             SavageAlternatives.query.filter_by(id=result.method_id).delete()
             SavageConditions.query.filter_by(id=result.method_id).delete()
         elif result.method_name == "Hurwitz":
+            HurwitzEnvelope.query.filter_by(id=result.method_id).delete()
             HurwitzCostMatrix.query.filter_by(id=result.method_id).delete()
             HurwitzAlternatives.query.filter_by(id=result.method_id).delete()
             HurwitzConditions.query.filter_by(id=result.method_id).delete()
 
+        DerivedResult.query.filter_by(
+            method_name=result.method_name, method_id=result.method_id
+        ).delete()
+
         # Видалення самого результату
         db.session.delete(result)
         db.session.commit()
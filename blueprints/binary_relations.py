@@ -18,10 +18,115 @@ from mymodules.binary_excel_export import BinaryExcelExporter
 from mymodules.file_upload import process_uploaded_file, process_binary_file
 
 import operator
+import numpy as np
+from itertools import islice
 from datetime import datetime
 
 binary_relations_bp = Blueprint("binary_relations", __name__, url_prefix="/binary")
 
+# Скільки порушень транзитивності показувати в таблиці результату
+VIOLATIONS_SHOWN = 200
+# ... і записувати в Excel
+VIOLATIONS_EXPORTED = 50000
+
+
+def save_matrix(record_id, matrix, commit=True):
+    """
+    Матриця відношень зберігається стисло, у BinaryMatrixPacked.
+    Пишеться напряму через сесію одним комітом: add_object_to_db
+    комітить кожен запис окремо.
+    """
+    if db.session.get(BinaryMatrix, record_id) is None:
+        db.session.add(BinaryMatrix(id=record_id, binary_names_id=record_id, matrix=[]))
+        db.session.flush()
+    packed = db.session.get(BinaryMatrixPacked, record_id)
+    if packed is None:
+        packed = BinaryMatrixPacked(id=record_id)
+        db.session.add(packed)
+    packed.size = len(matrix)
+    packed.data = pack_relation(matrix)
+    if commit:
+        db.session.commit()
+
+
+def write_packed_bytes(record_id, updates):
+    """
+    Перезапис окремих байтів упакованої матриці ({зміщення: значення} з
+    packed_bytes) у сесії, без коміту. PostgreSQL змінює байти на місці
+    (set_byte), не пересилаючи всю матрицю.
+    """
+    if db.engine.dialect.name == "postgresql":
+        data = BinaryMatrixPacked.data
+        for offset, value in updates.items():
+            data = db.func.set_byte(data, offset, value)
+        BinaryMatrixPacked.query.filter_by(id=record_id).update(
+            {"data": data}, synchronize_session=False
+        )
+    else:
+        packed = db.session.get(BinaryMatrixPacked, record_id)
+        data = bytearray(packed.data)
+        for offset, value in updates.items():
+            data[offset] = value
+        packed.data = bytes(data)
+
+
+def load_matrix(record_id):
+    """Матриця відношень як масив int8 (старі записи - з JSON) або None"""
+    packed = BinaryMatrixPacked.query.get(record_id)
+    if packed is not None:
+        return unpack_relation(packed.data, packed.size)
+    binary_matrix = BinaryMatrix.query.get(record_id)
+    if binary_matrix is None:
+        return None
+    return to_relation(binary_matrix.matrix)
+
+
+def set_summary(record_id, num, checkable, row_counts):
+    """
+    Підсумок перевірки на транзитивність у сесії (без коміту): лише
+    лічильники, трійки з порушенням відновлюються з матриці посторінково.
+    """
+    summary = db.session.get(BinaryTransitivitySummary, record_id)
+    if summary is None:
+        summary = BinaryTransitivitySummary(id=record_id)
+        db.session.add(summary)
+    summary.total = count_triples(num)
+    summary.checkable = int(checkable)
+    summary.violated = int(np.sum(row_counts))
+    summary.row_violations = [int(count) for count in row_counts]
+    return summary
+
+
+def build_ranking(sum_dict):
+    """Суми об'єктів -> (словник, упорядкований за спаданням, рядок ранжування)"""
+    sorted_dict = dict(
+        sorted(sum_dict.items(), key=operator.itemgetter(1), reverse=True)
+    )
+
+    ranj_str = ""
+    ctn = 0
+    flag_key = 0
+
+    # Ранжування
+    for key in sorted_dict.keys():
+        if ctn == 0:
+            ranj_str += key
+            ctn += 1
+        else:
+            if sorted_dict[flag_key] > sorted_dict[key]:
+                ranj_str += " > "
+            else:
+                ranj_str += " = "
+            ranj_str += key
+        flag_key = key
+    return sorted_dict, ranj_str
+
+
+def transitivity_conclusion(violated, checkable):
+    if violated >= 1:
+        return f"Перевірка на транзитивність показала, що у {violated} випадках з {checkable} можливих для перевірки транзитивність була порушена. Це означає, що експерт у своїх оцінках був непослідовним. "
+    return "Перевірка на транзитивність показала, що транзитивність жодного разу не була порушена. Це означає, що експерт у своїх оцінках був послідовним."
+
 
 @binary_relations_bp.route("/")
 def index():
@@ -215,38 +320,13 @@ def result(method_id=None):
     print(session["matr"])
     if session["matr"] == 0:
         matrix = process_matrix(request.form.getlist("matrix_binary"), num)
-        add_object_to_db(
-            db,
-            BinaryMatrix,
-            id=new_record_id,
-            binary_names_id=new_record_id,
-            matrix=matrix,
-        )
+        save_matrix(new_record_id, matrix)
     else:
-        matrix = BinaryMatrix.query.get(new_record_id).matrix
+        matrix = load_matrix(new_record_id)
 
     # створюємо словник для сум об'єктів
-    sum_dict = {obj: sum([int(x) for x in row]) for obj, row in zip(names, matrix)}
-    sorted_dict = dict(
-        sorted(sum_dict.items(), key=operator.itemgetter(1), reverse=True)
-    )
-
-    ranj_str = ""
-    ctn = 0
-    flag_key = 0
-
-    # Ранжування
-    for key in sorted_dict.keys():
-        if ctn == 0:
-            ranj_str += key
-            ctn += 1
-        else:
-            if sorted_dict[flag_key] > sorted_dict[key]:
-                ranj_str += " > "
-            else:
-                ranj_str += " = "
-            ranj_str += key
-        flag_key = key
+    sum_dict = dict(zip(names, matrix.sum(axis=1, dtype=int).tolist()))
+    sorted_dict, ranj_str = build_ranking(sum_dict)
 
     existing_record = BinaryRanj.query.get(new_record_id)
     if existing_record is None:
@@ -263,40 +343,31 @@ def result(method_id=None):
             ),
         )
 
-    # Перевірка на транизитивність
-    comb = []
-    cond_tranz = []
-    vidnosh = []
-    prim = []
-
-    for i in range(1, num - 1):
-        for j in range(i + 1, num):
-            for k in range(j + 1, num + 1):
-                comb.append([f"a{i}", f"a{j}", f"a{k}"])
-                res = check_tranz(
-                    matrix[i - 1][j - 1],
-                    matrix[j - 1][k - 1],
-                    matrix[i - 1][k - 1],
-                    i - 1,
-                    j - 1,
-                    k - 1,
-                )
-                cond_tranz.append(res[0])
-                vidnosh.append(res[1])
-                prim.append(res[2])
-
-    # Розпаковка вкладених списків комбінацій
-    for i in range(len(comb)):
-        comb[i] = ", ".join(comb[i])
+    # Перевірка на транзитивність: збережений підсумок читається з БД,
+    # повний перерахунок - лише для нового запису (або старого без підсумку).
+    # Рядки таблиці формуються лише для порушень, що показуються на сторінці
+    summary = BinaryTransitivitySummary.query.get(new_record_id)
+    if summary is not None:
+        checkable, row_counts = summary.checkable, summary.row_violations
+        violated = summary.violated
+    else:
+        checkable, row_counts = transitivity_counts(matrix)
+        violated = int(row_counts.sum())
+    rows = triple_rows(
+        matrix, violation_triples(matrix, row_counts, 0, VIOLATIONS_SHOWN)
+    )
+    comb = [row[0] for row in rows]
+    cond_tranz = [row[1] for row in rows]
+    vidnosh = [row[2] for row in rows]
+    prim = [row[3] for row in rows]
 
     # Висновок
-    if prim.count("-") >= 1:
-        visnovok = f'Перевірка на транзитивність показала, що у {prim.count("-")} випадках з {prim.count("-") + prim.count("+")} можливих для перевірки транзитивність була порушена. Це означає, що експерт у своїх оцінках був непослідовним. '
-    else:
-        visnovok = "Перевірка на транзитивність показала, що транзитивність жодного разу не була порушена. Це означає, що експерт у своїх оцінках був послідовним."
+    visnovok = transitivity_conclusion(violated, checkable)
 
     # gpt_response = generate_gpt_response_binary(binary_task, names, ranj_str) if binary_task else None
     if existing_record is None:
+        # Зберігаються лише лічильники порушень; трійки й повна таблиця
+        # відновлюються з матриці (transitivity_page)
         add_object_to_db(
             db,
             BinaryTransitivity,
@@ -304,13 +375,15 @@ def result(method_id=None):
             binary_names_id=new_record_id,
             binary_matrix_id=new_record_id,
             binary_ranj_id=new_record_id,
-            comb=comb,
-            condition_transitivity=cond_tranz,
-            ratio=vidnosh,
-            note=prim,
+            comb=[],
+            condition_transitivity=[],
+            ratio=[],
+            note=[],
             binary_conclusion=visnovok,
             task_id=new_record_id if binary_task else None,
         )
+        set_summary(new_record_id, num, checkable, row_counts)
+        db.session.commit()
 
         if current_user.is_authenticated:
             add_object_to_db(
@@ -320,6 +393,10 @@ def result(method_id=None):
                 method_id=new_record_id,
                 user_id=current_user.get_id(),
             )
+    elif summary is None and BinaryTransitivity.query.get(new_record_id):
+        # Старий запис без підсумку: зберігаємо, щоб не рахувати знову
+        set_summary(new_record_id, num, checkable, row_counts)
+        db.session.commit()
 
     context = {
         "title": "Результат",
@@ -330,10 +407,14 @@ def result(method_id=None):
         "ranj_str": ranj_str,
         "comb": comb,
         "len_comb": len(comb),
+        "violations_total": violated,
+        "triples_total": count_triples(num),
+        "record_id": new_record_id,
         "cond_tranz": cond_tranz,
         "vidnosh": vidnosh,
         "prim": prim,
         "visnovok": visnovok,
+        "structure": structure_summary(matrix, names),
         "binary_plot": generate_plot(
             list(sum_dict.values()), list(sum_dict.keys()), False
         ),
@@ -383,18 +464,18 @@ def export_excel(method_id):
 
         # Prepare analysis data
         names = binary_names.names
-        matrix = binary_matrix.matrix
+        matrix = load_matrix(method_id)
         sorted_dict = binary_ranj.sorted_sum
         ranj_str = binary_ranj.ranj
 
         # Calculate sums for matrix
-        sum_dict = {obj: sum([int(x) for x in row]) for obj, row in zip(names, matrix)}
+        sum_dict = dict(zip(names, matrix.sum(axis=1, dtype=int).tolist()))
 
         analysis_data = {
             "method_id": method_id,
             "task_description": task_description,
             "names": names,
-            "matrix": matrix,
+            "matrix": matrix.tolist(),
             "sorted_dict": sum_dict,  # Use calculated sums
             "ranj_str": ranj_str,
             "comb": binary_transitivity.comb,
@@ -404,6 +485,27 @@ def export_excel(method_id):
             "visnovok": binary_transitivity.binary_conclusion,
         }
 
+        # Новий формат: у базі лише трійки з порушенням
+        summary = BinaryTransitivitySummary.query.get(method_id)
+        if summary is not None:
+            rows = triple_rows(
+                matrix,
+                violation_triples(
+                    matrix, summary.row_violations, 0, VIOLATIONS_EXPORTED
+                ),
+            )
+            analysis_data["comb"] = [row[0] for row in rows]
+            analysis_data["cond_tranz"] = [row[1] for row in rows]
+            analysis_data["vidnosh"] = [row[2] for row in rows]
+            analysis_data["prim"] = [row[3] for row in rows]
+            analysis_data["transitivity_summary"] = {
+                "total": summary.total,
+                "checkable": summary.checkable,
+                "violated": summary.violated,
+            }
+
+        analysis_data["structure"] = structure_summary(matrix, names)
+
         # Generate Excel
         exporter = BinaryExcelExporter()
         workbook = exporter.generate_binary_analysis_excel(analysis_data)
@@ -430,6 +532,145 @@ def export_excel(method_id):
         return Response(f"Export error: {str(e)}", status=500)
 
 
+@binary_relations_bp.route("/transitivity/<int:method_id>")
+@login_required
+def transitivity_page(method_id):
+    """
+    Таблиця перевірки на транзитивність посторінково (page, per_page).
+    Рядки відновлюються з матриці відношень лише для запитаної сторінки;
+    violations=1 - лише трійки з порушенням.
+    """
+    if not owns_result("Binary", method_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    matrix = load_matrix(method_id)
+    if matrix is None:
+        return {"success": False, "error": "Дані не знайдено"}, 404
+
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 100, type=int)
+    if page < 1 or not 1 <= per_page <= 1000:
+        return {"success": False, "error": "Невірні параметри сторінки"}, 400
+    start = (page - 1) * per_page
+
+    if request.args.get("violations"):
+        summary = BinaryTransitivitySummary.query.get(method_id)
+        if summary is not None:
+            row_counts = summary.row_violations
+        else:
+            row_counts = transitivity_counts(matrix)[1]
+        total = int(np.sum(row_counts))
+        triples = violation_triples(matrix, row_counts, start, per_page).tolist()
+    else:
+        total = count_triples(len(matrix))
+        triples = list(islice(iter_triples(len(matrix), start), per_page))
+
+    return {
+        "success": True,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": (total + per_page - 1) // per_page,
+        "rows": [
+            {
+                "number": start + n + 1,
+                "comb": comb,
+                "condition": condition,
+                "ratio": ratio,
+                "note": note,
+            }
+            for n, (comb, condition, ratio, note) in enumerate(
+                triple_rows(matrix, triples)
+            )
+        ],
+    }
+
+
+@binary_relations_bp.route("/edit/<int:method_id>", methods=["POST"])
+@login_required
+def edit_cell(method_id):
+    """
+    Зміна однієї оцінки (i, j, value) збереженого результату.
+
+    Змінитися можуть лише суми рядків i та j і n - 2 трійки, що містять
+    пару (i, j), тож повний перерахунок не потрібен: переписуються лише
+    байти матриці з цими клітинками, ранжування та лічильники перевірки
+    на транзитивність - усе одним комітом.
+    """
+    if not owns_result("Binary", method_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    binary_names = BinaryNames.query.get(method_id)
+    binary_ranj = BinaryRanj.query.get(method_id)
+    matrix = load_matrix(method_id)
+    if binary_names is None or binary_ranj is None or matrix is None:
+        return {"success": False, "error": "Дані не знайдено"}, 404
+    names = binary_names.names
+    num = len(names)
+
+    payload = request.get_json(silent=True) or request.form
+    try:
+        i, j, value = (int(payload.get(key)) for key in ("i", "j", "value"))
+    except (TypeError, ValueError):
+        return {"success": False, "error": "Невірні параметри"}, 400
+    if not (0 <= i < num and 0 <= j < num) or i == j or value not in (-1, 0, 1):
+        return {"success": False, "error": "Невірні параметри"}, 400
+
+    old = int(matrix[i, j])
+    if old == value:
+        return {"success": True, "changed": False}
+
+    summary = BinaryTransitivitySummary.query.get(method_id)
+    if summary is not None:
+        checkable, row_counts = summary.checkable, summary.row_violations
+    else:
+        # Старий запис без підсумку - один повний перерахунок
+        checkable, row_counts = transitivity_counts(matrix)
+
+    checkable, row_counts, added, removed = update_transitivity(
+        matrix, i, j, value, checkable, row_counts
+    )
+    violated = int(row_counts.sum())
+
+    sum_dict = dict(binary_ranj.sorted_sum)
+    sum_dict[names[i]] += value - old
+    sum_dict[names[j]] -= value - old
+    sorted_dict, ranj_str = build_ranking(sum_dict)
+
+    try:
+        if BinaryMatrixPacked.query.get(method_id) is not None:
+            write_packed_bytes(method_id, packed_bytes(matrix, [(i, j), (j, i)]))
+        else:
+            # Старий запис з JSON-матрицею: перше редагування пакує її
+            save_matrix(method_id, matrix, commit=False)
+        binary_ranj.sorted_sum = sorted_dict
+        binary_ranj.ranj = ranj_str
+        binary_ranj.plot_data = generate_plot(
+            list(sum_dict.values()), list(sum_dict.keys()), False
+        )
+        binary_transitivity = BinaryTransitivity.query.get(method_id)
+        if binary_transitivity is not None:
+            binary_transitivity.binary_conclusion = transitivity_conclusion(
+                violated, checkable
+            )
+            set_summary(method_id, num, checkable, row_counts)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return {"success": False, "error": f"Помилка збереження: {e}"}, 500
+
+    return {
+        "success": True,
+        "changed": True,
+        "sums": {names[i]: sum_dict[names[i]], names[j]: sum_dict[names[j]]},
+        "ranj": ranj_str,
+        "checkable": checkable,
+        "violated": violated,
+        "added": added.tolist(),
+        "removed": removed.tolist(),
+    }
+
+
 @binary_relations_bp.route("/upload_matrix", methods=["POST"])
 @login_required
 def upload_matrix():
@@ -452,7 +693,7 @@ def upload_matrix():
 
         # Process the uploaded file for binary relations analysis
         result = process_binary_file(file, num_objects)
-        print(f"Binary upload result: {result}")
+        print(f"Binary upload result: success={result['success']}")
 
         if result["success"]:
             response_data = {
@@ -460,7 +701,6 @@ def upload_matrix():
                 "names": result["names"],
                 "matrix": result["matrix"],
             }
-            print(f"Returning response: {response_data}")
             return response_data
         else:
             return {"success": False, "error": result["error"]}, 400
@@ -474,7 +714,6 @@ def upload_matrix():
 def result_from_file():
     """Process binary relations analysis from uploaded file data and redirect to result page"""
     try:
-        print(f"result_from_file called with form data: {request.form}")
 
         # Get data from form
         file_data = {
@@ -482,8 +721,6 @@ def result_from_file():
             "matrix": request.form.get("uploaded_matrix"),
         }
 
-        print(f"Extracted file_data: {file_data}")
-
         # Get task description from form
         binary_task = request.form.get("binary_task")
         print(f"Binary task: {binary_task}")
@@ -502,7 +739,7 @@ def result_from_file():
             names = json.loads(file_data["names"])
             matrix = json.loads(file_data["matrix"])
             print(f"Parsed names: {names}")
-            print(f"Parsed matrix: {matrix}")
+            print(f"Parsed matrix: {len(matrix)} x {len(matrix)}")
         except json.JSONDecodeError as e:
             print(f"JSON decode error: {e}")
             flash("Error parsing uploaded data", "error")
@@ -513,13 +750,7 @@ def result_from_file():
         new_record_id = add_object_to_db(db, BinaryNames, names=names)
         print(f"Created BinaryNames with ID: {new_record_id}")
 
-        add_object_to_db(
-            db,
-            BinaryMatrix,
-            id=new_record_id,
-            binary_names_id=new_record_id,
-            matrix=matrix,
-        )
+        save_matrix(new_record_id, to_relation(matrix))
         print(f"Created BinaryMatrix with ID: {new_record_id}")
 
         # Create binary task if provided
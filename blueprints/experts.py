@@ -15,7 +15,8 @@ from mymodules.methods import *
 from models import *
 from mymodules.experts_func import *
 from mymodules.experts_excel_export import ExpertsExcelExporter
-from mymodules.file_upload import process_experts_file
+from mymodules.file_upload import process_experts_file, process_experts_stream
+from mymodules.experts_engine import ExpertsAccumulator
 from docxtpl import DocxTemplate
 from datetime import datetime
 
@@ -35,6 +36,7 @@ def index():
     context = {
         "title": "Експертні Оцінки",
         "name": current_user.get_name() if current_user.is_authenticated else None,
+        "name_arguments": name_arguments,
     }
 
     file_expert = request.args.get("file_expert", False)
@@ -410,6 +412,10 @@ def experts_result(method_id=None):
             flash("Please log in to access this result", "error")
             return redirect(url_for("experts.index"))
 
+        # Дослідження, завантажене потоком, має лише поточну статистику
+        if ExpertsStream.query.get(new_record_id) is not None:
+            return redirect(url_for("experts.stream_result", method_id=new_record_id))
+
         # Безопасно получаем количество экспертов
         try:
             competency_record = ExpertsCompetency.query.get(new_record_id)
@@ -468,10 +474,47 @@ def experts_result(method_id=None):
         k_a = [0.0] * num_experts
         table_competency = [["0.0"] * 5 for _ in range(num_experts)]
 
-    m_i = make_m_i(k_k, experts_data_table, num_experts, len(name_research))
-    r_i = make_r_i(m_i)
-    l_value = make_lambda(len(name_research), r_i)
-    rank_str = rank_results(r_i, m_i, name_research)
+    # Повторний перегляд: беремо вже обчислений результат
+    derived = None
+    if request.method != "POST":
+        derived = load_derived_result("Experts", new_record_id)
+
+    if derived is not None:
+        m_i = derived["m_i"]
+        r_i = derived["r_i"]
+        l_value = derived["l_value"]
+        rank_str = derived["rank_str"]
+        agreement = derived["concordance"]
+        aggregation = derived["aggregation"]
+    else:
+        analysis = analyze_experts(k_k, experts_data_table)
+        m_i = analysis["m_i"]
+        r_i = analysis["r_i"]
+        l_value = analysis["l_value"]
+        agreement = analysis["concordance"]
+        aggregation = aggregation_rows(analysis["aggregation"], name_research)
+        rank_str = rank_results(r_i, m_i, name_research)
+        save_derived_result(
+            db,
+            "Experts",
+            new_record_id,
+            {
+                "experts_task": experts_task,
+                "table_competency": table_competency,
+                "k_k": k_k,
+                "k_a": k_a,
+                "name_arguments": name_arguments,
+                "name_research": name_research,
+                "experts_data_table": experts_data_table,
+                "m_i": m_i,
+                "r_i": r_i,
+                "l_value": l_value,
+                "l_value_sum": round(sum(l_value)) if l_value else 0,
+                "rank_str": rank_str,
+                "concordance": agreement,
+                "aggregation": aggregation,
+            },
+        )
 
     existing_record = ExpertsData.query.get(new_record_id)
     if existing_record is None:
@@ -520,6 +563,8 @@ def experts_result(method_id=None):
         "l_value_sum": round(sum(l_value)) if l_value else 0,
         "method_id": method_id,
         "rank_str": rank_str,
+        "concordance": agreement,
+        "aggregation": aggregation,
         "experts_task": experts_task,
         "experts_plot": experts_plot,
         # 'gpt_response': gpt_response,
@@ -529,6 +574,26 @@ def experts_result(method_id=None):
     return render_template("Experts/result.html", **context)
 
 
+def experts_excel_response(method_id, analysis_data):
+    """Excel-файл з даними аналізу"""
+    exporter = ExpertsExcelExporter()
+    exporter.generate_experts_analysis_excel(analysis_data)
+    excel_bytes = exporter.save_to_bytes()
+
+    filename = (
+        f"Experts_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    )
+
+    return Response(
+        excel_bytes,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(len(excel_bytes)),
+        },
+    )
+
+
 @experts_bp.route("/export/excel/<int:method_id>")
 def export_excel(method_id):
     """Export experts analysis results to Excel"""
@@ -552,6 +617,16 @@ def export_excel(method_id):
         )
 
     try:
+        derived = load_derived_result("Experts", method_id)
+        if derived is not None:
+            # Результат вже обчислено на сторінці результату
+            analysis_data = dict(
+                derived,
+                method_id=method_id,
+                experts_task=derived["experts_task"] or "Experts Analysis",
+            )
+            return experts_excel_response(method_id, analysis_data)
+
         # Get data from database
         experts_data = ExpertsData.query.get(method_id)
         if not experts_data:
@@ -587,10 +662,9 @@ def export_excel(method_id):
         print(f"Debug - l_value_sum: {sum(l_value) if l_value else 0}")
 
         # Recalculate values to ensure consistency
+        agreement = None
+        aggregation = None
         try:
-            # Import the calculation functions
-            from mymodules.experts_func import make_m_i, make_r_i, make_lambda
-
             # Get competency data
             k_k = experts_competency.k_k or []
             experts_data_table = experts_data.experts_data_table or []
@@ -598,9 +672,12 @@ def export_excel(method_id):
 
             # Recalculate values
             if k_k and experts_data_table and num_experts > 0:
-                m_i = make_m_i(k_k, experts_data_table, num_experts, len(name_research))
-                r_i = make_r_i(m_i)
-                l_value = make_lambda(len(name_research), r_i)
+                analysis = analyze_experts(k_k, experts_data_table)
+                m_i = analysis["m_i"]
+                r_i = analysis["r_i"]
+                l_value = analysis["l_value"]
+                agreement = analysis["concordance"]
+                aggregation = aggregation_rows(analysis["aggregation"], name_research)
                 print(f"Debug - Recalculated m_i: {m_i}")
                 print(f"Debug - Recalculated r_i: {r_i}")
                 print(f"Debug - Recalculated l_value: {l_value}")
@@ -636,29 +713,158 @@ def export_excel(method_id):
             "l_value": l_value,
             "l_value_sum": l_value_sum,
             "rank_str": rank_str,
+            "concordance": agreement,
+            "aggregation": aggregation,
         }
 
-        # Generate Excel file
-        exporter = ExpertsExcelExporter()
-        workbook = exporter.generate_experts_analysis_excel(analysis_data)
-        excel_bytes = exporter.save_to_bytes()
+        return experts_excel_response(method_id, analysis_data)
 
-        # Create filename
-        filename = f"Experts_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    except Exception as e:
+        print(f"Excel export error: {e}")
+        return Response(f"Export failed: {str(e)}", status=500, mimetype="text/plain")
 
-        # Return Excel file
-        return Response(
-            excel_bytes,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Length": str(len(excel_bytes)),
-            },
+
+def stream_analysis(method_id, state):
+    """
+    Поля результату (як у DerivedResult) і повний аналіз дослідження,
+    завантаженого потоком, зі збереженого стану ExpertsAccumulator
+    """
+    name_research = ExpertsNameResearch.query.get(method_id).names
+    experts_task_record = ExpertsTask.query.get(method_id)
+    experts_task = experts_task_record.task if experts_task_record else None
+
+    analysis = ExpertsAccumulator.from_state(state).result()
+    m_i = analysis["m_i"].tolist()
+    r_i = plain_ranks(analysis["r_i"])
+    l_value = analysis["lambda_values"].tolist()
+    rank_str = rank_results(r_i, m_i, name_research)
+    agreement = {
+        "W": analysis["W"],
+        "chi2": analysis["chi2"],
+        "df": analysis["df"],
+        "p_value": analysis["p_value"],
+        "significant": bool(analysis["significant"]),
+    }
+    aggregation = aggregation_rows(
+        {
+            "borda": {
+                "scores": analysis["borda"]["scores"].tolist(),
+                "order": analysis["borda"]["order"].tolist(),
+            }
+        },
+        name_research,
+    )
+
+    # Для експорту в Excel: таблиць по експертах у такому дослідженні немає
+    data = {
+        "experts_task": experts_task,
+        "table_competency": [],
+        "k_k": [],
+        "k_a": [],
+        "name_arguments": name_arguments,
+        "name_research": name_research,
+        "experts_data_table": [],
+        "m_i": m_i,
+        "r_i": r_i,
+        "l_value": l_value,
+        "l_value_sum": round(sum(l_value)) if l_value else 0,
+        "rank_str": rank_str,
+        "concordance": agreement,
+        "aggregation": aggregation,
+    }
+    return data, analysis
+
+
+@experts_bp.route("/stream_upload", methods=["POST"])
+@experts_bp.route("/stream_upload/<int:method_id>", methods=["POST"])
+@login_required
+def stream_upload(method_id=None):
+    """
+    Велика експертна панель з CSV: рядки експертів читаються по одному й
+    одразу згортаються в поточну статистику (ExpertsAccumulator), тож
+    пам'ять - O(кількість напрямків). З method_id - дописує нових
+    експертів до вже збереженого дослідження без перерахунку попередніх.
+    """
+    back = (
+        url_for("experts.stream_result", method_id=method_id)
+        if method_id
+        else url_for("experts.index")
+    )
+    file = request.files.get("experts_file")
+    if not file:
+        flash("Файл не завантажено", "error")
+        return redirect(back)
+
+    state = names = None
+    if method_id:
+        stream = ExpertsStream.query.get(method_id)
+        if stream is None or not owns_result("Experts", method_id):
+            flash("You don't have permission to access this result", "error")
+            return redirect(url_for("experts.index"))
+        state = stream.state
+        names = ExpertsNameResearch.query.get(method_id).names
+
+    result = process_experts_stream(file, len(name_arguments), state, names)
+    if not result["success"]:
+        flash(result["error"], "error")
+        return redirect(back)
+
+    if not method_id:
+        method_id = add_object_to_db(db, ExpertsNameResearch, names=result["names"])
+        experts_task = request.form.get("experts_task")
+        if experts_task:
+            add_object_to_db(db, ExpertsTask, id=method_id, task=experts_task)
+        add_object_to_db(
+            db,
+            Result,
+            method_name="Experts",
+            method_id=method_id,
+            user_id=current_user.get_id(),
         )
 
+    add_object_to_db(
+        db,
+        ExpertsStream,
+        id=method_id,
+        experts=result["state"]["count"],
+        state=result["state"],
+    )
+    # Похідний результат (експорт, повторні перегляди) оновлюється лише тут,
+    # сторінка результату нічого не записує
+    data, _ = stream_analysis(method_id, result["state"])
+    save_derived_result(db, "Experts", method_id, data)
+    return redirect(url_for("experts.stream_result", method_id=method_id))
+
+
+@experts_bp.route("/stream_result/<int:method_id>")
+@login_required
+def stream_result(method_id):
+    """Результат дослідження, завантаженого потоком"""
+    stream = ExpertsStream.query.get(method_id)
+    if stream is None or not owns_result("Experts", method_id):
+        flash("You don't have permission to access this result", "error")
+        return redirect(url_for("experts.index"))
+
+    data, analysis = stream_analysis(method_id, stream.state)
+
+    try:
+        experts_plot = generate_plot(data["m_i"], data["name_research"], False)
     except Exception as e:
-        print(f"Excel export error: {e}")
-        return Response(f"Export failed: {str(e)}", status=500, mimetype="text/plain")
+        print(f"Error generating plot: {str(e)}")
+        experts_plot = None
+
+    context = dict(
+        data,
+        title="Результат",
+        name=current_user.get_name(),
+        num_experts=0,
+        streamed=analysis["experts"],
+        score_mean=analysis["score_mean"].tolist(),
+        score_std=analysis["score_std"].tolist(),
+        method_id=method_id,
+        experts_plot=experts_plot,
+    )
+    return render_template("Experts/result.html", **context)
 
 
 @experts_bp.route("/upload_matrix", methods=["POST"])
@@ -786,14 +992,10 @@ def result_from_file():
         print(f"Created ExpertsCompetency with ID: {new_record_id}")
 
         # Calculate m_i, r_i, and lambda_value from evaluation matrix
-        from mymodules.experts_func import make_m_i, make_r_i, make_lambda
-
-        num_experts = len(evaluation_matrix)
-        num_research = len(alternatives_names)
-
-        m_i = make_m_i(k_k, evaluation_matrix, num_experts, num_research)
-        r_i = make_r_i(m_i)
-        l_value = make_lambda(num_research, r_i)
+        analysis = analyze_experts(k_k, evaluation_matrix)
+        m_i = analysis["m_i"]
+        r_i = analysis["r_i"]
+        l_value = analysis["l_value"]
 
         print(f"Calculated m_i: {m_i}")
         print(f"Calculated r_i: {r_i}")
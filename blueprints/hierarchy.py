@@ -16,12 +16,58 @@ from mymodules.methods import *
 from mymodules.gpt_response import *
 from mymodules.excel_export import HierarchyExcelExporter
 from mymodules.file_upload import process_hierarchy_file
+from mymodules.ahp_engine import (
+    GroupAggregator,
+    PriorityTree,
+    judgment_bounds,
+    simulate_priorities,
+)
 from datetime import datetime
+from fractions import Fraction
 import json
 
 hierarchy_bp = Blueprint("hierarchy", __name__, url_prefix="/hierarchy")
 
 
+def get_priority_options(record_id=None):
+    """
+    Priority mode for the AHP engine: "geometric" (default) or "exact"
+    (principal eigenvector by power iteration). A stored result keeps the
+    options it was computed with; otherwise they are taken from the request,
+    then the session, then AHP_PRIORITY_MODE / AHP_EIGEN_TOLERANCE config.
+    """
+    if record_id is not None:
+        stored = HierarchyPriorityOptions.query.get(record_id)
+        if stored:
+            return {"mode": stored.priority_mode, "tol": stored.tolerance}
+    mode = (
+        request.values.get("priority_mode")
+        or session.get("priority_mode")
+        or current_app.config.get("AHP_PRIORITY_MODE", "geometric")
+    )
+    if mode not in ("geometric", "exact"):
+        mode = "geometric"
+    try:
+        tol = float(
+            request.values.get("eigen_tol")
+            or current_app.config.get("AHP_EIGEN_TOLERANCE", 1e-10)
+        )
+    except (TypeError, ValueError):
+        tol = 1e-10
+    return {"mode": mode, "tol": tol}
+
+
+def save_priority_options(record_id, priority_options, criteria_iterations=None):
+    """Зберігає режим пріоритетів разом з результатом (без commit)"""
+    stored = HierarchyPriorityOptions.query.get(record_id)
+    if stored is None:
+        stored = HierarchyPriorityOptions(id=record_id)
+        db.session.add(stored)
+    stored.priority_mode = priority_options["mode"]
+    stored.tolerance = priority_options["tol"]
+    stored.criteria_iterations = criteria_iterations
+
+
 @hierarchy_bp.route("/")
 def index():
     context = {
@@ -387,43 +433,50 @@ def matrix_alt():
                     row.append("1")  # Базовое значение для недиагональных элементов
             matrix_krit.append(row)
     else:
+        # Неповні матриці: пропущені судження дозволені
+        incomplete = bool(request.form.get("allow_incomplete"))
+        session["allow_incomplete"] = incomplete
+
         # Створення списку з матриць по рівнях
         # Check for invalid values in criteria matrix from form
-        if any(val in ["", None, "undefined", "Undefined"] for val in matr_krit[:10]):
+        if not incomplete and any(
+            val in ["", None, "undefined", "Undefined"] for val in matr_krit[:10]
+        ):
             print(f"[ERROR] Invalid values found in criteria matrix")
             flash("Invalid criteria matrix data", "error")
             return redirect(url_for("hierarchy.index"))
 
-        matrix_krit = do_matrix(krit=1, matrix=matr_krit, criteria=num_criteria)
+        try:
+            matrix_krit = do_matrix(
+                krit=1, matrix=matr_krit, criteria=num_criteria, incomplete=incomplete
+            )
+        except ValueError as e:
+            flash(str(e), "error")
+            return redirect(url_for("hierarchy.matrix_krit"))
+
+    # Усі оцінки матриці критеріїв за один прохід
+    priority_options = get_priority_options()
+    session["priority_mode"] = priority_options["mode"]
+    evaluated = do_evaluate(krit=1, matr=matrix_krit, **priority_options)
 
     # Оцінки компонент власного вектора
-    components_eigenvector = do_comp_vector(
-        krit=1, criteria=num_criteria, matr=matrix_krit
-    )
+    components_eigenvector = evaluated["components_eigenvector"]
 
     # Нормалізовані оцінки вектора пріоритету
-    normalized_eigenvector = do_norm_vector(
-        krit=1, comp_vector=components_eigenvector, criteria=num_criteria
-    )
+    normalized_eigenvector = evaluated["normalized_eigenvector"]
 
     # Сума по стовпцям
-    sum_col = do_sum_col(krit=1, matr=matrix_krit, criteria=num_criteria)
+    sum_col = evaluated["sum_col"]
 
     # Добуток додатку по стовпцях і нормалізованої оцінки вектора пріоритету
-    prod_col = do_prod_col(
-        krit=1,
-        criteria=num_criteria,
-        sum_col=sum_col,
-        norm_vector=normalized_eigenvector,
-    )
+    prod_col = evaluated["prod_col"]
 
     # Разом (Lmax)
-    l_max = do_l_max(krit=1, prod_col=prod_col, criteria=num_criteria)
+    l_max = evaluated["l_max"]
 
     # Індекс узгодженості i Відношення узгодженості
-    index_consistency, relation_consistency = do_consistency(
-        krit=1, l_max=l_max, criteria=num_criteria
-    )
+    index_consistency = evaluated["index_consistency"]
+    relation_consistency = evaluated["relation_consistency"]
 
     # список для Нормалізованих оцінок вектора пріоритету (для висновку)
     lst_normalized_eigenvector = do_lst_norm_vector(
@@ -438,6 +491,9 @@ def matrix_alt():
         krit=1, lst_norm_vector=lst_normalized_eigenvector, criteria=num_criteria
     )
 
+    # Режим пріоритетів зберігається разом з матрицею критеріїв
+    save_priority_options(new_record_id, priority_options, evaluated["iterations"])
+
     # Проверяем, есть ли уже запись в HierarchyCriteriaMatrix с таким ID
     existing_matrix = HierarchyCriteriaMatrix.query.get(new_record_id)
     if existing_matrix:
@@ -491,6 +547,9 @@ def matrix_alt():
         "relation_consistency": relation_consistency,
         "lst_normalized_eigenvector": lst_normalized_eigenvector,
         "ranj": ranj,
+        "priority_mode": priority_options["mode"],
+        "allow_incomplete": session.get("allow_incomplete", False),
+        "eigen_iterations": {"criteria": evaluated["iterations"]},
         "task": session.get("hierarchy_task"),
         "name": current_user.get_name() if current_user.is_authenticated else None,
     }
@@ -639,27 +698,15 @@ def result(method_id=None, file_data=None):
             matrix_krit = do_matrix(
                 krit=1, matrix=criteria_matrix_flat, criteria=len(criteria_names)
             )
-            comp_vector_krit = do_comp_vector(
-                krit=1, criteria=len(criteria_names), matr=matrix_krit
-            )
-            norm_vector_krit = do_norm_vector(
-                krit=1, comp_vector=comp_vector_krit, criteria=len(criteria_names)
-            )
-            sum_col_krit = do_sum_col(
-                krit=1, matr=matrix_krit, criteria=len(criteria_names)
-            )
-            prod_col_krit = do_prod_col(
-                krit=1,
-                criteria=len(criteria_names),
-                sum_col=sum_col_krit,
-                norm_vector=norm_vector_krit,
-            )
-            l_max_krit = do_l_max(
-                krit=1, prod_col=prod_col_krit, criteria=len(criteria_names)
-            )
-            index_consistency_krit, relation_consistency_krit = do_consistency(
-                krit=1, l_max=l_max_krit, criteria=len(criteria_names)
-            )
+            priority_options = get_priority_options()
+            evaluated_krit = do_evaluate(krit=1, matr=matrix_krit, **priority_options)
+            comp_vector_krit = evaluated_krit["components_eigenvector"]
+            norm_vector_krit = evaluated_krit["normalized_eigenvector"]
+            sum_col_krit = evaluated_krit["sum_col"]
+            prod_col_krit = evaluated_krit["prod_col"]
+            l_max_krit = evaluated_krit["l_max"]
+            index_consistency_krit = evaluated_krit["index_consistency"]
+            relation_consistency_krit = evaluated_krit["relation_consistency"]
             lst_norm_vector_krit = do_lst_norm_vector(
                 krit=1,
                 name=criteria_names,
@@ -745,40 +792,15 @@ def result(method_id=None, file_data=None):
                 num_alt=len(alternatives_names),
             )
 
-            comp_vector_alt = do_comp_vector(
-                krit=0,
-                criteria=len(alternatives_matrices),
-                matr=matrix_alt,
-                num_alt=len(alternatives_names),
-            )
-            norm_vector_alt = do_norm_vector(
-                krit=0,
-                comp_vector=comp_vector_alt,
-                criteria=len(alternatives_matrices),
-                num_alt=len(alternatives_names),
-            )
-            sum_col_alt = do_sum_col(
-                krit=0,
-                matr=matrix_alt,
-                criteria=len(alternatives_matrices),
-                num_alt=len(alternatives_names),
-            )
-            prod_col_alt = do_prod_col(
-                krit=0,
-                criteria=len(alternatives_matrices),
-                num_alt=len(alternatives_names),
-                sum_col=sum_col_alt,
-                norm_vector=norm_vector_alt,
-            )
-            l_max_alt = do_l_max(
-                krit=0, prod_col=prod_col_alt, criteria=len(alternatives_matrices)
-            )
-            index_consistency_alt, relation_consistency_alt = do_consistency(
-                krit=0,
-                l_max=l_max_alt,
-                criteria=len(alternatives_matrices),
-                num_alt=len(alternatives_names),
-            )
+            # Усі матриці альтернатив обчислюються одним пакетом
+            evaluated_alt = do_evaluate(krit=0, matr=matrix_alt, **priority_options)
+            comp_vector_alt = evaluated_alt["components_eigenvector"]
+            norm_vector_alt = evaluated_alt["normalized_eigenvector"]
+            sum_col_alt = evaluated_alt["sum_col"]
+            prod_col_alt = evaluated_alt["prod_col"]
+            l_max_alt = evaluated_alt["l_max"]
+            index_consistency_alt = evaluated_alt["index_consistency"]
+            relation_consistency_alt = evaluated_alt["relation_consistency"]
             lst_norm_vector_alt = do_lst_norm_vector(
                 krit=0,
                 name=alternatives_names,
@@ -971,6 +993,9 @@ def result(method_id=None, file_data=None):
             alt_matrix_result.global_prior = global_prior
             alt_matrix_result.lst_normalized_eigenvector_global = norm_vectors_alt
             alt_matrix_result.ranj_global = ranj_global
+            save_priority_options(
+                method_id, priority_options, evaluated_krit["iterations"]
+            )
             db.session.commit()
 
             # Find result_id for export functionality
@@ -1031,6 +1056,11 @@ def result(method_id=None, file_data=None):
                 global_priorities_plot_id=plot_id,
                 result_id=result_id,
                 method_id=method_id,
+                priority_mode=priority_options["mode"],
+                eigen_iterations={
+                    "criteria": evaluated_krit["iterations"],
+                    "alternatives": evaluated_alt["iterations"],
+                },
             )
 
         except json.JSONDecodeError:
@@ -1183,11 +1213,22 @@ def result(method_id=None, file_data=None):
             )
             return redirect(url_for("hierarchy.index"))
 
+    # Кількість ітерацій степеневого методу: для критеріїв зберігається з
+    # результатом, для альтернатив відома лише для нових обчислень
+    eigen_iterations = {}
+    stored_options = HierarchyPriorityOptions.query.get(new_record_id)
+    if stored_options and stored_options.criteria_iterations is not None:
+        eigen_iterations["criteria"] = stored_options.criteria_iterations
+
     # Выполняем вычисления только если они не были выполнены ранее
     if not skip_calculations:
         # Перевіряємо розміри даних перед створенням матриці
+        incomplete = session.get("allow_incomplete", False)
         expected_matrix_size = num_criteria * num_alternatives * num_alternatives
-        if len(matr_alt) != expected_matrix_size:
+        upper_matrix_size = (
+            num_criteria * num_alternatives * (num_alternatives - 1) // 2
+        )
+        if len(matr_alt) not in (expected_matrix_size, upper_matrix_size):
             print(f"[ERROR] Неправильный размер матрицы альтернатив!")
             print(
                 f"[ERROR] Ожидается: {expected_matrix_size}, получено: {len(matr_alt)}"
@@ -1204,7 +1245,7 @@ def result(method_id=None, file_data=None):
         # Створення списку з матриць по рівнях
         try:
             # Check for invalid values in alternatives matrix from form
-            if any(
+            if not incomplete and any(
                 val in ["", None, "undefined", "Undefined"] for val in matr_alt[:10]
             ):
                 print(f"[ERROR] Invalid values found in alternatives matrix")
@@ -1212,53 +1253,49 @@ def result(method_id=None, file_data=None):
                 return redirect(url_for("hierarchy.index"))
 
             matrix_alt = do_matrix(
-                num_alt=num_alternatives, matrix=matr_alt, criteria=num_criteria
+                num_alt=num_alternatives,
+                matrix=matr_alt,
+                criteria=num_criteria,
+                incomplete=incomplete,
             )
         except (IndexError, ValueError) as e:
             print(f"[!] Error creating matrix_alt: {e}")
-            flash("Ошибка в данных матрицы альтернатив", "error")
+            flash(f"Ошибка в данных матрицы альтернатив: {e}", "error")
             return redirect(url_for("hierarchy.index"))
 
-        # Оцінки компонент власного вектора
-        components_eigenvector_alt = do_comp_vector(
-            num_alt=num_alternatives, criteria=num_criteria, matr=matrix_alt
-        )
-
-        # Нормалізовані оцінки вектора пріоритету
-        normalized_eigenvector_alt = do_norm_vector(
-            num_alt=num_alternatives,
-            comp_vector=components_eigenvector_alt,
-            criteria=num_criteria,
-        )
-        # Сума по стовпцям
+        # Усі матриці альтернатив обчислюються одним пакетом
         try:
-            sum_col_alt = do_sum_col(
-                num_alt=num_alternatives, matr=matrix_alt, criteria=num_criteria
+            evaluated_alt = do_evaluate(
+                krit=0, matr=matrix_alt, **get_priority_options(new_record_id)
             )
         except (IndexError, ValueError) as e:
-            print(f"[!] Error computing sum_col_alt: {e}")
+            print(f"[!] Error evaluating matrix_alt: {e}")
             print(f"[ERROR] Matrix structure issue: {len(matrix_alt)} criteria")
             flash(
                 "Ошибка при вычислении суммы по столбцам матрицы альтернатив", "error"
             )
             return redirect(url_for("hierarchy.index"))
 
+        eigen_iterations["alternatives"] = evaluated_alt["iterations"]
+
+        # Оцінки компонент власного вектора
+        components_eigenvector_alt = evaluated_alt["components_eigenvector"]
+
+        # Нормалізовані оцінки вектора пріоритету
+        normalized_eigenvector_alt = evaluated_alt["normalized_eigenvector"]
+
+        # Сума по стовпцям
+        sum_col_alt = evaluated_alt["sum_col"]
+
         # Добуток додатку по стовпцях і нормалізованої оцінки вектора пріоритету
-        prod_col_alt = do_prod_col(
-            krit=0,
-            num_alt=num_alternatives,
-            criteria=num_criteria,
-            sum_col=sum_col_alt,
-            norm_vector=normalized_eigenvector_alt,
-        )
+        prod_col_alt = evaluated_alt["prod_col"]
 
         # Разом (Lmax)
-        l_max_alt = do_l_max(krit=0, prod_col=prod_col_alt, criteria=num_criteria)
+        l_max_alt = evaluated_alt["l_max"]
 
         # Індекс узгодженості i Відношення узгодженості
-        index_consistency_alt, relation_consistency_alt = do_consistency(
-            num_alt=num_alternatives, l_max=l_max_alt, criteria=num_criteria
-        )
+        index_consistency_alt = evaluated_alt["index_consistency"]
+        relation_consistency_alt = evaluated_alt["relation_consistency"]
 
         # список для Нормалізованих оцінок вектора пріоритету (для висновку)
         lst_normalized_eigenvector_alt = do_lst_norm_vector(
@@ -1443,6 +1480,8 @@ def result(method_id=None, file_data=None):
         "lst_normalized_eigenvector_global": lst_normalized_eigenvector_global,
         "ranj_global": ranj_global,
         "global_prior_plot": generate_plot(global_prior, name_alternatives),
+        "priority_mode": get_priority_options(new_record_id)["mode"],
+        "eigen_iterations": eigen_iterations,
         "name": current_user.get_name() if current_user.is_authenticated else None,
         "method_id": method_id,
         "result_id": result_id,
@@ -1482,11 +1521,381 @@ def result(method_id=None, file_data=None):
             context["error"] = "Перегляньте свої судження у матриці для критеріїв"
             break
 
+    # Підказки: які судження змінити, щоб знизити відношення узгодженості
+    context["inconsistent_krit"] = (
+        do_inconsistency(krit=1, matr=matrix_krit, norm_vector=normalized_eigenvector)
+        if relation_consistency[0] > 10
+        else []
+    )
+    inconsistent_alt = do_inconsistency(
+        matr=matrix_alt, norm_vector=normalized_eigenvector_alt
+    )
+    context["inconsistent_alt"] = [
+        suggestions if relation_consistency_alt[c][0] > 10 else []
+        for c, suggestions in enumerate(inconsistent_alt)
+    ]
+
     session["matr_alt"] = 1
 
     return render_template("Hierarchy/result.html", **context)
 
 
+def _global_fields(name_alternatives, norm_vector, norm_vector_alt):
+    # Глобальні пріоритети та їх ранжування з уже збережених векторів
+    num_alternatives = len(name_alternatives)
+    global_prior = do_global_prior(
+        norm_vector=norm_vector,
+        norm_vector_alt=norm_vector_alt,
+        num_alt=num_alternatives,
+    )
+    lst_normalized_eigenvector_global = do_lst_norm_vector(
+        num_alt=num_alternatives,
+        name=name_alternatives,
+        norm_vector=global_prior,
+        g=1,
+    )
+    ranj_global = do_ranj(
+        krit=0, lst_norm_vector=lst_normalized_eigenvector_global, g=1
+    )
+    return {
+        "global_prior": global_prior,
+        "lst_normalized_eigenvector_global": lst_normalized_eigenvector_global,
+        "ranj_global": ranj_global,
+    }
+
+
+@hierarchy_bp.route("/judgment/<int:method_id>", methods=["POST"])
+@login_required
+def update_judgment_cell(method_id):
+    """
+    Change one pairwise judgment of a saved hierarchy.
+
+    Form fields: matrix ("criteria" or the criterion index of an
+    alternatives matrix), i, j and value (number or fraction like "1/3").
+    Only the changed matrix is re-evaluated, global priorities are
+    re-aggregated from the stored vectors and the changed columns of each
+    table (and the global priorities plot) are written in one transaction.
+    """
+    if not owns_result("Hierarchy", method_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    criteria_record = HierarchyCriteriaMatrix.query.get(method_id)
+    alternatives_record = HierarchyAlternativesMatrix.query.get(method_id)
+    if criteria_record is None:
+        return {"success": False, "error": "Дані не знайдено"}, 404
+
+    try:
+        target = request.values.get("matrix", "criteria")
+        i = int(request.values["i"])
+        j = int(request.values["j"])
+        value = float(Fraction(request.values["value"]))
+    except (KeyError, ValueError, ZeroDivisionError):
+        return {"success": False, "error": "Невірні дані судження"}, 400
+
+    name_criteria = HierarchyCriteria.query.get(method_id).names
+    name_alternatives = HierarchyAlternatives.query.get(method_id).names
+    num_criteria = len(name_criteria)
+
+    # Від'ємні індекси інакше мовчки потрапили б в інший блок matr_alt
+    if target == "criteria":
+        size = num_criteria
+    elif target.isdigit() and int(target) < num_criteria:
+        size = len(name_alternatives)
+    else:
+        return {"success": False, "error": "Невірна матриця"}, 400
+    if not (0 <= i < size and 0 <= j < size) or i == j:
+        return {"success": False, "error": "Невірна клітинка матриці"}, 400
+
+    priority_options = get_priority_options(method_id)
+    has_alternatives = bool(
+        alternatives_record and alternatives_record.normalized_eigenvector_alt
+    )
+
+    try:
+        if target == "criteria":
+            updated = do_update_judgment(
+                krit=1,
+                matr=criteria_record.comparison_matrix,
+                i=i,
+                j=j,
+                value=value,
+                **priority_options,
+            )
+            lst_normalized_eigenvector = do_lst_norm_vector(
+                krit=1,
+                name=name_criteria,
+                criteria=num_criteria,
+                norm_vector=updated["normalized_eigenvector"],
+            )
+            criteria_fields = {
+                "comparison_matrix": updated["comparison_matrix"],
+                "components_eigenvector": updated["components_eigenvector"],
+                "normalized_eigenvector": updated["normalized_eigenvector"],
+                "sum_col": updated["sum_col"],
+                "prod_col": updated["prod_col"],
+                "l_max": updated["l_max"],
+                "index_consistency": updated["index_consistency"],
+                "relation_consistency": updated["relation_consistency"],
+                "lst_normalized_eigenvector": lst_normalized_eigenvector,
+                "ranj": do_ranj(
+                    krit=1,
+                    lst_norm_vector=lst_normalized_eigenvector,
+                    criteria=num_criteria,
+                ),
+            }
+            HierarchyCriteriaMatrix.query.filter_by(id=method_id).update(
+                criteria_fields
+            )
+            save_priority_options(method_id, priority_options, updated["iterations"])
+            alternatives_fields = {}
+            if has_alternatives:
+                alternatives_fields = _global_fields(
+                    name_alternatives,
+                    updated["normalized_eigenvector"],
+                    alternatives_record.normalized_eigenvector_alt,
+                )
+        else:
+            if not has_alternatives:
+                return {"success": False, "error": "Матриці альтернатив немає"}, 404
+            c = int(target)
+            updated = do_update_judgment(
+                matr=alternatives_record.comparison_matrix,
+                index=c,
+                i=i,
+                j=j,
+                value=value,
+                **priority_options,
+            )
+            alt_vector = updated["normalized_eigenvector"]
+            lst_single = do_lst_norm_vector(
+                num_alt=len(name_alternatives),
+                name=name_alternatives,
+                criteria=1,
+                norm_vector=[alt_vector],
+            )
+            lst_row = [dict(zip(name_alternatives, alt_vector))] * num_criteria
+            lst_row[c] = lst_single[0][0]
+
+            def replaced(column, item):
+                values = list(column)
+                values[c] = item
+                return values
+
+            record = alternatives_record
+            alternatives_fields = {
+                "comparison_matrix": replaced(
+                    record.comparison_matrix, updated["comparison_matrix"]
+                ),
+                "components_eigenvector_alt": replaced(
+                    record.components_eigenvector_alt,
+                    updated["components_eigenvector"],
+                ),
+                "normalized_eigenvector_alt": replaced(
+                    record.normalized_eigenvector_alt, alt_vector
+                ),
+                "sum_col_alt": replaced(record.sum_col_alt, updated["sum_col"]),
+                "prod_col_alt": replaced(record.prod_col_alt, updated["prod_col"]),
+                "l_max_alt": replaced(record.l_max_alt, updated["l_max"]),
+                "index_consistency_alt": replaced(
+                    record.index_consistency_alt, updated["index_consistency"]
+                ),
+                "relation_consistency_alt": replaced(
+                    record.relation_consistency_alt, updated["relation_consistency"]
+                ),
+                "lst_normalized_eigenvector_alt": replaced(
+                    record.lst_normalized_eigenvector_alt, lst_row
+                ),
+                "ranj_alt": replaced(
+                    record.ranj_alt,
+                    do_ranj(krit=0, lst_norm_vector=lst_single, criteria=1)[0],
+                ),
+            }
+
+            # Сирі значення форми (matr_alt) теж тримаємо в актуальному стані
+            if record.matr_alt and len(record.matr_alt) == num_criteria * size * size:
+                matr_alt = list(record.matr_alt)
+                matr_alt[c * size * size + i * size + j] = str(value)
+                matr_alt[c * size * size + j * size + i] = str(1 / value)
+                alternatives_fields["matr_alt"] = matr_alt
+
+            alternatives_fields.update(
+                _global_fields(
+                    name_alternatives,
+                    criteria_record.normalized_eigenvector,
+                    alternatives_fields["normalized_eigenvector_alt"],
+                )
+            )
+
+        if alternatives_fields:
+            HierarchyAlternativesMatrix.query.filter_by(id=method_id).update(
+                alternatives_fields
+            )
+            plot_data = generate_plot(
+                alternatives_fields["global_prior"], name_alternatives
+            )
+            plot_id = alternatives_record.global_priorities_plot_id or method_id
+            plot = GlobalPrioritiesPlot.query.get(plot_id)
+            if plot is None:
+                db.session.add(GlobalPrioritiesPlot(id=plot_id, plot_data=plot_data))
+            else:
+                plot.plot_data = plot_data
+        db.session.commit()
+    except (IndexError, ValueError) as e:
+        db.session.rollback()
+        return {"success": False, "error": str(e)}, 400
+
+    return {
+        "success": True,
+        "matrix": target,
+        "comparison_matrix": updated["comparison_matrix"],
+        "normalized_eigenvector": updated["normalized_eigenvector"],
+        "l_max": updated["l_max"],
+        "index_consistency": updated["index_consistency"],
+        "relation_consistency": updated["relation_consistency"],
+        "iterations": updated["iterations"],
+        "global_prior": alternatives_fields.get("global_prior"),
+    }
+
+
+@hierarchy_bp.route("/sensitivity/<int:method_id>")
+@login_required
+def sensitivity(method_id):
+    """
+    Weight sensitivity of a saved hierarchy result. Every criterion weight
+    is swept over a grid of `steps` points (query parameter, 21 by default)
+    and the rank-reversal thresholds of the current best alternative are
+    returned per criterion.
+    """
+    if not owns_result("Hierarchy", method_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    criteria_record = HierarchyCriteriaMatrix.query.get(method_id)
+    alternatives_record = HierarchyAlternativesMatrix.query.get(method_id)
+    if (
+        criteria_record is None
+        or alternatives_record is None
+        or not alternatives_record.normalized_eigenvector_alt
+    ):
+        return {"success": False, "error": "Дані не знайдено"}, 404
+
+    steps = request.args.get("steps", 21, type=int)
+    if not 2 <= steps <= 1001:
+        return {"success": False, "error": "steps має бути від 2 до 1001"}, 400
+
+    name_criteria = HierarchyCriteria.query.get(method_id).names
+    name_alternatives = HierarchyAlternatives.query.get(method_id).names
+    analysis = do_sensitivity(
+        norm_vector=criteria_record.normalized_eigenvector,
+        norm_vector_alt=alternatives_record.normalized_eigenvector_alt,
+        num_alt=len(name_alternatives),
+        steps=steps,
+    )
+
+    def named(threshold):
+        if threshold is None:
+            return None
+        return {
+            "weight": threshold["weight"],
+            "rival": name_alternatives[threshold["rival"]],
+        }
+
+    return {
+        "success": True,
+        "criteria": name_criteria,
+        "alternatives": name_alternatives,
+        "weights": criteria_record.normalized_eigenvector,
+        "best": name_alternatives[analysis["best"]],
+        "grid": analysis["grid"],
+        "priorities": analysis["priorities"],
+        "winners": analysis["winners"],
+        "thresholds": [
+            {
+                "criterion": name_criteria[k],
+                "lower": named(analysis["lower"][k]),
+                "upper": named(analysis["upper"][k]),
+            }
+            for k in range(len(analysis["lower"]))
+        ],
+    }
+
+
+@hierarchy_bp.route("/simulation/<int:method_id>", methods=["GET", "POST"])
+@login_required
+def simulation(method_id):
+    """
+    Monte-Carlo stability of the global ranking of a saved hierarchy.
+
+    Query parameters: samples (10000, at most AHP_SIMULATION_MAX_SAMPLES),
+    seed (0) and spread (2.0) - every stored judgment a is treated as the
+    range [a / spread, a * spread].
+    A JSON body may instead give explicit ranges such as "3 to 5":
+    criteria_low/criteria_high and alternatives_low/alternatives_high.
+    Chunks run on AHP_SIMULATION_WORKERS processes (1 by default).
+    """
+    if not owns_result("Hierarchy", method_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    criteria_record = HierarchyCriteriaMatrix.query.get(method_id)
+    alternatives_record = HierarchyAlternativesMatrix.query.get(method_id)
+    if (
+        criteria_record is None
+        or alternatives_record is None
+        or not alternatives_record.comparison_matrix
+    ):
+        return {"success": False, "error": "Дані не знайдено"}, 404
+
+    samples = request.args.get("samples", 10000, type=int)
+    seed = request.args.get("seed", 0, type=int)
+    spread = request.args.get("spread", 2.0, type=float)
+    max_samples = current_app.config.get("AHP_SIMULATION_MAX_SAMPLES", 10000)
+    if not 1 <= samples <= max_samples:
+        return {
+            "success": False,
+            "error": f"samples має бути від 1 до {max_samples}",
+        }, 400
+
+    data = request.get_json(silent=True) or {}
+    try:
+        if "criteria_low" in data:
+            criteria_bounds = (data["criteria_low"], data["criteria_high"])
+            alternatives_bounds = (
+                data["alternatives_low"],
+                data["alternatives_high"],
+            )
+        else:
+            low, high = judgment_bounds(criteria_record.comparison_matrix, spread)
+            criteria_bounds = (low[0], high[0])
+            alternatives_bounds = judgment_bounds(
+                alternatives_record.comparison_matrix, spread
+            )
+        result = simulate_priorities(
+            criteria_bounds,
+            alternatives_bounds,
+            samples=samples,
+            seed=seed,
+            workers=current_app.config.get("AHP_SIMULATION_WORKERS", 1),
+            **get_priority_options(method_id),
+        )
+    except (KeyError, IndexError, ValueError) as e:
+        return {"success": False, "error": str(e)}, 400
+
+    name_alternatives = HierarchyAlternatives.query.get(method_id).names
+    return {
+        "success": True,
+        "samples": samples,
+        "seed": seed,
+        "alternatives": name_alternatives,
+        "mean": result["mean"].tolist(),
+        "std": result["std"].tolist(),
+        "percentiles": {
+            "p5": result["percentiles"][0].tolist(),
+            "p50": result["percentiles"][1].tolist(),
+            "p95": result["percentiles"][2].tolist(),
+        },
+        "probability_first": dict(zip(name_alternatives, result["first"].tolist())),
+    }
+
+
 @hierarchy_bp.route("/export/excel/<int:result_id>")
 def export_excel(result_id):
     """Export hierarchy analysis results to Excel file"""
@@ -1840,6 +2249,73 @@ def upload_matrix():
         return {"success": False, "error": f"Upload failed: {str(e)}"}, 500
 
 
+def _redirect_to_file_result(
+    criteria_names,
+    alternatives_names,
+    criteria_matrix,
+    alternatives_matrices,
+    hierarchy_task=None,
+):
+    """
+    Create the hierarchy records for matrices that did not come from the
+    wizard forms and redirect to the result page, which evaluates them.
+    Matrices are JSON strings in the process_hierarchy_file layout.
+    """
+    # Create records in database to get method_id
+    new_record_id = add_object_to_db(db, HierarchyCriteria, names=criteria_names)
+    current_app.logger.info(
+        f"[DEBUG] Created HierarchyCriteria with ID: {new_record_id}"
+    )
+    add_object_to_db(
+        db, HierarchyAlternatives, id=new_record_id, names=alternatives_names
+    )
+    current_app.logger.info(
+        f"[DEBUG] Created HierarchyAlternatives with ID: {new_record_id}"
+    )
+
+    # Create HierarchyTask with new_record_id as its ID
+    task_description = (
+        hierarchy_task
+        if hierarchy_task
+        else f"Hierarchy analysis with {len(criteria_names)} criteria and {len(alternatives_names)} alternatives"
+    )
+    add_object_to_db(
+        db,
+        HierarchyTask,
+        id=new_record_id,
+        task=task_description,
+    )
+    current_app.logger.info(
+        f"[DEBUG] Created HierarchyTask with ID: {new_record_id}, task: {task_description}"
+    )
+
+    # Create Result record for file uploads (if user is authenticated)
+    # Create Result record for all users (authenticated and unauthenticated)
+    user_id = current_user.get_id() if current_user.is_authenticated else None
+    add_object_to_db(
+        db,
+        Result,
+        method_name="Hierarchy",
+        method_id=new_record_id,
+        user_id=user_id,
+    )
+
+    # Store data in session for the result function
+    session["new_record_id"] = new_record_id
+    session["num_alternatives"] = len(alternatives_names)
+    session["num_criteria"] = len(criteria_names)
+    session["name_alternatives"] = alternatives_names
+    session["name_criteria"] = criteria_names
+
+    # Store file data in session for processing
+    session["file_criteria_matrix"] = criteria_matrix
+    session["file_alternatives_matrices"] = alternatives_matrices
+
+    # Redirect to the result page with method_id
+    current_app.logger.info(f"[DEBUG] Redirecting to /hierarchy/result/{new_record_id}")
+    return redirect(url_for("hierarchy.result", method_id=new_record_id))
+
+
 @hierarchy_bp.route("/result_from_file", methods=["POST"])
 @login_required
 def result_from_file():
@@ -1879,67 +2355,285 @@ def result_from_file():
         # Since we can't easily extract method_id from render_template response,
         # let's modify the approach: process the data and get the method_id, then redirect
 
-        # Parse the data to get method_id
-        criteria_names = json.loads(file_data["criteria_names"])
-        alternatives_names = json.loads(file_data["alternatives_names"])
-
-        # Create records in database to get method_id
-        new_record_id = add_object_to_db(db, HierarchyCriteria, names=criteria_names)
-        current_app.logger.info(
-            f"[DEBUG] Created HierarchyCriteria with ID: {new_record_id}"
-        )
-        add_object_to_db(
-            db, HierarchyAlternatives, id=new_record_id, names=alternatives_names
-        )
-        current_app.logger.info(
-            f"[DEBUG] Created HierarchyAlternatives with ID: {new_record_id}"
+        return _redirect_to_file_result(
+            json.loads(file_data["criteria_names"]),
+            json.loads(file_data["alternatives_names"]),
+            file_data["criteria_matrix"],
+            file_data["alternatives_matrices"],
+            hierarchy_task,
         )
 
-        # Create HierarchyTask with new_record_id as its ID
-        task_description = (
-            hierarchy_task
-            if hierarchy_task
-            else f"Hierarchy analysis with {len(criteria_names)} criteria and {len(alternatives_names)} alternatives"
-        )
-        add_object_to_db(
-            db,
-            HierarchyTask,
-            id=new_record_id,
-            task=task_description,
-        )
-        current_app.logger.info(
-            f"[DEBUG] Created HierarchyTask with ID: {new_record_id}, task: {task_description}"
+    except Exception as e:
+        current_app.logger.error(f"Error processing file data: {str(e)}")
+        flash(f"Error processing file data: {str(e)}", "error")
+        return redirect(url_for("hierarchy.index"))
+
+
+@hierarchy_bp.route("/group_result", methods=["POST"])
+@login_required
+def group_result():
+    """
+    Group AHP: one uploaded file per expert (same layout as a single
+    hierarchy file). Files are parsed and folded into a GroupAggregator one
+    at a time, then the group matrices (AIJ or AIP, form field
+    "aggregation") go through the usual result page.
+    """
+    files = request.files.getlist("matrix_files")
+    if not files:
+        flash("Файли експертів не завантажено", "error")
+        return redirect(url_for("hierarchy.index"))
+
+    try:
+        num_criteria = int(request.form.get("num_criteria"))
+        num_alternatives = int(request.form.get("num_alternatives"))
+    except (TypeError, ValueError):
+        flash("Невірна кількість критеріїв або альтернатив", "error")
+        return redirect(url_for("hierarchy.index"))
+
+    aggregation = request.form.get("aggregation", "aij")
+    aggregator = GroupAggregator(**get_priority_options())
+    criteria_names = alternatives_names = None
+
+    for file in files:
+        parsed = process_hierarchy_file(file, num_criteria, num_alternatives)
+        if not parsed["success"]:
+            flash(f"{file.filename}: {parsed['error']}", "error")
+            return redirect(url_for("hierarchy.index"))
+
+        alternatives_matrices = parsed["alternatives_matrices"]
+        if alternatives_matrices and isinstance(alternatives_matrices[0][0][0], list):
+            alternatives_matrices = [matrix[0] for matrix in alternatives_matrices]
+        try:
+            aggregator.add(parsed["criteria_matrix"], alternatives_matrices)
+        except ValueError as e:
+            flash(f"{file.filename}: {e}", "error")
+            return redirect(url_for("hierarchy.index"))
+
+        if criteria_names is None:
+            criteria_names = parsed["criteria_names"]
+            alternatives_names = parsed["alternatives_names"]
+
+    try:
+        criteria_matrix, alternatives_matrices = aggregator.matrices(aggregation)
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("hierarchy.index"))
+
+    current_app.logger.info(
+        f"[DEBUG] Group {aggregation.upper()} of {aggregator.count} experts"
+    )
+    return _redirect_to_file_result(
+        criteria_names,
+        alternatives_names,
+        json.dumps(criteria_matrix.tolist()),
+        json.dumps(alternatives_matrices.tolist()),
+        request.form.get("hierarchy_task"),
+    )
+
+
+def _load_tree(tree_id):
+    """
+    PriorityTree for a stored hierarchy with the memoized node results
+    restored, so only nodes whose columns were cleared get recomputed.
+    """
+    tree = HierarchyTree.query.get(tree_id)
+    if tree is None:
+        return None, None, []
+    rows = (
+        HierarchyNode.query.filter_by(tree_id=tree_id)
+        .order_by(HierarchyNode.position, HierarchyNode.id)
+        .all()
+    )
+    engine = PriorityTree(tree.alternatives, mode=tree.priority_mode)
+
+    # Батьківський вузол має бути доданий раніше за дочірні
+    pending = list(rows)
+    while pending:
+        added = [
+            row
+            for row in pending
+            if row.parent_id is None or row.parent_id in engine.nodes
+        ]
+        if not added:
+            raise ValueError("Hierarchy nodes do not form a tree")
+        for row in added:
+            engine.add_node(row.id, row.name, row.parent_id, row.comparison_matrix)
+        pending = [row for row in pending if row.id not in engine.nodes]
+
+    for row in rows:
+        if row.normalized_eigenvector is not None:
+            engine.set_cached(
+                row.id,
+                local={
+                    "norm_vector": row.normalized_eigenvector,
+                    "l_max": row.l_max,
+                    "index_consistency": row.index_consistency,
+                    "relation_consistency": row.relation_consistency,
+                    "iterations": 0,
+                },
+            )
+        if row.subtree_priorities is not None:
+            engine.set_cached(row.id, subtree=row.subtree_priorities)
+    return tree, engine, rows
+
+
+def _tree_response(tree, engine, rows):
+    # Рахуємо лише брудні вузли й зберігаємо їх мемоізовані результати
+    global_prior = engine.priorities()
+    weights = engine.global_weights()
+    nodes = []
+    for row in rows:
+        local = engine.local(row.id)
+        if row.normalized_eigenvector is None:
+            row.normalized_eigenvector = [
+                float(value) for value in local["norm_vector"]
+            ]
+            row.l_max = local["l_max"]
+            row.index_consistency = local["index_consistency"]
+            row.relation_consistency = local["relation_consistency"]
+        if row.subtree_priorities is None:
+            row.subtree_priorities = engine.priorities(row.id).tolist()
+        nodes.append(
+            {
+                "id": row.id,
+                "parent_id": row.parent_id,
+                "name": row.name,
+                "global_weight": weights.get(row.id),
+                "local_priorities": row.normalized_eigenvector,
+                "relation_consistency": row.relation_consistency,
+                "priorities": row.subtree_priorities,
+            }
         )
+    db.session.commit()
+
+    return {
+        "success": True,
+        "id": tree.id,
+        "alternatives": tree.alternatives,
+        "global_prior": global_prior.tolist(),
+        "nodes": nodes,
+    }
 
-        # Create Result record for file uploads (if user is authenticated)
-        # Create Result record for all users (authenticated and unauthenticated)
-        user_id = current_user.get_id() if current_user.is_authenticated else None
-        add_object_to_db(
-            db,
-            Result,
-            method_name="Hierarchy",
-            method_id=new_record_id,
-            user_id=user_id,
+
+@hierarchy_bp.route("/tree", methods=["POST"])
+@login_required
+def create_tree():
+    """
+    Create a multi-level hierarchy from JSON:
+    {"alternatives": [...], "priority_mode": "geometric", "task_id": id,
+     "nodes": [{"key", "name", "parent": key or null, "matrix"}, ...]}
+    Each node's matrix compares its children (or the alternatives for a
+    leaf); nodes may be listed in any order. The tree is saved as a
+    "HierarchyTree" result of the current user. An optional task_id links
+    it to the user's hierarchy task, and the tree is deleted with it.
+    """
+    data = request.get_json(silent=True) or {}
+    alternatives = data.get("alternatives")
+    nodes = data.get("nodes")
+    if not alternatives or not nodes or any("key" not in node for node in nodes):
+        return {"success": False, "error": "Потрібні альтернативи та вузли"}, 400
+
+    task_id = data.get("task_id")
+    if task_id is not None:
+        if not isinstance(task_id, int) or HierarchyTask.query.get(task_id) is None:
+            return {"success": False, "error": "Задачу не знайдено"}, 404
+        if not owns_result("Hierarchy", task_id):
+            return {"success": False, "error": "Немає доступу до задачі"}, 403
+
+    mode = data.get("priority_mode", "geometric")
+    if mode not in ("geometric", "exact"):
+        mode = "geometric"
+    tree = HierarchyTree(alternatives=alternatives, priority_mode=mode, task_id=task_id)
+    db.session.add(tree)
+    db.session.flush()
+    db.session.add(
+        Result(
+            method_name="HierarchyTree",
+            method_id=tree.id,
+            user_id=current_user.get_id(),
         )
+    )
 
-        # Store data in session for the result function
-        session["new_record_id"] = new_record_id
-        session["num_alternatives"] = len(alternatives_names)
-        session["num_criteria"] = len(criteria_names)
-        session["name_alternatives"] = alternatives_names
-        session["name_criteria"] = criteria_names
+    rows = {}
+    positions = {}
+    pending = list(nodes)
+    while pending:
+        added = [
+            node
+            for node in pending
+            if node.get("parent") is None or node.get("parent") in rows
+        ]
+        if not added:
+            db.session.rollback()
+            return {"success": False, "error": "Вузли не утворюють дерево"}, 400
+        for node in added:
+            parent = node.get("parent")
+            position = positions.get(parent, 0)
+            positions[parent] = position + 1
+            row = HierarchyNode(
+                tree_id=tree.id,
+                parent_id=rows[parent].id if parent is not None else None,
+                position=position,
+                name=node.get("name", str(node["key"])),
+                comparison_matrix=node.get("matrix"),
+            )
+            db.session.add(row)
+            db.session.flush()
+            rows[node["key"]] = row
+        pending = [node for node in pending if node["key"] not in rows]
+
+    try:
+        tree, engine, stored = _load_tree(tree.id)
+        return _tree_response(tree, engine, stored)
+    except (IndexError, ValueError) as e:
+        db.session.rollback()
+        return {"success": False, "error": str(e)}, 400
 
-        # Store file data in session for processing
-        session["file_criteria_matrix"] = file_data["criteria_matrix"]
-        session["file_alternatives_matrices"] = file_data["alternatives_matrices"]
 
-        # Redirect to the result page with method_id
-        current_app.logger.info(
-            f"[DEBUG] Redirecting to /hierarchy/result/{new_record_id}"
+@hierarchy_bp.route("/tree/<int:tree_id>")
+@login_required
+def tree_result(tree_id):
+    """Priorities of a stored multi-level hierarchy"""
+    if not owns_result("HierarchyTree", tree_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+    try:
+        tree, engine, rows = _load_tree(tree_id)
+        if tree is None:
+            return {"success": False, "error": "Дані не знайдено"}, 404
+        return _tree_response(tree, engine, rows)
+    except (IndexError, ValueError) as e:
+        return {"success": False, "error": str(e)}, 400
+
+
+@hierarchy_bp.route("/tree/<int:tree_id>/node/<int:node_id>", methods=["POST"])
+@login_required
+def update_tree_node(tree_id, node_id):
+    """
+    Replace one node's comparison matrix ({"matrix": [[...], ...]}).
+    Memoized results of the node and its ancestors are cleared, every
+    other branch keeps its stored priorities.
+    """
+    if not owns_result("HierarchyTree", tree_id):
+        return {"success": False, "error": "Немає доступу до результату"}, 403
+    row = HierarchyNode.query.filter_by(id=node_id, tree_id=tree_id).first()
+    matrix = (request.get_json(silent=True) or {}).get("matrix")
+    if row is None:
+        return {"success": False, "error": "Дані не знайдено"}, 404
+    if not matrix:
+        return {"success": False, "error": "Потрібна матриця"}, 400
+
+    row.comparison_matrix = matrix
+    row.normalized_eigenvector = None
+    ancestor = row
+    while ancestor is not None:
+        ancestor.subtree_priorities = None
+        ancestor = (
+            HierarchyNode.query.get(ancestor.parent_id) if ancestor.parent_id else None
         )
-        return redirect(url_for("hierarchy.result", method_id=new_record_id))
 
-    except Exception as e:
-        current_app.logger.error(f"Error processing file data: {str(e)}")
-        flash(f"Error processing file data: {str(e)}", "error")
-        return redirect(url_for("hierarchy.index"))
+    try:
+        tree, engine, rows = _load_tree(tree_id)
+        return _tree_response(tree, engine, rows)
+    except (IndexError, ValueError) as e:
+        db.session.rollback()
+        return {"success": False, "error": str(e)}, 400
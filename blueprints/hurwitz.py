@@ -14,20 +14,93 @@ from models import (
     HurwitzConditions,
     HurwitzAlternatives,
     HurwitzCostMatrix,
+    HurwitzEnvelope,
     HurwitzTask,
     db,
     Result,
 )
 from flask_login import current_user, login_required
-from mymodules.methods import add_object_to_db, generate_plot
+from mymodules.methods import (
+    add_object_to_db,
+    generate_plot,
+    large_matrix_result,
+    load_derived_result,
+    save_derived_result,
+)
 from mymodules.experts_func import make_table
 from mymodules.hurwitz_excel_export import HurwitzExcelExporter
 from mymodules.file_upload import process_hurwitz_file
+from mymodules.uncertainty import (
+    decision_criteria,
+    hurwitz_envelope,
+    prune_dominated,
+)
 from datetime import datetime
 
 hurwitz_bp = Blueprint("hurwitz", __name__, url_prefix="/hurwitz")
 
 
+def hurwitz_result(cost_matrix, matrix_type, alpha, name_alternatives):
+    """
+    Мінімуми, максимуми рядків, значення критерію Гурвіца,
+    індекс оптимальної альтернативи та висновок
+    """
+    criteria = decision_criteria(cost_matrix, matrix_type, alpha)
+    hurwitz_values = criteria["hurwitz"].tolist()
+    best_index = criteria["hurwitz_best"]
+    optimal_alternative = name_alternatives[best_index]
+    extreme = "максимальне" if matrix_type == "profit" else "мінімальне"
+    optimal_message = (
+        f"Оптимальна альтернатива {optimal_alternative}, "
+        f"має {extreme} значення критерію Гурвіца: "
+        f"{hurwitz_values[best_index]:.2f}."
+    )
+    return (
+        criteria["row_min"].tolist(),
+        criteria["row_max"].tolist(),
+        hurwitz_values,
+        best_index,
+        optimal_message,
+    )
+
+
+def envelope_record(method_id, matrix_type, min_values=None, max_values=None):
+    """
+    Кешований запис оптимальних альтернатив для всіх α ∈ [0, 1].
+    Мінімуми та максимуми рядків рахуються лише один раз на матрицю.
+    """
+    record = HurwitzEnvelope.query.get(method_id)
+    if record is not None and record.matrix_type == matrix_type:
+        return record
+
+    if record is not None:
+        min_values, max_values = record.min_values, record.max_values
+    elif min_values is None or max_values is None:
+        criteria = decision_criteria(
+            HurwitzCostMatrix.query.get(method_id).matrix, matrix_type
+        )
+        min_values = criteria["row_min"].tolist()
+        max_values = criteria["row_max"].tolist()
+
+    add_object_to_db(
+        db,
+        HurwitzEnvelope,
+        id=method_id,
+        matrix_type=matrix_type,
+        min_values=min_values,
+        max_values=max_values,
+        intervals=hurwitz_envelope(min_values, max_values, matrix_type),
+    )
+    return HurwitzEnvelope.query.get(method_id)
+
+
+def named_intervals(intervals, name_alternatives):
+    return [
+        dict(interval, alternative=name_alternatives[interval["best"]])
+        for interval in intervals
+    ]
+
+
 @hurwitz_bp.route("/")
 def index():
     context = {
@@ -281,41 +354,51 @@ def result(method_id=None):
         cost_matrix_raw = request.form.getlist("cost_matrix")
         cost_matrix = make_table(num_alt, num_conditions, cost_matrix_raw)
 
-    max_values = []
-    min_values = []
-    hurwitz_values = []
-    for row in cost_matrix:
-        row_int = list(map(float, row))  # Перетворюємо в float
-        min_val = min(row_int)
-        max_val = max(row_int)
-        if matrix_type == "profit":
-            # Для прибыли: H = α * max + (1 - α) * min (максимизируем)
-            H = alpha * max_val + (1 - alpha) * min_val
-        else:
-            # Для затрат: H = α * min + (1 - α) * max (минимизируем)
-            H = alpha * min_val + (1 - alpha) * max_val
-        hurwitz_values.append(H)
-        max_values.append(max_val)
-        min_values.append(min_val)
-
-    if matrix_type == "profit":
-        max_value = max(hurwitz_values)
-        max_index = hurwitz_values.index(max_value)
-        optimal_alternative = name_alternatives[max_index]
-        optimal_message = (
-            f"Оптимальна альтернатива {optimal_alternative}, "
-            f"має максимальне значення критерію Гурвіца: "
-            f"{max_value:.2f}."
+    # Домінованi альтернативи відкидаються до обчислення (за бажанням)
+    pruned = []
+    shown_matrix, shown_alternatives = cost_matrix, name_alternatives
+    if request.values.get("pareto_filter"):
+        shown_matrix, shown_alternatives, pruned = prune_dominated(
+            cost_matrix, name_alternatives, matrix_type
         )
+
+    # Повторний перегляд: беремо вже обчислений результат
+    derived = None
+    if flag != 0 and not request.values.get("pareto_filter"):
+        derived = load_derived_result("Hurwitz", new_record_id)
+
+    if derived is not None:
+        shown_matrix = derived["cost_matrix"]
+        min_values = derived["min_values"]
+        max_values = derived["max_values"]
+        hurwitz_values = derived["hurwitz_values"]
+        optimal_message = derived["optimal_message"]
     else:
-        min_value = min(hurwitz_values)
-        min_index = hurwitz_values.index(min_value)
-        optimal_alternative = name_alternatives[min_index]
-        optimal_message = (
-            f"Оптимальна альтернатива {optimal_alternative}, "
-            f"має мінімальне значення критерію Гурвіца: "
-            f"{min_value:.2f}."
-        )
+        (
+            min_values,
+            max_values,
+            hurwitz_values,
+            _,
+            optimal_message,
+        ) = hurwitz_result(shown_matrix, matrix_type, alpha, shown_alternatives)
+        if not pruned:
+            save_derived_result(
+                db,
+                "Hurwitz",
+                new_record_id,
+                {
+                    "hurwitz_task": hurwitz_task,
+                    "matrix_type": matrix_type,
+                    "name_alternatives": name_alternatives,
+                    "name_conditions": name_conditions,
+                    "cost_matrix": cost_matrix,
+                    "min_values": min_values,
+                    "max_values": max_values,
+                    "hurwitz_values": hurwitz_values,
+                    "alpha": alpha,
+                    "optimal_message": optimal_message,
+                },
+            )
 
     existing_record = HurwitzCostMatrix.query.get(new_record_id)
     if existing_record is None:
@@ -325,7 +408,11 @@ def result(method_id=None):
             id=new_record_id,
             hurwitz_alternatives_id=new_record_id,
             matrix=cost_matrix,
-            optimal_variants=hurwitz_values,
+            optimal_variants=(
+                hurwitz_result(cost_matrix, matrix_type, alpha, name_alternatives)[2]
+                if pruned
+                else hurwitz_values
+            ),
             alpha=alpha,
         )
         if current_user.is_authenticated:
@@ -337,15 +424,22 @@ def result(method_id=None):
                 user_id=current_user.get_id(),
             )
 
+    if pruned:
+        envelope = envelope_record(new_record_id, matrix_type)
+    else:
+        envelope = envelope_record(new_record_id, matrix_type, min_values, max_values)
+
     context = {
         "title": "Результат",
         "name": (current_user.get_name() if current_user.is_authenticated else None),
-        "name_alternatives": name_alternatives,
+        "name_alternatives": shown_alternatives,
         "name_conditions": name_conditions,
-        "cost_matrix": cost_matrix,
+        "cost_matrix": shown_matrix,
         "min_values": min_values,
         "max_values": max_values,
         "hurwitz_values": hurwitz_values,
+        "pruned": pruned,
+        "envelope": named_intervals(envelope.intervals, name_alternatives),
         "alpha": alpha,
         "id": new_record_id,
         "hurwitz_task": hurwitz_task,
@@ -353,7 +447,7 @@ def result(method_id=None):
         "optimal_message": optimal_message,
         "hurwitz_plot": generate_plot(
             hurwitz_values,
-            name_alternatives,
+            shown_alternatives,
             False,
             savage=False if matrix_type == "profit" else True,
         ),
@@ -364,6 +458,60 @@ def result(method_id=None):
     return render_template("Hurwitz/result.html", **context)
 
 
+@hurwitz_bp.route("/envelope/<int:method_id>")
+def envelope(method_id):
+    """
+    Оптимальна альтернатива критерію Гурвіца на кожному інтервалі α ∈ [0, 1]
+    та точки α, в яких вона змінюється.
+    """
+    if not current_user.is_authenticated:
+        return {"success": False, "error": "Потрібна авторизація"}, 401
+    if current_user.get_name() != "admin":
+        result_record = Result.query.filter_by(
+            method_name="Hurwitz",
+            method_id=method_id,
+            user_id=current_user.get_id(),
+        ).first()
+        if not result_record:
+            return {"success": False, "error": "Немає доступу до результату"}, 403
+
+    cost_record = HurwitzCostMatrix.query.get(method_id)
+    alternatives_record = HurwitzAlternatives.query.get(method_id)
+    if cost_record is None or alternatives_record is None:
+        return {"success": False, "error": "Дані не знайдено"}, 404
+
+    task_record = HurwitzTask.query.get(method_id)
+    matrix_type = (task_record.matrix_type if task_record else None) or "profit"
+    record = envelope_record(method_id, matrix_type)
+    intervals = named_intervals(record.intervals, alternatives_record.names)
+
+    return {
+        "success": True,
+        "matrix_type": matrix_type,
+        "alpha": cost_record.alpha,
+        "alternatives": alternatives_record.names,
+        "min_values": record.min_values,
+        "max_values": record.max_values,
+        "breakpoints": [interval["alpha_from"] for interval in intervals[1:]],
+        "intervals": intervals,
+    }
+
+
+def hurwitz_excel_response(method_id, analysis_data):
+    """Excel-файл з даними аналізу"""
+    exporter = HurwitzExcelExporter()
+    exporter.generate_hurwitz_analysis_excel(analysis_data)
+    excel_bytes = exporter.save_to_bytes()
+
+    return Response(
+        excel_bytes,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename=Hurwitz_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        },
+    )
+
+
 @hurwitz_bp.route("/export/excel/<int:method_id>")
 def export_excel(method_id):
     """Export hurwitz analysis to Excel"""
@@ -386,7 +534,20 @@ def export_excel(method_id):
             "Please log in to export this result", status=403, mimetype="text/plain"
         )
 
+    derived = None
+    if not request.args.get("pareto_filter"):
+        derived = load_derived_result("Hurwitz", method_id)
+
     try:
+        if derived is not None:
+            # Результат вже обчислено на сторінці результату
+            analysis_data = dict(
+                derived,
+                method_id=method_id,
+                hurwitz_task=derived["hurwitz_task"] or "Hurwitz Analysis",
+            )
+            return hurwitz_excel_response(method_id, analysis_data)
+
         # Get data from database
         hurwitz_conditions = HurwitzConditions.query.get(method_id)
         hurwitz_alternatives = HurwitzAlternatives.query.get(method_id)
@@ -415,33 +576,17 @@ def export_excel(method_id):
         hurwitz_values = []
 
         if cost_matrix and name_alternatives:
-            for row in cost_matrix:
-                row_int = list(map(float, row))  # Convert to float
-                min_val = min(row_int)
-                max_val = max(row_int)
-                if matrix_type == "profit":
-                    # Для прибыли: H = α * max + (1 - α) * min (максимизируем)
-                    H = alpha * max_val + (1 - alpha) * min_val
-                else:
-                    # Для затрат: H = α * min + (1 - α) * max (минимизируем)
-                    H = alpha * min_val + (1 - alpha) * max_val
-                hurwitz_values.append(H)
-                max_values.append(max_val)
-                min_values.append(min_val)
-
-            if hurwitz_values and name_alternatives:
-                if matrix_type == "profit":
-                    max_hurwitz = max(hurwitz_values)
-                    max_index = hurwitz_values.index(max_hurwitz)
-                    optimal_alternative = name_alternatives[max_index]
-                    optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має максимальне значення критерію Гурвіца: {max_hurwitz:.2f}."
-                else:
-                    min_hurwitz = min(hurwitz_values)
-                    min_index = hurwitz_values.index(min_hurwitz)
-                    optimal_alternative = name_alternatives[min_index]
-                    optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має мінімальне значення критерію Гурвіца: {min_hurwitz:.2f}."
-            else:
-                optimal_message = "Немає даних для аналізу"
+            if request.args.get("pareto_filter"):
+                cost_matrix, name_alternatives, _ = prune_dominated(
+                    cost_matrix, name_alternatives, matrix_type
+                )
+            (
+                min_values,
+                max_values,
+                hurwitz_values,
+                _,
+                optimal_message,
+            ) = hurwitz_result(cost_matrix, matrix_type, alpha, name_alternatives)
         else:
             optimal_message = "Немає даних для аналізу"
 
@@ -460,19 +605,7 @@ def export_excel(method_id):
             "optimal_message": optimal_message,
         }
 
-        # Generate Excel file
-        exporter = HurwitzExcelExporter()
-        workbook = exporter.generate_hurwitz_analysis_excel(analysis_data)
-        excel_bytes = exporter.save_to_bytes()
-
-        # Return Excel file
-        return Response(
-            excel_bytes,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=Hurwitz_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-            },
-        )
+        return hurwitz_excel_response(method_id, analysis_data)
 
     except Exception as e:
         print(f"Excel export error: {e}")
@@ -520,6 +653,13 @@ def upload_matrix():
         return {"success": False, "error": f"Upload failed: {str(e)}"}
 
 
+@hurwitz_bp.route("/large_result", methods=["POST"])
+@login_required
+def large_result():
+    """Критерій Гурвіца для великої матриці (CSV), що обробляється частинами"""
+    return large_matrix_result("hurwitz", with_alpha=True)
+
+
 @hurwitz_bp.route("/result_from_file", methods=["POST"])
 @login_required
 def result_from_file():
@@ -575,31 +715,10 @@ def result_from_file():
         print(f"Created HurwitzAlternatives with ID: {new_record_id}")
 
         # Calculate Hurwitz values
-        max_values = []
-        min_values = []
-        hurwitz_values = []
-        for row in cost_matrix:
-            row_int = list(map(float, row))  # Convert to float
-            min_val = min(row_int)
-            max_val = max(row_int)
-            if matrix_type == "profit":
-                # Для прибыли: H = α * max + (1 - α) * min (максимизируем)
-                H = alpha * max_val + (1 - alpha) * min_val
-            else:
-                # Для затрат: H = α * min + (1 - α) * max (минимизируем)
-                H = alpha * min_val + (1 - alpha) * max_val
-            hurwitz_values.append(H)
-            max_values.append(max_val)
-            min_values.append(min_val)
-
-        if matrix_type == "profit":
-            max_value = max(hurwitz_values)
-            max_index = hurwitz_values.index(max_value)
-            optimal_alternative = alternatives_names[max_index]
-        else:
-            min_value = min(hurwitz_values)
-            min_index = hurwitz_values.index(min_value)
-            optimal_alternative = alternatives_names[min_index]
+        min_values, max_values, hurwitz_values, best_index, _ = hurwitz_result(
+            cost_matrix, matrix_type, alpha, alternatives_names
+        )
+        optimal_alternative = alternatives_names[best_index]
 
         print(f"Calculated hurwitz_values: {hurwitz_values}")
         print(f"Optimal alternative: {optimal_alternative}")
@@ -18,15 +18,36 @@ from models import (
     Result,
 )
 from flask_login import current_user, login_required
-from mymodules.methods import add_object_to_db, generate_plot
+from mymodules.methods import (
+    add_object_to_db,
+    generate_plot,
+    large_matrix_result,
+    load_derived_result,
+    save_derived_result,
+)
 from mymodules.experts_func import make_table
 from mymodules.laplasa_excel_export import LaplasaExcelExporter
 from mymodules.file_upload import process_laplasa_file
+from mymodules.uncertainty import decision_criteria, prune_dominated
 from datetime import datetime
 
 kriteriy_laplasa_bp = Blueprint("kriteriy_laplasa", __name__, url_prefix="/laplasa")
 
 
+def laplace_result(cost_matrix, matrix_type, name_alternatives):
+    """Expected values (rounded to 2 digits) and the conclusion message"""
+    criteria = decision_criteria(cost_matrix, matrix_type)
+    optimal_variants = [round(value, 2) for value in criteria["laplace"].tolist()]
+    best_index = criteria["laplace_best"]
+    optimal_alternative = name_alternatives[best_index]
+    best_value = optimal_variants[best_index]
+    if matrix_type == "profit":
+        optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має максимальне значення очікуваної вигоди ('{best_value}')."
+    else:
+        optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має мінімальне значення очікуваних затрат ('{best_value}')."
+    return optimal_variants, optimal_message
+
+
 @kriteriy_laplasa_bp.route("/")
 def index():
     context = {
@@ -363,21 +384,9 @@ def result(method_id=None):
                     cost_matrix = [["0"] * num_conditions for _ in range(num_alt)]
 
                 # Вычисляем оптимальные варианты
-                optimal_variants = [
-                    round(sum(map(float, sublist)) / len(sublist), 2)
-                    for sublist in cost_matrix
-                ]
-
-                if matrix_type == "profit":
-                    max_value = max(optimal_variants)
-                    max_index = optimal_variants.index(max_value)
-                    optimal_alternative = name_alternatives[max_index]
-                    optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має максимальне значення очікуваної вигоди ('{max_value}')."
-                else:
-                    min_value = min(optimal_variants)
-                    min_index = optimal_variants.index(min_value)
-                    optimal_alternative = name_alternatives[min_index]
-                    optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має мінімальне значення очікуваних затрат ('{min_value}')."
+                optimal_variants, optimal_message = laplace_result(
+                    cost_matrix, matrix_type, name_alternatives
+                )
 
                 context = {
                     "title": "Результат",
@@ -478,21 +487,43 @@ def result(method_id=None):
             # Сбрасываем флаг
             session.pop("draft_loaded", None)
 
-    optimal_variants = [
-        round(sum(map(float, sublist)) / len(sublist), 2) for sublist in cost_matrix
-    ]
+    # Домінованi альтернативи відкидаються до обчислення (за бажанням)
+    pruned = []
+    shown_matrix, shown_alternatives = cost_matrix, name_alternatives
+    if request.values.get("pareto_filter"):
+        shown_matrix, shown_alternatives, pruned = prune_dominated(
+            cost_matrix, name_alternatives, matrix_type
+        )
 
-    # Знаходимо оптимальне значення в залежності від типу матриці
-    if matrix_type == "profit":
-        max_value = max(optimal_variants)
-        max_index = optimal_variants.index(max_value)
-        optimal_alternative = name_alternatives[max_index]
-        optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має максимальне значення очікуваної вигоди ('{max_value}')."
+    # Повторний перегляд: беремо вже обчислений результат
+    derived = None
+    if flag != 0 and not draft_id and not request.values.get("pareto_filter"):
+        derived = load_derived_result("Laplasa", new_record_id)
+
+    if derived is not None:
+        shown_matrix = derived["cost_matrix"]
+        optimal_variants = derived["optimal_variants"]
+        optimal_message = derived["optimal_message"]
     else:
-        min_value = min(optimal_variants)
-        min_index = optimal_variants.index(min_value)
-        optimal_alternative = name_alternatives[min_index]
-        optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має мінімальне значення очікуваних затрат ('{min_value}')."
+        # Знаходимо оптимальне значення в залежності від типу матриці
+        optimal_variants, optimal_message = laplace_result(
+            shown_matrix, matrix_type, shown_alternatives
+        )
+        if not pruned and not session.get("draft_loaded"):
+            save_derived_result(
+                db,
+                "Laplasa",
+                new_record_id,
+                {
+                    "laplasa_task": laplasa_task,
+                    "matrix_type": matrix_type,
+                    "name_alternatives": name_alternatives,
+                    "name_conditions": name_conditions,
+                    "cost_matrix": cost_matrix,
+                    "optimal_variants": optimal_variants,
+                    "optimal_message": optimal_message,
+                },
+            )
 
     existing_record = LaplasaCostMatrix.query.get(new_record_id)
     if existing_record is None and not session.get("draft_loaded"):
@@ -503,7 +534,11 @@ def result(method_id=None):
             id=new_record_id,
             laplasa_alternatives_id=new_record_id,
             matrix=cost_matrix,
-            optimal_variants=optimal_variants,
+            optimal_variants=(
+                laplace_result(cost_matrix, matrix_type, name_alternatives)[0]
+                if pruned
+                else optimal_variants
+            ),
         )
 
         if current_user.is_authenticated:
@@ -517,10 +552,11 @@ def result(method_id=None):
     context = {
         "title": "Результат",
         "name": current_user.get_name() if current_user.is_authenticated else None,
-        "name_alternatives": name_alternatives,
+        "name_alternatives": shown_alternatives,
         "name_conditions": name_conditions,
-        "cost_matrix": cost_matrix,
+        "cost_matrix": shown_matrix,
         "optimal_variants": optimal_variants,
+        "pruned": pruned,
         "id": new_record_id,
         "method_id": new_record_id,
         "laplasa_task": laplasa_task,
@@ -528,7 +564,7 @@ def result(method_id=None):
         "optimal_message": optimal_message,
         "laplasa_plot": generate_plot(
             optimal_variants,
-            name_alternatives,
+            shown_alternatives,
             False,
             savage=False if matrix_type == "profit" else True,
         ),
@@ -539,6 +575,21 @@ def result(method_id=None):
     return render_template("Laplasa/result.html", **context)
 
 
+def laplasa_excel_response(method_id, analysis_data):
+    """Excel-файл з даними аналізу"""
+    exporter = LaplasaExcelExporter()
+    exporter.generate_laplasa_analysis_excel(analysis_data)
+    excel_bytes = exporter.save_to_bytes()
+
+    return Response(
+        excel_bytes,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename=Laplasa_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        },
+    )
+
+
 @kriteriy_laplasa_bp.route("/export/excel/<int:method_id>")
 def export_excel(method_id):
     """Export Laplasa analysis to Excel"""
@@ -561,7 +612,20 @@ def export_excel(method_id):
             "Please log in to export this result", status=403, mimetype="text/plain"
         )
 
+    derived = None
+    if not request.args.get("pareto_filter"):
+        derived = load_derived_result("Laplasa", method_id)
+
     try:
+        if derived is not None:
+            # Результат вже обчислено на сторінці результату
+            analysis_data = dict(
+                derived,
+                method_id=method_id,
+                laplasa_task=derived["laplasa_task"] or "Laplasa Analysis",
+            )
+            return laplasa_excel_response(method_id, analysis_data)
+
         # Fetch data from database
         laplasa_conditions = LaplasaConditions.query.get(method_id)
         laplasa_alternatives = LaplasaAlternatives.query.get(method_id)
@@ -582,18 +646,16 @@ def export_excel(method_id):
         # Calculate optimal message exactly like on website
         optimal_variants = laplasa_cost_matrix.optimal_variants or []
         name_alternatives = laplasa_alternatives.names or []
+        cost_matrix = laplasa_cost_matrix.matrix or []
 
-        if optimal_variants and name_alternatives:
-            if matrix_type == "profit":
-                max_value = max(optimal_variants)
-                max_index = optimal_variants.index(max_value)
-                optimal_alternative = name_alternatives[max_index]
-                optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має максимальне значення очікуваної вигоди ('{max_value}')."
-            else:
-                min_value = min(optimal_variants)
-                min_index = optimal_variants.index(min_value)
-                optimal_alternative = name_alternatives[min_index]
-                optimal_message = f"Оптимальна альтернатива {optimal_alternative}, має мінімальне значення очікуваних затрат ('{min_value}')."
+        if cost_matrix and name_alternatives:
+            if request.args.get("pareto_filter"):
+                cost_matrix, name_alternatives, _ = prune_dominated(
+                    cost_matrix, name_alternatives, matrix_type
+                )
+            optimal_variants, optimal_message = laplace_result(
+                cost_matrix, matrix_type, name_alternatives
+            )
         else:
             optimal_message = "Немає даних для аналізу"
 
@@ -604,24 +666,12 @@ def export_excel(method_id):
             "matrix_type": matrix_type,
             "name_alternatives": name_alternatives,
             "name_conditions": laplasa_conditions.names or [],
-            "cost_matrix": laplasa_cost_matrix.matrix or [],
+            "cost_matrix": cost_matrix,
             "optimal_variants": optimal_variants,
             "optimal_message": optimal_message,
         }
 
-        # Generate Excel file
-        exporter = LaplasaExcelExporter()
-        workbook = exporter.generate_laplasa_analysis_excel(analysis_data)
-        excel_bytes = exporter.save_to_bytes()
-
-        # Return Excel file
-        return Response(
-            excel_bytes,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=Laplasa_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-            },
-        )
+        return laplasa_excel_response(method_id, analysis_data)
 
     except Exception as e:
         print(f"Excel export error: {e}")
@@ -669,6 +719,13 @@ def upload_matrix():
         return {"success": False, "error": f"Upload failed: {str(e)}"}
 
 
+@kriteriy_laplasa_bp.route("/large_result", methods=["POST"])
+@login_required
+def large_result():
+    """Критерій Лапласа для великої матриці (CSV), що обробляється частинами"""
+    return large_matrix_result("laplace")
+
+
 @kriteriy_laplasa_bp.route("/result_from_file", methods=["POST"])
 @login_required
 def result_from_file():
@@ -722,9 +779,9 @@ def result_from_file():
         print(f"Created LaplasaAlternatives with ID: {new_record_id}")
 
         # Calculate optimal variants
-        optimal_variants = [
-            round(sum(map(float, sublist)) / len(sublist), 2) for sublist in cost_matrix
-        ]
+        optimal_variants, _ = laplace_result(
+            cost_matrix, matrix_type, alternatives_names
+        )
 
         print(f"Calculated optimal_variants: {optimal_variants}")
         print(f"Matrix type: {matrix_type}")
@@ -18,15 +18,43 @@ from models import (
     Result,
 )
 from flask_login import current_user, login_required
-from mymodules.methods import add_object_to_db, generate_plot
+from mymodules.methods import (
+    add_object_to_db,
+    generate_plot,
+    large_matrix_result,
+    load_derived_result,
+    save_derived_result,
+)
 from mymodules.experts_func import make_table
 from mymodules.maximin_excel_export import MaximinExcelExporter
 from mymodules.file_upload import process_maximin_file
+from mymodules.uncertainty import decision_criteria, plain, prune_dominated
 from datetime import datetime
 
 maximin_bp = Blueprint("maximin", __name__, url_prefix="/maximin")
 
 
+def wald_result(cost_matrix, matrix_type, name_alternatives):
+    """Row minima (profit) or maxima (cost) and the conclusion message"""
+    criteria = decision_criteria(cost_matrix, matrix_type)
+    optimal_variants = plain(criteria["wald"])
+    best_index = criteria["wald_best"]
+    optimal_alternative = name_alternatives[best_index]
+    if matrix_type == "profit":
+        optimal_message = (
+            f"Оптимальною за критерієм максимуму мінімальних "
+            f"значень є альтернатива {optimal_alternative} "
+            f"(максимальне значення {optimal_variants[best_index]})."
+        )
+    else:
+        optimal_message = (
+            f"Оптимальною за критерієм мінімуму максимальних "
+            f"значень є альтернатива {optimal_alternative} "
+            f"(мінімальне значення {optimal_variants[best_index]})."
+        )
+    return optimal_variants, optimal_message
+
+
 @maximin_bp.route("/")
 def index():
     context = {
@@ -257,28 +285,42 @@ def result(method_id=None):
         cost_matrix_raw = request.form.getlist("cost_matrix")
         cost_matrix = make_table(num_alt, num_conditions, cost_matrix_raw)
 
-    if matrix_type == "profit":
-        min_values = [min(map(int, sublist)) for sublist in cost_matrix]
-        max_value = max(min_values)
-        max_index = min_values.index(max_value)
-        optimal_alternative = name_alternatives[max_index]
-        optimal_message = (
-            f"Оптимальною за критерієм максимуму мінімальних "
-            f"значень є альтернатива {optimal_alternative} "
-            f"(максимальне значення {max_value})."
+    # Домінованi альтернативи відкидаються до обчислення (за бажанням)
+    pruned = []
+    shown_matrix, shown_alternatives = cost_matrix, name_alternatives
+    if request.values.get("pareto_filter"):
+        shown_matrix, shown_alternatives, pruned = prune_dominated(
+            cost_matrix, name_alternatives, matrix_type
         )
-        optimal_variants = min_values
+
+    # Повторний перегляд: беремо вже обчислений результат
+    derived = None
+    if flag != 0 and not request.values.get("pareto_filter"):
+        derived = load_derived_result("Maximin", new_record_id)
+
+    if derived is not None:
+        shown_matrix = derived["cost_matrix"]
+        optimal_variants = derived["min_values"]
+        optimal_message = derived["optimal_message"]
     else:
-        max_values = [max(map(int, sublist)) for sublist in cost_matrix]
-        min_value = min(max_values)
-        min_index = max_values.index(min_value)
-        optimal_alternative = name_alternatives[min_index]
-        optimal_message = (
-            f"Оптимальною за критерієм мінімуму максимальних "
-            f"значень є альтернатива {optimal_alternative} "
-            f"(мінімальне значення {min_value})."
+        optimal_variants, optimal_message = wald_result(
+            shown_matrix, matrix_type, shown_alternatives
         )
-        optimal_variants = max_values
+        if not pruned:
+            save_derived_result(
+                db,
+                "Maximin",
+                new_record_id,
+                {
+                    "maximin_task": maximin_task,
+                    "matrix_type": matrix_type,
+                    "name_alternatives": name_alternatives,
+                    "name_conditions": name_conditions,
+                    "cost_matrix": cost_matrix,
+                    "min_values": optimal_variants,
+                    "optimal_message": optimal_message,
+                },
+            )
 
     existing_record = MaximinCostMatrix.query.get(new_record_id)
     if existing_record is None:
@@ -288,7 +330,11 @@ def result(method_id=None):
             id=new_record_id,
             maximin_alternatives_id=new_record_id,
             matrix=cost_matrix,
-            optimal_variants=optimal_variants,
+            optimal_variants=(
+                wald_result(cost_matrix, matrix_type, name_alternatives)[0]
+                if pruned
+                else optimal_variants
+            ),
         )
         if current_user.is_authenticated:
             add_object_to_db(
@@ -302,17 +348,18 @@ def result(method_id=None):
     context = {
         "title": "Результат",
         "name": (current_user.get_name() if current_user.is_authenticated else None),
-        "name_alternatives": name_alternatives,
+        "name_alternatives": shown_alternatives,
         "name_conditions": name_conditions,
-        "cost_matrix": cost_matrix,
+        "cost_matrix": shown_matrix,
         "optimal_variants": optimal_variants,
+        "pruned": pruned,
         "id": new_record_id,
         "maximin_task": maximin_task,
         "matrix_type": matrix_type,
         "optimal_message": optimal_message,
         "maximin_plot": generate_plot(
             optimal_variants,
-            name_alternatives,
+            shown_alternatives,
             percent=False,
             savage=False if matrix_type == "profit" else True,
         ),
@@ -323,6 +370,21 @@ def result(method_id=None):
     return render_template("Maximin/result.html", **context)
 
 
+def maximin_excel_response(method_id, analysis_data):
+    """Excel-файл з даними аналізу"""
+    exporter = MaximinExcelExporter()
+    exporter.generate_maximin_analysis_excel(analysis_data)
+    excel_bytes = exporter.save_to_bytes()
+
+    return Response(
+        excel_bytes,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename=Maximin_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        },
+    )
+
+
 @maximin_bp.route("/export/excel/<int:method_id>")
 def export_excel(method_id):
     """Export maximin analysis to Excel"""
@@ -345,7 +407,20 @@ def export_excel(method_id):
             "Please log in to export this result", status=403, mimetype="text/plain"
         )
 
+    derived = None
+    if not request.args.get("pareto_filter"):
+        derived = load_derived_result("Maximin", method_id)
+
     try:
+        if derived is not None:
+            # Результат вже обчислено на сторінці результату
+            analysis_data = dict(
+                derived,
+                method_id=method_id,
+                maximin_task=derived["maximin_task"] or "Maximin Analysis",
+            )
+            return maximin_excel_response(method_id, analysis_data)
+
         # Get data from database
         maximin_conditions = MaximinConditions.query.get(method_id)
         maximin_alternatives = MaximinAlternatives.query.get(method_id)
@@ -366,26 +441,13 @@ def export_excel(method_id):
         matrix_type = maximin_task.matrix_type if maximin_task else "profit"
 
         if cost_matrix and name_alternatives:
-            if matrix_type == "profit":
-                min_values = [min(map(int, sublist)) for sublist in cost_matrix]
-                max_value = max(min_values)
-                max_index = min_values.index(max_value)
-                optimal_alternative = name_alternatives[max_index]
-                optimal_message = (
-                    f"Оптимальною за критерієм максимуму мінімальних "
-                    f"значень є альтернатива {optimal_alternative} "
-                    f"(максимальне значення {max_value})."
-                )
-            else:  # cost matrix
-                min_values = [min(map(int, sublist)) for sublist in cost_matrix]
-                min_value = min(min_values)
-                min_index = min_values.index(min_value)
-                optimal_alternative = name_alternatives[min_index]
-                optimal_message = (
-                    f"Оптимальною за критерієм мінімуму максимальних "
-                    f"значень є альтернатива {optimal_alternative} "
-                    f"(мінімальне значення {min_value})."
+            if request.args.get("pareto_filter"):
+                cost_matrix, name_alternatives, _ = prune_dominated(
+                    cost_matrix, name_alternatives, matrix_type
                 )
+            min_values, optimal_message = wald_result(
+                cost_matrix, matrix_type, name_alternatives
+            )
         else:
             optimal_message = "Немає даних для аналізу"
             min_values = []
@@ -402,19 +464,7 @@ def export_excel(method_id):
             "optimal_message": optimal_message,
         }
 
-        # Generate Excel file
-        exporter = MaximinExcelExporter()
-        workbook = exporter.generate_maximin_analysis_excel(analysis_data)
-        excel_bytes = exporter.save_to_bytes()
-
-        # Return Excel file
-        return Response(
-            excel_bytes,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=Maximin_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-            },
-        )
+        return maximin_excel_response(method_id, analysis_data)
 
     except Exception as e:
         print(f"Excel export error: {e}")
@@ -462,6 +512,13 @@ def upload_matrix():
         return {"success": False, "error": f"Upload failed: {str(e)}"}
 
 
+@maximin_bp.route("/large_result", methods=["POST"])
+@login_required
+def large_result():
+    """Критерій Вальда для великої матриці (CSV), що обробляється частинами"""
+    return large_matrix_result("wald")
+
+
 @maximin_bp.route("/result_from_file", methods=["POST"])
 @login_required
 def result_from_file():
@@ -516,10 +573,7 @@ def result_from_file():
         print(f"Created MaximinAlternatives with ID: {new_record_id}")
 
         # Calculate optimal variants based on matrix type
-        if matrix_type == "profit":
-            optimal_variants = [min(map(float, sublist)) for sublist in cost_matrix]
-        else:  # cost
-            optimal_variants = [max(map(float, sublist)) for sublist in cost_matrix]
+        optimal_variants, _ = wald_result(cost_matrix, matrix_type, alternatives_names)
 
         print(f"Calculated optimal_variants: {optimal_variants}")
 
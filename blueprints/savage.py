@@ -19,15 +19,40 @@ from models import (
     Result,
 )
 from flask_login import current_user, login_required
-from mymodules.methods import add_object_to_db, generate_plot
+from mymodules.methods import (
+    add_object_to_db,
+    generate_plot,
+    large_matrix_result,
+    load_derived_result,
+    save_derived_result,
+)
 from mymodules.experts_func import make_table
 from mymodules.savage_excel_export import SavageExcelExporter
 from mymodules.file_upload import process_savage_file
+from mymodules.uncertainty import decision_criteria, prune_dominated
 from datetime import datetime
 
 savage_bp = Blueprint("savage", __name__, url_prefix="/savage")
 
 
+def savage_message(optimal_alternative, max_losses):
+    return (
+        f"Оптимальна альтернатива за критерієм Севіджа: "
+        f"{optimal_alternative} (мінімальні максимальні втрати = "
+        f"{min(max_losses)})"
+    )
+
+
+def savage_losses(cost_matrix, matrix_type):
+    """Матриця втрат, максимальні втрати та індекс оптимальної альтернативи"""
+    criteria = decision_criteria(cost_matrix, matrix_type)
+    return (
+        criteria["regret"].tolist(),
+        criteria["savage"].tolist(),
+        criteria["savage_best"],
+    )
+
+
 @savage_bp.route("/")
 def index():
     context = {
@@ -266,6 +291,7 @@ def result(method_id=None):
         loss_matrix = cost_record.loss_matrix
         max_losses = cost_record.max_losses
         optimal_alternative = cost_record.optimal_variants[0]
+        optimal_message = savage_message(optimal_alternative, max_losses)
     else:
         # Обрабатываем данные из формы (новые или измененные значения)
         if not cost_matrix_raw:
@@ -280,23 +306,7 @@ def result(method_id=None):
         else:
             cost_matrix = make_table(num_alt, num_conditions, cost_matrix_raw)
 
-        loss_matrix = []
-        for j in range(num_conditions):
-            # Перетворюємо всі елементи стовпця в float
-            col = [float(cost_matrix[i][j]) for i in range(num_alt)]
-            if matrix_type == "profit":
-                # Для прибыли: потери = максимум - текущее значение
-                max_in_col = max(col)
-                loss_matrix.append([abs(max_in_col - val) for val in col])
-            else:
-                # Для затрат: потери = текущее значение - минимум
-                min_in_col = min(col)
-                loss_matrix.append([abs(val - min_in_col) for val in col])
-
-        loss_matrix = list(map(list, zip(*loss_matrix)))
-        max_losses = [max(row) for row in loss_matrix]
-        min_loss = min(max_losses)
-        min_index = max_losses.index(min_loss)
+        loss_matrix, max_losses, min_index = savage_losses(cost_matrix, matrix_type)
         optimal_alternative = name_alternatives[min_index]
 
         # Всегда обновляем данные в базе, если они изменились
@@ -329,18 +339,32 @@ def result(method_id=None):
                 user_id=current_user.get_id(),
             )
 
-    if matrix_type == "profit":
-        optimal_message = (
-            f"Оптимальна альтернатива за критерієм Севіджа: "
-            f"{optimal_alternative} (мінімальні максимальні втрати = "
-            f"{min(max_losses)})"
+        optimal_message = savage_message(optimal_alternative, max_losses)
+        save_derived_result(
+            db,
+            "Savage",
+            new_record_id,
+            {
+                "savage_task": savage_task,
+                "matrix_type": matrix_type,
+                "name_alternatives": name_alternatives,
+                "name_conditions": name_conditions,
+                "cost_matrix": cost_matrix,
+                "loss_matrix": loss_matrix,
+                "max_losses": max_losses,
+                "optimal_message": optimal_message,
+            },
         )
-    else:
-        optimal_message = (
-            f"Оптимальна альтернатива за критерієм Севіджа: "
-            f"{optimal_alternative} (мінімальні максимальні втрати = "
-            f"{min(max_losses)})"
+
+    # Доміновані альтернативи відкидаються до обчислення матриці втрат
+    # (за бажанням), як і в критерії Гурвіца
+    pruned = []
+    if request.values.get("pareto_filter"):
+        cost_matrix, name_alternatives, pruned = prune_dominated(
+            cost_matrix, name_alternatives, matrix_type
         )
+        loss_matrix, max_losses, min_index = savage_losses(cost_matrix, matrix_type)
+        optimal_message = savage_message(name_alternatives[min_index], max_losses)
 
     context = {
         "title": "Результат",
@@ -350,6 +374,7 @@ def result(method_id=None):
         "cost_matrix": cost_matrix,
         "loss_matrix": loss_matrix,
         "max_losses": max_losses,
+        "pruned": pruned,
         "id": new_record_id,
         "savage_task": savage_task,
         "matrix_type": matrix_type,
@@ -361,6 +386,21 @@ def result(method_id=None):
     return render_template("Savage/result.html", **context)
 
 
+def savage_excel_response(method_id, analysis_data):
+    """Excel-файл з даними аналізу"""
+    exporter = SavageExcelExporter()
+    exporter.generate_savage_analysis_excel(analysis_data)
+    excel_bytes = exporter.save_to_bytes()
+
+    return Response(
+        excel_bytes,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename=Savage_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        },
+    )
+
+
 @savage_bp.route("/export/excel/<int:method_id>")
 def export_excel(method_id):
     """Export savage analysis to Excel"""
@@ -381,7 +421,20 @@ def export_excel(method_id):
             "Please log in to export this result", status=403, mimetype="text/plain"
         )
 
+    derived = None
+    if not request.args.get("pareto_filter"):
+        derived = load_derived_result("Savage", method_id)
+
     try:
+        if derived is not None:
+            # Результат вже обчислено на сторінці результату
+            analysis_data = dict(
+                derived,
+                method_id=method_id,
+                savage_task=derived["savage_task"] or "Savage Analysis",
+            )
+            return savage_excel_response(method_id, analysis_data)
+
         # Get data from database
         savage_conditions = SavageConditions.query.get(method_id)
         savage_alternatives = SavageAlternatives.query.get(method_id)
@@ -406,6 +459,11 @@ def export_excel(method_id):
         name_alternatives = savage_alternatives.names or []
 
         if max_losses and name_alternatives:
+            if request.args.get("pareto_filter"):
+                cost_matrix, name_alternatives, _ = prune_dominated(
+                    cost_matrix, name_alternatives, matrix_type
+                )
+                loss_matrix, max_losses, _ = savage_losses(cost_matrix, matrix_type)
             min_loss = min(max_losses)
             min_index = max_losses.index(min_loss)
             optimal_alternative = name_alternatives[min_index]
@@ -426,19 +484,7 @@ def export_excel(method_id):
             "optimal_message": optimal_message,
         }
 
-        # Generate Excel file
-        exporter = SavageExcelExporter()
-        workbook = exporter.generate_savage_analysis_excel(analysis_data)
-        excel_bytes = exporter.save_to_bytes()
-
-        # Return Excel file
-        return Response(
-            excel_bytes,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=Savage_Analysis_Task{method_id}_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-            },
-        )
+        return savage_excel_response(method_id, analysis_data)
 
     except Exception as e:
         print(f"Excel export error: {e}")
@@ -486,6 +532,13 @@ def upload_matrix():
         return {"success": False, "error": f"Upload failed: {str(e)}"}
 
 
+@savage_bp.route("/large_result", methods=["POST"])
+@login_required
+def large_result():
+    """Критерій Севіджа для великої матриці (CSV), що обробляється частинами"""
+    return large_matrix_result("savage")
+
+
 @savage_bp.route("/result_from_file", methods=["POST"])
 @login_required
 def result_from_file():
@@ -539,23 +592,7 @@ def result_from_file():
         print(f"Created SavageAlternatives with ID: {new_record_id}")
 
         # Calculate Savage matrices
-        loss_matrix = []
-        for j in range(num_conditions):
-            # Convert all elements in column to float
-            col = [float(cost_matrix[i][j]) for i in range(num_alt)]
-            if matrix_type == "profit":
-                # Для прибыли: потери = максимум - текущее значение
-                max_in_col = max(col)
-                loss_matrix.append([abs(max_in_col - val) for val in col])
-            else:
-                # Для затрат: потери = текущее значение - минимум
-                min_in_col = min(col)
-                loss_matrix.append([abs(val - min_in_col) for val in col])
-
-        loss_matrix = list(map(list, zip(*loss_matrix)))
-        max_losses = [max(row) for row in loss_matrix]
-        min_loss = min(max_losses)
-        min_index = max_losses.index(min_loss)
+        loss_matrix, max_losses, min_index = savage_losses(cost_matrix, matrix_type)
         optimal_alternative = alternatives_names[min_index]
 
         print(f"Calculated loss_matrix: {loss_matrix}")
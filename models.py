@@ -81,6 +81,44 @@ class GlobalPrioritiesPlot(db.Model):
     plot_data = db.Column(JSON, nullable=False)
 
 
+class HierarchyPriorityOptions(db.Model):
+    """Режим пріоритетів і допуск, з якими обчислено результат ієрархії"""
+
+    __tablename__ = "hierarchy_priority_options"
+    id = db.Column(db.Integer, primary_key=True)
+    priority_mode = db.Column(db.String(20), nullable=False, default="geometric")
+    tolerance = db.Column(db.Float, nullable=False, default=1e-10)
+    criteria_iterations = db.Column(db.Integer, nullable=True)
+
+
+class HierarchyTree(db.Model):
+    __tablename__ = "hierarchy_trees"
+    id = db.Column(db.Integer, primary_key=True)
+    alternatives = db.Column(JSON, nullable=False)
+    priority_mode = db.Column(db.String(20), nullable=False, default="geometric")
+    task_id = db.Column(db.Integer, db.ForeignKey("hierarchy_tasks.id"), nullable=True)
+
+
+class HierarchyNode(db.Model):
+    __tablename__ = "hierarchy_nodes"
+    id = db.Column(db.Integer, primary_key=True)
+    tree_id = db.Column(
+        db.Integer, db.ForeignKey("hierarchy_trees.id"), nullable=False, index=True
+    )
+    parent_id = db.Column(
+        db.Integer, db.ForeignKey("hierarchy_nodes.id"), nullable=True
+    )
+    position = db.Column(db.Integer, nullable=False, default=0)
+    name = db.Column(db.Text, nullable=False)
+    comparison_matrix = db.Column(JSON, nullable=True)
+    # Мемоізовані результати, null - потрібен перерахунок
+    normalized_eigenvector = db.Column(JSON, nullable=True)
+    l_max = db.Column(db.Float, nullable=True)
+    index_consistency = db.Column(db.Float, nullable=True)
+    relation_consistency = db.Column(db.Float, nullable=True)
+    subtree_priorities = db.Column(JSON, nullable=True)
+
+
 # --- LAPLASA ---
 
 
@@ -216,6 +254,19 @@ class HurwitzCostMatrix(db.Model):
     task_id = db.Column(db.Integer, db.ForeignKey("hurwitz_tasks.id"), nullable=True)
 
 
+class HurwitzEnvelope(db.Model):
+    """Кеш мінімумів/максимумів рядків та оптимальних альтернатив для всіх α"""
+
+    __tablename__ = "hurwitz_envelopes"
+    id = db.Column(
+        db.Integer, db.ForeignKey("hurwitz_cost_matrix.id"), primary_key=True
+    )
+    matrix_type = db.Column(db.String(20), nullable=False, default="profit")
+    min_values = db.Column(JSON, nullable=False)
+    max_values = db.Column(JSON, nullable=False)
+    intervals = db.Column(JSON, nullable=False)
+
+
 # --- BINARY ---
 
 
@@ -240,6 +291,19 @@ class BinaryMatrix(db.Model):
     matrix = db.Column(JSON, nullable=False)
 
 
+class BinaryMatrixPacked(db.Model):
+    """
+    Матриця відношень у стислому вигляді: по два біти на клітинку
+    (площина "a_ij = 1" і площина "a_ij = 0", np.packbits).
+    Для нових записів BinaryMatrix.matrix лишається порожнім.
+    """
+
+    __tablename__ = "binary_matrix_packed"
+    id = db.Column(db.Integer, db.ForeignKey("binary_matrix.id"), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
 class BinaryRanj(db.Model):
     __tablename__ = "binary_ranj"
     id = db.Column(db.Integer, primary_key=True)
@@ -274,6 +338,24 @@ class BinaryTransitivity(db.Model):
     task_id = db.Column(db.Integer, db.ForeignKey("binary_tasks.id"), nullable=True)
 
 
+class BinaryTransitivitySummary(db.Model):
+    """
+    Підсумок перевірки на транзитивність: кількість трійок, які можна
+    перевірити, і кількість порушень для кожного першого індексу трійки
+    (row_violations). Самі трійки з порушенням і повна таблиця
+    відновлюються з матриці відношень посторінково.
+    """
+
+    __tablename__ = "binary_transitivity_summary"
+    id = db.Column(
+        db.Integer, db.ForeignKey("binary_transitivity.id"), primary_key=True
+    )
+    total = db.Column(db.BigInteger, nullable=False)
+    checkable = db.Column(db.BigInteger, nullable=False)
+    violated = db.Column(db.BigInteger, nullable=False)
+    row_violations = db.Column(JSON, nullable=False)
+
+
 # --- EXPERTS ---
 class ExpertsNameResearch(db.Model):
     __tablename__ = "experts_name_research"
@@ -295,6 +377,20 @@ class ExpertsCompetency(db.Model):
     k_a = db.Column(JSON, nullable=False)
 
 
+class ExpertsStream(db.Model):
+    """
+    Дослідження, завантажене потоком: замість таблиць по експертах -
+    лише поточна статистика по напрямках (ExpertsAccumulator.state()).
+    """
+
+    __tablename__ = "experts_stream"
+    id = db.Column(
+        db.Integer, db.ForeignKey("experts_name_research.id"), primary_key=True
+    )
+    experts = db.Column(db.Integer, nullable=False)
+    state = db.Column(JSON, nullable=False)
+
+
 class ExpertsData(db.Model):
     __tablename__ = "experts_data"
     id = db.Column(db.Integer, primary_key=True)
@@ -342,3 +438,21 @@ class Result(db.Model):
     method_name = db.Column(db.String(255), nullable=False)
     method_id = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+
+class DerivedResult(db.Model):
+    """
+    Усе, що обчислено на сторінці результату, у тому вигляді, в якому його
+    показують та експортують. version - версія формату поля data.
+    """
+
+    __tablename__ = "derived_results"
+    __table_args__ = (db.UniqueConstraint("method_name", "method_id"),)
+    id = db.Column(db.Integer, primary_key=True)
+    method_name = db.Column(db.String(255), nullable=False)
+    method_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    data = db.Column(JSON, nullable=False)
+    created_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(pytz.timezone("Europe/Kiev"))
+    )
@@ -0,0 +1,901 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+# Випадкова узгодженість (Saaty)
+RANDOM_CONSISTENCY = {
+    1: 0,
+    2: 0,
+    3: 0.58,
+    4: 0.9,
+    5: 1.12,
+    6: 1.24,
+    7: 1.32,
+    8: 1.41,
+    9: 1.45,
+    10: 1.49,
+}
+
+# Таблиця для n > 10, згенерована simulate_random_index()
+RANDOM_INDEX_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "random_index.json"
+)
+
+# Шкала Сааті: 1/9 ... 1/2, 1, 2 ... 9
+SAATY_SCALE = np.array(
+    [1 / v for v in range(9, 1, -1)] + list(range(1, 10)), dtype=float
+)
+
+# Підписи шкали Сааті в обидва боки: "1/3" -> 1/3 і 3 -> "3", 1/3 -> "1/3"
+SAATY_VALUES = {str(v): float(v) for v in range(1, 10)}
+SAATY_VALUES.update({f"1/{v}": 1 / v for v in range(2, 10)})
+SAATY_LABELS = {v: str(v) for v in range(1, 10)}
+SAATY_INVERSE_LABELS = {v: f"1/{v}" for v in range(2, 10)}
+
+# Відхилення, в межах якого число вважається значенням шкали Сааті
+SAATY_TOLERANCE = 1e-6
+
+
+def saaty_label(value, tol=SAATY_TOLERANCE):
+    """
+    "k" or "1/k" when value is within tol of a Saaty-scale judgment,
+    otherwise None (the caller falls back to Fraction).
+    """
+    if not 0 < value < 10:
+        return None
+    if value >= 1:
+        k = round(value)
+        if k <= 9 and abs(value - k) <= tol:
+            return SAATY_LABELS[k]
+        return None
+    k = round(1 / value)
+    if 2 <= k <= 9 and abs(value - 1 / k) <= tol:
+        return SAATY_INVERSE_LABELS[k]
+    return None
+
+
+def simulate_random_index(sizes, samples=10000, seed=0, chunk_size=1000):
+    """
+    Monte-Carlo estimate of the random consistency index: the mean CI of
+    random reciprocal matrices with upper-triangle judgments drawn uniformly
+    from the Saaty scale. Matrices are generated and solved in chunks.
+
+    Returns a dict {n: RI} for every n in sizes.
+    """
+    rng = np.random.default_rng(seed)
+    table = {}
+    for size in sizes:
+        size = int(size)
+        if size < 3:
+            table[size] = 0.0
+            continue
+        rows, cols = np.triu_indices(size, k=1)
+        total = 0.0
+        done = 0
+        while done < samples:
+            count = min(chunk_size, samples - done)
+            stack = np.ones((count, size, size))
+            upper = rng.choice(SAATY_SCALE, size=(count, rows.size))
+            stack[:, rows, cols] = upper
+            stack[:, cols, rows] = 1.0 / upper
+            total += np.linalg.eigvals(stack).real.max(axis=-1).sum()
+            done += count
+        table[size] = round((total / samples - size) / (size - 1), 4)
+    return table
+
+
+def save_random_index(path=RANDOM_INDEX_FILE, max_size=50, samples=10000, seed=0):
+    """
+    Generate the RI table for 11..max_size and write it to path.
+    Run once when the table has to be extended:
+    python -c "from mymodules.ahp_engine import save_random_index; save_random_index()"
+    """
+    sizes = range(max(RANDOM_CONSISTENCY) + 1, max_size + 1)
+    values = simulate_random_index(sizes, samples=samples, seed=seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "samples": samples,
+                "seed": seed,
+                "values": {str(size): value for size, value in values.items()},
+            },
+            file,
+            indent=2,
+        )
+    load_random_index.cache_clear()
+    return values
+
+
+@lru_cache(maxsize=None)
+def load_random_index(path=RANDOM_INDEX_FILE):
+    """Read the precomputed RI table once, keys are matrix sizes"""
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return {int(size): float(value) for size, value in data["values"].items()}
+
+
+# Вибірка для розмірів поза таблицею: менша за табличну, бо рахується
+# під час запиту; seed фіксований, тож значення відтворюване
+FALLBACK_RI_SAMPLES = 2000
+
+
+@lru_cache(maxsize=None)
+def _simulated_random_index(n):
+    # Розмір поза таблицею - рахуємо один раз на процес
+    return simulate_random_index([n], samples=FALLBACK_RI_SAMPLES)[n]
+
+
+def random_index(n):
+    """
+    Random consistency index for an n x n comparison matrix.
+
+    Sizes 1..10 come from Saaty's table (RANDOM_CONSISTENCY), 11..50 from
+    the precomputed data/random_index.json (see save_random_index). Larger
+    sizes fall back to simulate_random_index with FALLBACK_RI_SAMPLES
+    matrices and seed 0; the value is memoized per process, so only the
+    first matrix of a given size pays for the simulation. Extend the JSON
+    table when such sizes are used routinely.
+    """
+    n = int(n)
+    if n in RANDOM_CONSISTENCY:
+        return RANDOM_CONSISTENCY[n]
+    table = load_random_index()
+    if n in table:
+        return table[n]
+    return _simulated_random_index(n)
+
+
+def to_stack(matrices):
+    """
+    Convert one matrix or a list of matrices to a float array of shape
+    (count, n, n). A single 2-D matrix becomes a stack of length 1.
+    """
+    stack = np.array(matrices, dtype=float)
+    if stack.ndim == 2:
+        stack = stack[np.newaxis, :, :]
+    if stack.ndim != 3 or stack.shape[1] != stack.shape[2]:
+        raise ValueError(f"Expected square comparison matrices, got {stack.shape}")
+    return stack
+
+
+def parse_judgment(value, missing=1.0):
+    """
+    Numeric value of one form cell: numbers and fractions like "1/3".
+    Blank cells give `missing`, anything else non-numeric gives 1.0.
+    """
+    text = "" if value is None else str(value).strip()
+    if text in SAATY_VALUES:
+        return SAATY_VALUES[text]
+    if text in ("", "undefined", "Undefined"):
+        return missing
+    try:
+        return float(Fraction(text))
+    except (ValueError, TypeError, ZeroDivisionError):
+        return 1.0
+
+
+def parse_values(values, count, size, missing=1.0):
+    """
+    Build a (count, size, size) stack from a flat list of form values.
+
+    Two layouts are accepted: full row-major matrices (count * size^2
+    values) or only the upper triangles (count * size * (size - 1) / 2
+    values), in which case the diagonal is 1 and the lower triangle is
+    left for fill_reciprocal(). Missing cells become `missing`.
+    """
+    upper_total = count * size * (size - 1) // 2
+    if upper_total and len(values) == upper_total:
+        rows, cols = np.triu_indices(size, k=1)
+        stack = np.ones((count, size, size))
+        upper = np.array([parse_judgment(value, missing) for value in values])
+        stack[:, rows, cols] = upper.reshape(count, rows.size)
+        return stack
+
+    total = count * size * size
+    flat = np.ones(total, dtype=float)
+    for idx, value in enumerate(values[:total]):
+        flat[idx] = parse_judgment(value, missing)
+    return flat.reshape(count, size, size)
+
+
+def fill_reciprocal(stack):
+    """
+    Overwrite the lower triangle of every matrix with reciprocals of the
+    upper triangle (a_ji = 1 / a_ij). Zero judgments map to 1.0.
+    """
+    size = stack.shape[-1]
+    rows, cols = np.triu_indices(size, k=1)
+    upper = stack[:, rows, cols]
+    nonzero = upper != 0
+    stack[:, cols, rows] = np.where(nonzero, 1.0 / np.where(nonzero, upper, 1.0), 1.0)
+    return stack
+
+
+def complete_matrices(stack):
+    """
+    Fill the missing (nan) judgments of incomplete reciprocal matrices.
+
+    Priorities are the logarithmic least-squares solution over the given
+    judgments only: for every matrix the graph Laplacian system
+    L x = b, b_i = sum_j ln a_ij over known pairs, is solved in one batched
+    call and w = exp(x). Missing cells are then set to w_i / w_j (Harker's
+    completion), so the row geometric means of the completed matrix equal
+    the least-squares priorities and the usual lambda max / CR apply.
+    """
+    stack = np.array(stack, dtype=float)
+    size = stack.shape[-1]
+    known = np.isfinite(stack)
+    if known.all():
+        return stack
+
+    eye = np.eye(size, dtype=bool)
+    known &= ~eye
+    logs = np.where(known, np.log(np.where(known, stack, 1.0)), 0.0)
+    degree = known.sum(axis=-1)
+    laplacian = np.where(eye, degree[:, :, np.newaxis], -known.astype(float))
+
+    # Зв'язний граф порівнянь <=> ранг лапласіана n - 1
+    ranks = np.linalg.matrix_rank(laplacian)
+    if np.any(ranks < size - 1):
+        raise ValueError(
+            "Порівнянь недостатньо: кожен елемент має бути пов'язаний "
+            "ланцюжком суджень з усіма іншими"
+        )
+    # Додаємо J/n, щоб система мала єдиний розв'язок із сумою x = 0;
+    # права частина - стек векторів (count, n, 1), а не матриця
+    x = np.linalg.solve(laplacian + 1.0 / size, logs.sum(axis=-1)[..., np.newaxis])
+    x = x[..., 0]
+    implied = np.exp(x[:, :, np.newaxis] - x[:, np.newaxis, :])
+    completed = np.where(known, stack, implied)
+    completed[:, eye] = 1.0
+    return completed
+
+
+def geometric_mean_vectors(stack):
+    """Row geometric means (components of the eigenvector) for every matrix"""
+    # Через логарифми, щоб добуток великих рядків не переповнювався
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.exp(np.log(stack).mean(axis=-1))
+
+
+def normalize(vectors):
+    """Normalize vectors along the last axis so each sums to 1"""
+    return vectors / vectors.sum(axis=-1, keepdims=True)
+
+
+def power_iteration(matrices, tol=1e-10, max_iter=1000, start=None):
+    """
+    Exact principal eigenvectors of a stack of matrices by batched power
+    iteration. Positive reciprocal matrices are primitive, so the iteration
+    converges; matrices that already converged drop out of the batch.
+
+    Args:
+        matrices: (count, n, n) stack
+        tol: max-norm change of the normalized vector that stops iteration
+        max_iter: upper bound on iterations per matrix
+        start: (count, n) warm start, geometric-mean vectors by default
+
+    Returns:
+        (vectors, l_max, iterations) with shapes (count, n), (count,), (count,)
+    """
+    stack = to_stack(matrices)
+    if start is None:
+        start = geometric_mean_vectors(stack)
+    vectors = normalize(np.array(start, dtype=float))
+    iterations = np.zeros(stack.shape[0], dtype=int)
+    active = np.arange(stack.shape[0])
+
+    for step in range(1, max_iter + 1):
+        if active.size == 0:
+            break
+        current = vectors[active]
+        updated = normalize(np.einsum("kij,kj->ki", stack[active], current))
+        delta = np.abs(updated - current).max(axis=-1)
+        vectors[active] = updated
+        iterations[active] = step
+        active = active[delta >= tol]
+
+    # Вектор нормований (сума = 1), тому Lmax = сума компонент A·w
+    l_max = np.einsum("kij,kj->k", stack, vectors)
+    return vectors, l_max, iterations
+
+
+def consistency(l_max, size):
+    """
+    Consistency index and consistency ratio (in percent) for an array of
+    lambda max values of size x size matrices.
+    """
+    l_max = np.asarray(l_max, dtype=float)
+    if size < 3:
+        zeros = np.zeros_like(l_max)
+        return zeros, zeros.copy()
+    index = (l_max - size) / (size - 1)
+    relation = index / random_index(size) * 100
+    return index, relation
+
+
+def evaluate(matrices, mode="geometric", tol=1e-10, max_iter=1000):
+    """
+    Evaluate a stack of pairwise comparison matrices in one pass.
+
+    mode="geometric" approximates priorities by row geometric means,
+    mode="exact" refines them to the principal eigenvector with
+    power_iteration() warm-started from the geometric means.
+
+    Returns a dict of arrays, first axis is the matrix index:
+    comp_vector, norm_vector, sum_col, prod_col (count, n) and
+    l_max, index_consistency, relation_consistency, iterations (count,).
+    """
+    stack = to_stack(matrices)
+    size = stack.shape[-1]
+
+    comp_vector = geometric_mean_vectors(stack)
+    if mode == "exact":
+        norm_vector, _, iterations = power_iteration(
+            stack, tol=tol, max_iter=max_iter, start=comp_vector
+        )
+    elif mode == "geometric":
+        norm_vector = normalize(comp_vector)
+        iterations = np.zeros(stack.shape[0], dtype=int)
+    else:
+        raise ValueError(f"Unknown priority mode: {mode}")
+    sum_col = stack.sum(axis=-2)
+    prod_col = sum_col * norm_vector
+    l_max = prod_col.sum(axis=-1)
+    index_consistency, relation_consistency = consistency(l_max, size)
+
+    return {
+        "comp_vector": comp_vector,
+        "norm_vector": norm_vector,
+        "sum_col": sum_col,
+        "prod_col": prod_col,
+        "l_max": l_max,
+        "index_consistency": index_consistency,
+        "relation_consistency": relation_consistency,
+        "iterations": iterations,
+    }
+
+
+def global_priorities(criteria_weights, alternatives_weights):
+    """
+    Global priorities of alternatives: weighted sum of the per-criterion
+    alternative vectors, (criteria,) @ (criteria, n) -> (n,).
+    """
+    weights = np.asarray(criteria_weights, dtype=float)
+    local = np.asarray(alternatives_weights, dtype=float)
+    if local.ndim != 2 or local.shape[0] != weights.shape[0]:
+        raise ValueError(
+            f"Criteria weights {weights.shape} do not match "
+            f"alternatives weights {local.shape}"
+        )
+    return weights @ local
+
+
+def solve_hierarchy(criteria_matrix, alternatives_matrices, **options):
+    """
+    Solve a goal -> criteria -> alternatives hierarchy in one batched call.
+
+    Args:
+        criteria_matrix: (criteria, criteria) comparison matrix
+        alternatives_matrices: (criteria, n, n) stack, one matrix per criterion
+        **options: mode/tol/max_iter passed to evaluate()
+
+    Returns:
+        Dict with "criteria" and "alternatives" results of evaluate()
+        and the "global_prior" array of shape (n,)
+    """
+    criteria = evaluate(criteria_matrix, **options)
+    alternatives = evaluate(alternatives_matrices, **options)
+    return {
+        "criteria": criteria,
+        "alternatives": alternatives,
+        "global_prior": global_priorities(
+            criteria["norm_vector"][0], alternatives["norm_vector"]
+        ),
+    }
+
+
+def set_judgment(matrix, i, j, value):
+    """
+    Copy of a comparison matrix with one judgment replaced: a_ij = value
+    and the reciprocal a_ji = 1 / value. Diagonal cells stay 1.
+    """
+    matrix = np.array(matrix, dtype=float)
+    size = matrix.shape[-1]
+    i, j, value = int(i), int(j), float(value)
+    if not (0 <= i < size and 0 <= j < size):
+        raise IndexError(f"Cell ({i}, {j}) is outside a {size} x {size} matrix")
+    if i == j:
+        raise ValueError("Diagonal judgments are always 1")
+    if value <= 0:
+        raise ValueError(f"Judgment must be positive, got {value}")
+    matrix[i, j] = value
+    matrix[j, i] = 1.0 / value
+    return matrix
+
+
+def update_judgment(matrices, index, i, j, value, **options):
+    """
+    Change one judgment in a stack of comparison matrices and re-evaluate
+    only the matrix that contains it.
+
+    Args:
+        matrices: (count, n, n) stack or a single matrix (index must be 0)
+        index: position of the changed matrix in the stack
+        i, j, value: the new judgment a_ij
+        **options: mode/tol/max_iter passed to evaluate()
+
+    Returns:
+        (matrix, result) - the updated (n, n) matrix and the evaluate()
+        result for it alone, every array keeps its leading axis of length 1
+    """
+    stack = to_stack(matrices)
+    matrix = set_judgment(stack[index], i, j, value)
+    return matrix, evaluate(matrix, **options)
+
+
+def weight_sensitivity(criteria_weights, alternatives_weights, steps=21):
+    """
+    One-at-a-time sensitivity of global priorities to criterion weights.
+
+    Criterion k is swept over a grid of weights t in [0, 1] while the other
+    weights are rescaled proportionally to keep the sum at 1. For every k
+    the global vector is linear in t: g(t) = base_k + t * (local_k - base_k),
+    so the whole sweep is one broadcasted product and the points where the
+    current best alternative is overtaken are found exactly.
+
+    Args:
+        criteria_weights: (criteria,) weights of the criteria
+        alternatives_weights: (criteria, n) local alternative priorities
+        steps: number of grid points per criterion
+
+    Returns:
+        Dict with "grid" (steps,), "priorities" (criteria, steps, n),
+        "winners" (criteria, steps), "best" (index of the current winner)
+        and per-criterion rank-reversal thresholds "lower"/"upper"
+        (criteria,) with the weights, nan when the winner never changes in
+        that direction, plus "lower_rival"/"upper_rival" (-1 for none).
+    """
+    weights = np.asarray(criteria_weights, dtype=float)
+    local = np.asarray(alternatives_weights, dtype=float)
+    current = global_priorities(weights, local)
+    best = int(np.argmax(current))
+
+    # base_k - глобальний вектор при нульовій вазі критерію k
+    rest = current[np.newaxis, :] - weights[:, np.newaxis] * local
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = np.where(
+            (weights < 1)[:, np.newaxis],
+            rest / (1 - weights)[:, np.newaxis],
+            0.0,
+        )
+    slope = local - base
+    grid = np.linspace(0.0, 1.0, steps)
+    priorities = (
+        base[:, np.newaxis, :]
+        + grid[np.newaxis, :, np.newaxis] * slope[:, np.newaxis, :]
+    )
+
+    # Перетин g_best(t) = g_m(t) для кожної пари (критерій, альтернатива)
+    gap = base[:, [best]] - base
+    gap_slope = slope[:, [best]] - slope
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = -gap / gap_slope
+    crossing[:, best] = np.nan
+    valid = np.isfinite(crossing) & (crossing >= 0) & (crossing <= 1)
+    above = valid & (crossing > weights[:, np.newaxis])
+    below = valid & (crossing < weights[:, np.newaxis])
+
+    upper_values = np.where(above, crossing, np.inf)
+    lower_values = np.where(below, crossing, -np.inf)
+    upper_rival = np.where(above.any(axis=1), upper_values.argmin(axis=1), -1)
+    lower_rival = np.where(below.any(axis=1), lower_values.argmax(axis=1), -1)
+    upper = np.where(upper_rival >= 0, upper_values.min(axis=1), np.nan)
+    lower = np.where(lower_rival >= 0, lower_values.max(axis=1), np.nan)
+
+    return {
+        "grid": grid,
+        "priorities": priorities,
+        "winners": priorities.argmax(axis=-1),
+        "best": best,
+        "lower": lower,
+        "upper": upper,
+        "lower_rival": lower_rival,
+        "upper_rival": upper_rival,
+    }
+
+
+class GroupAggregator:
+    """
+    Streaming aggregation of a panel of decision makers.
+
+    Each expert's matrices are added one at a time and only running sums
+    are kept, so memory is O(n^2) per node whatever the panel size:
+    - AIJ (aggregation of individual judgments): weighted element-wise
+      geometric mean of the comparison matrices, kept as a sum of logs;
+    - AIP (aggregation of individual priorities): weighted arithmetic mean
+      of each expert's priority vectors.
+    """
+
+    def __init__(self, mode="geometric", tol=1e-10):
+        self.options = {"mode": mode, "tol": tol}
+        self.count = 0
+        self.total_weight = 0.0
+        self._log_criteria = None
+        self._log_alternatives = None
+        self._criteria_priorities = None
+        self._alternatives_priorities = None
+
+    def add(self, criteria_matrix, alternatives_matrices, weight=1.0):
+        """Add one expert: (m, m) criteria matrix and (m, n, n) stack"""
+        weight = float(weight)
+        if weight <= 0:
+            raise ValueError(f"Expert weight must be positive, got {weight}")
+        criteria = to_stack(criteria_matrix)
+        alternatives = to_stack(alternatives_matrices)
+        if np.any(criteria <= 0) or np.any(alternatives <= 0):
+            raise ValueError("Comparison matrices must be positive")
+        if self._log_criteria is not None and (
+            criteria.shape[1:] != self._log_criteria.shape
+            or alternatives.shape != self._log_alternatives.shape
+        ):
+            raise ValueError(
+                f"Expert matrices {criteria.shape[1:]}/{alternatives.shape} do not "
+                f"match the panel {self._log_criteria.shape}/"
+                f"{self._log_alternatives.shape}"
+            )
+
+        criteria_priorities = evaluate(criteria, **self.options)["norm_vector"][0]
+        alternatives_priorities = evaluate(alternatives, **self.options)["norm_vector"]
+        if self._log_criteria is None:
+            self._log_criteria = np.zeros(criteria.shape[1:])
+            self._log_alternatives = np.zeros(alternatives.shape)
+            self._criteria_priorities = np.zeros(criteria.shape[-1])
+            self._alternatives_priorities = np.zeros(alternatives.shape[:-1])
+
+        self._log_criteria += weight * np.log(criteria[0])
+        self._log_alternatives += weight * np.log(alternatives)
+        self._criteria_priorities += weight * criteria_priorities
+        self._alternatives_priorities += weight * alternatives_priorities
+        self.count += 1
+        self.total_weight += weight
+        return self
+
+    def _check(self):
+        if not self.count:
+            raise ValueError("No expert matrices were added")
+
+    def aij(self):
+        """Group matrices (criteria (m, m), alternatives (m, n, n)) by AIJ"""
+        self._check()
+        return (
+            np.exp(self._log_criteria / self.total_weight),
+            np.exp(self._log_alternatives / self.total_weight),
+        )
+
+    def aip(self):
+        """Group priorities (criteria (m,), alternatives (m, n)) by AIP"""
+        self._check()
+        return (
+            normalize(self._criteria_priorities / self.total_weight),
+            normalize(self._alternatives_priorities / self.total_weight),
+        )
+
+    def matrices(self, method="aij"):
+        """
+        Group comparison matrices for the single-decision-maker pipeline.
+        For AIP these are the consistent matrices w_i / w_j built from the
+        averaged priorities, which reproduce them exactly in every mode.
+        """
+        if method == "aij":
+            return self.aij()
+        if method != "aip":
+            raise ValueError(f"Unknown group aggregation: {method}")
+        criteria, alternatives = self.aip()
+        return (
+            criteria[:, np.newaxis] / criteria[np.newaxis, :],
+            alternatives[:, :, np.newaxis] / alternatives[:, np.newaxis, :],
+        )
+
+
+class PriorityTree:
+    """
+    Goal -> criteria -> sub-criteria ... -> alternatives hierarchy of any
+    depth.
+
+    Every node holds a comparison matrix of its children; a leaf criterion
+    holds a matrix of the alternatives. Local results and sub-tree
+    priorities (the alternatives' priorities with respect to the node) are
+    memoized per node: set_matrix() drops only the node and its ancestors,
+    so editing one branch recomputes just that branch and the path to the
+    goal. Dirty local matrices are evaluated in one batch per matrix size.
+    """
+
+    def __init__(self, alternatives, mode="geometric", tol=1e-10):
+        self.alternatives = list(alternatives)
+        self.options = {"mode": mode, "tol": tol}
+        self.nodes = {}
+        self.root = None
+        self._local = {}
+        self._subtree = {}
+
+    def add_node(self, node_id, name, parent=None, matrix=None):
+        if node_id in self.nodes:
+            raise ValueError(f"Duplicate hierarchy node: {node_id}")
+        if parent is None:
+            if self.root is not None:
+                raise ValueError("Hierarchy can have only one goal node")
+            self.root = node_id
+        elif parent not in self.nodes:
+            raise ValueError(f"Unknown parent node: {parent}")
+        else:
+            self.nodes[parent]["children"].append(node_id)
+            self.invalidate(parent)
+        self.nodes[node_id] = {
+            "name": name,
+            "parent": parent,
+            "children": [],
+            "matrix": None if matrix is None else np.array(matrix, dtype=float),
+        }
+        return self
+
+    def size(self, node_id):
+        """Expected matrix size: number of children or of alternatives"""
+        children = self.nodes[node_id]["children"]
+        return len(children) if children else len(self.alternatives)
+
+    def path(self, node_id):
+        """Node ids from node_id up to the goal"""
+        while node_id is not None:
+            yield node_id
+            node_id = self.nodes[node_id]["parent"]
+
+    def invalidate(self, node_id):
+        """Drop memoized results of node_id and all its ancestors"""
+        self._local.pop(node_id, None)
+        for ancestor in self.path(node_id):
+            self._subtree.pop(ancestor, None)
+
+    def set_matrix(self, node_id, matrix):
+        self.nodes[node_id]["matrix"] = np.array(matrix, dtype=float)
+        self.invalidate(node_id)
+        return self
+
+    def set_cached(self, node_id, local=None, subtree=None):
+        """Restore memoized results, e.g. persisted from an earlier run"""
+        if local is not None:
+            self._local[node_id] = local
+        if subtree is not None:
+            self._subtree[node_id] = np.asarray(subtree, dtype=float)
+        return self
+
+    def _evaluate_dirty(self):
+        groups = {}
+        for node_id, node in self.nodes.items():
+            if node_id in self._local:
+                continue
+            size = self.size(node_id)
+            if node["matrix"] is None or node["matrix"].shape != (size, size):
+                raise ValueError(
+                    f'Node "{node["name"]}" needs a {size} x {size} comparison matrix'
+                )
+            groups.setdefault(size, []).append(node_id)
+
+        for size, node_ids in groups.items():
+            result = evaluate(
+                [self.nodes[node_id]["matrix"] for node_id in node_ids],
+                **self.options,
+            )
+            for k, node_id in enumerate(node_ids):
+                self._local[node_id] = {
+                    "norm_vector": result["norm_vector"][k],
+                    "l_max": float(result["l_max"][k]),
+                    "index_consistency": float(result["index_consistency"][k]),
+                    "relation_consistency": float(result["relation_consistency"][k]),
+                    "iterations": int(result["iterations"][k]),
+                }
+
+    def local(self, node_id):
+        """Local priorities and consistency of the node's own matrix"""
+        if node_id not in self._local:
+            self._evaluate_dirty()
+        return self._local[node_id]
+
+    def priorities(self, node_id=None):
+        """Priorities of the alternatives with respect to node_id (goal by default)"""
+        node_id = self.root if node_id is None else node_id
+        if node_id in self._subtree:
+            return self._subtree[node_id]
+        if any(item not in self._local for item in self.nodes):
+            self._evaluate_dirty()
+
+        children = self.nodes[node_id]["children"]
+        weights = np.asarray(self._local[node_id]["norm_vector"], dtype=float)
+        if children:
+            vector = global_priorities(
+                weights, [self.priorities(child) for child in children]
+            )
+        else:
+            vector = weights
+        self._subtree[node_id] = vector
+        return vector
+
+    def global_weights(self):
+        """Weight of every node with respect to the goal (product along the path)"""
+        weights = {self.root: 1.0}
+        stack = [self.root]
+        while stack:
+            node_id = stack.pop()
+            children = self.nodes[node_id]["children"]
+            if not children:
+                continue
+            local = self.local(node_id)["norm_vector"]
+            for child, value in zip(children, local):
+                weights[child] = weights[node_id] * float(value)
+                stack.append(child)
+        return weights
+
+
+def inconsistent_judgments(matrices, vectors=None, top=3):
+    """
+    Rank the judgments that contribute most to inconsistency.
+
+    Every upper-triangle judgment a_ij of every matrix is compared with the
+    ratio implied by the priorities, e_ij = a_ij * w_j / w_i; the score is
+    |ln e_ij| (0 for a perfectly consistent cell). The suggested value is
+    the Saaty-scale number closest to w_i / w_j on the log scale.
+
+    Args:
+        matrices: (count, n, n) stack
+        vectors: (count, n) priorities, geometric-mean vectors by default
+        top: number of entries returned per matrix
+
+    Returns:
+        Dict of (count, top) arrays: "row", "col", "value", "implied",
+        "suggested" and "score", each matrix sorted by descending score.
+    """
+    stack = to_stack(matrices)
+    if vectors is None:
+        vectors = normalize(geometric_mean_vectors(stack))
+    vectors = np.asarray(vectors, dtype=float).reshape(stack.shape[:2])
+    size = stack.shape[-1]
+    rows, cols = np.triu_indices(size, k=1)
+    top = max(0, min(int(top), rows.size))
+
+    values = stack[:, rows, cols]
+    implied = vectors[:, rows] / vectors[:, cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.abs(np.log(values / implied))
+    score = np.nan_to_num(score, nan=np.inf)
+
+    order = np.argsort(-score, axis=-1, kind="stable")[:, :top]
+    picked_implied = np.take_along_axis(implied, order, axis=-1)
+    scale = np.log(SAATY_SCALE)
+    nearest = np.abs(np.log(picked_implied)[..., np.newaxis] - scale).argmin(axis=-1)
+
+    return {
+        "row": rows[order],
+        "col": cols[order],
+        "value": np.take_along_axis(values, order, axis=-1),
+        "implied": picked_implied,
+        "suggested": SAATY_SCALE[nearest],
+        "score": np.take_along_axis(score, order, axis=-1),
+    }
+
+
+def judgment_bounds(matrices, spread=2.0):
+    """
+    Judgment ranges around point matrices: every off-diagonal a_ij may lie
+    anywhere in [a_ij / spread, a_ij * spread] (spread 2 turns "4" into
+    "2 to 8"). Returns (low, high) stacks.
+    """
+    stack = to_stack(matrices)
+    spread = float(spread)
+    if spread < 1:
+        raise ValueError(f"Spread must be at least 1, got {spread}")
+    return stack / spread, stack * spread
+
+
+def _sample_log_matrices(rng, low, high, count):
+    # Логарифми випадкових обернено-симетричних матриць, судження рівномірні
+    # на лог-шкалі між low і high; форма (count, *low.shape)
+    size = low.shape[-1]
+    rows, cols = np.triu_indices(size, k=1)
+    log_low = np.log(low[..., rows, cols])
+    log_high = np.log(high[..., rows, cols])
+    upper = log_low + rng.random((count,) + log_low.shape) * (log_high - log_low)
+    logs = np.zeros((count,) + low.shape)
+    logs[..., rows, cols] = upper
+    logs[..., cols, rows] = -upper
+    return logs
+
+
+def _simulate_chunk(task):
+    seed, count, criteria_bounds, alternatives_bounds, options = task
+    rng = np.random.default_rng(seed)
+    log_criteria = _sample_log_matrices(rng, *criteria_bounds, count)
+    log_alternatives = _sample_log_matrices(rng, *alternatives_bounds, count)
+
+    if options["mode"] == "geometric":
+        # Геометричне середнє рядка = exp(середнього логарифмів)
+        weights = normalize(np.exp(log_criteria.mean(axis=-1)))
+        local = normalize(np.exp(log_alternatives.mean(axis=-1)))
+    else:
+        criteria_count, size = log_alternatives.shape[1], log_alternatives.shape[-1]
+        weights = evaluate(np.exp(log_criteria), **options)["norm_vector"]
+        local = evaluate(np.exp(log_alternatives).reshape(-1, size, size), **options)[
+            "norm_vector"
+        ].reshape(count, criteria_count, size)
+    return np.einsum("km,kmn->kn", weights, local)
+
+
+def simulate_priorities(
+    criteria_bounds,
+    alternatives_bounds,
+    samples=10000,
+    seed=0,
+    chunk_size=500,
+    workers=1,
+    mode="geometric",
+    tol=1e-10,
+):
+    """
+    Monte-Carlo propagation of judgment uncertainty to global priorities.
+
+    Judgments are drawn log-uniformly from their (low, high) ranges in
+    chunks of chunk_size samples, so memory is bounded by one chunk of
+    (chunk, criteria, n, n) matrices. Each chunk gets its own seed spawned
+    from `seed`, which makes results identical for any number of workers;
+    workers > 1 spreads chunks over a process pool (None - all cores).
+
+    Args:
+        criteria_bounds: (low, high) criteria matrices, shape (m, m)
+        alternatives_bounds: (low, high) stacks, shape (m, n, n)
+
+    Returns:
+        Dict with "priorities" (samples, n), "mean", "std", "percentiles"
+        (5th, 50th, 95th; shape (3, n)) and "first" - the probability of
+        each alternative ranking first.
+    """
+    criteria_bounds = tuple(to_stack(bound)[0] for bound in criteria_bounds)
+    alternatives_bounds = tuple(to_stack(bound) for bound in alternatives_bounds)
+    for low, high in (criteria_bounds, alternatives_bounds):
+        if np.any(low <= 0) or np.any(high < low):
+            raise ValueError("Judgment ranges must be positive with low <= high")
+
+    samples, chunk_size = int(samples), max(1, int(chunk_size))
+    if samples < 1:
+        raise ValueError(f"Need at least one sample, got {samples}")
+    counts = [chunk_size] * (samples // chunk_size)
+    if samples % chunk_size:
+        counts.append(samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    options = {"mode": mode, "tol": tol}
+    tasks = [
+        (chunk_seed, count, criteria_bounds, alternatives_bounds, options)
+        for chunk_seed, count in zip(seeds, counts)
+    ]
+
+    if workers == 1 or len(tasks) < 2:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+
+    priorities = np.concatenate(chunks)
+    first = np.bincount(priorities.argmax(axis=-1), minlength=priorities.shape[-1])
+    return {
+        "priorities": priorities,
+        "mean": priorities.mean(axis=0),
+        "std": priorities.std(axis=0),
+        "percentiles": np.percentile(priorities, [5, 50, 95], axis=0),
+        "first": first / samples,
+    }
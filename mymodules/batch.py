@@ -0,0 +1,434 @@
+"""
+Offline batch solver for folders or zip archives of decision files.
+
+    python -m mymodules.batch incoming/ --out results/ --workers 8
+    python -m mymodules.batch week42.zip --out results/ --method auto
+
+Every .xlsx/.xls/.csv file is parsed with FileParser, its method is taken
+from the file name (or detected from its contents) and it is solved with
+the same engines the web app uses. Files are independent, so they are
+spread over a process pool one file per task and throughput grows with
+the number of cores. A file that fails to parse or solve is recorded in
+the summary and does not stop the batch.
+
+Output: one <file>.json with the full result per input file (the path
+relative to the source with "/" -> "__"; names that would still collide
+get a short hash of the path) and summary.csv with a row per file (file,
+method, status, best, details, seconds, error).
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from mymodules import ahp_engine, binary, experts_engine, uncertainty
+from mymodules.file_parser import FileParser
+from mymodules.mai import do_matrix
+
+METHODS = ("hierarchy", "binary", "experts", "laplasa", "maximin", "savage", "hurwitz")
+
+# Критерій uncertainty.decision_criteria, що відповідає методу
+UNCERTAINTY_CRITERIA = {
+    "laplasa": "laplace",
+    "maximin": "wald",
+    "savage": "savage",
+    "hurwitz": "hurwitz",
+}
+
+# Ключові слова в імені файлу (нижній регістр) -> метод
+FILENAME_METHODS = (
+    ("hierarch", "hierarchy"),
+    ("ієрарх", "hierarchy"),
+    ("binary", "binary"),
+    ("бінарн", "binary"),
+    ("expert", "experts"),
+    ("експерт", "experts"),
+    ("hurwitz", "hurwitz"),
+    ("гурвіц", "hurwitz"),
+    ("laplac", "laplasa"),
+    ("laplas", "laplasa"),
+    ("лаплас", "laplasa"),
+    ("maximin", "maximin"),
+    ("wald", "maximin"),
+    ("вальд", "maximin"),
+    ("savage", "savage"),
+    ("севідж", "savage"),
+)
+
+SUMMARY_FIELDS = ("file", "method", "status", "best", "details", "seconds", "error")
+
+# Скільки порушень транзитивності записувати в JSON (всього - violations_total)
+VIOLATIONS_SAVED = 1000
+
+
+def method_from_name(path):
+    """Method named by keywords in the file name, None if there are none"""
+    name = os.path.basename(path).lower()
+    for keyword, method in FILENAME_METHODS:
+        if keyword in name:
+            return method
+    return None
+
+
+def detect_method(path, parser=None):
+    """
+    Method of a decision file: by its name first, otherwise by contents -
+    several square matrices are a hierarchy, a competency block plus an
+    evaluation block are experts, a square matrix of -1/0/1 is a binary
+    relation and anything else is a cost matrix (Laplace by default).
+    """
+    method = method_from_name(path)
+    if method:
+        return method
+
+    parser = parser or FileParser()
+    parsed = parser.parse_file(path, "hierarchy")
+    if parsed["success"] and len(parsed["matrices"]) > 1:
+        return "hierarchy"
+
+    parsed = parser.parse_file(path, "experts")
+    if parsed["success"] and parsed["competency"]:
+        return "experts"
+
+    parsed = parser.parse_file(path, "binary")
+    if parsed["success"] and np.isin(parsed["matrix"], (-1, 0, 1)).all():
+        return "binary"
+    return "laplasa"
+
+
+def _ranking(names, scores, largest=True):
+    """Names ordered best first"""
+    scores = np.asarray(scores)
+    order = np.argsort(-scores if largest else scores, kind="stable")
+    return [names[i] for i in order.tolist()]
+
+
+def _flat(matrix):
+    """Матриця -> плоский список рядків, як значення форми у веб-версії"""
+    return [str(value) for row in matrix for value in row]
+
+
+def solve_hierarchy(parsed, **options):
+    criteria = parsed["matrices"][0]
+    count = len(criteria["matrix"])
+    alternatives = parsed["matrices"][1 : count + 1]
+    if len(alternatives) != count:
+        raise ValueError(
+            f"Expected {count} alternatives matrices, found {len(alternatives)}"
+        )
+    names = parsed["alternative_names"]
+    # Та сама нормалізація, що й у веб-версії: верхній трикутник задає
+    # оцінки, нижній - обернені до них, на діагоналі одиниці
+    criteria_matrix = do_matrix(
+        krit=1, matrix=_flat(criteria["matrix"]), criteria=count
+    )
+    alternatives_matrices = do_matrix(
+        matrix=[value for matrix in alternatives for value in _flat(matrix["matrix"])],
+        criteria=count,
+        num_alt=len(names),
+    )
+    result = ahp_engine.solve_hierarchy(criteria_matrix, alternatives_matrices)
+    ranking = _ranking(names, result["global_prior"])
+    return {
+        "best": ranking[0],
+        "details": " > ".join(ranking),
+        "criteria_names": parsed["criteria_names"],
+        "alternative_names": names,
+        "criteria_weights": result["criteria"]["norm_vector"][0],
+        "alternatives_weights": result["alternatives"]["norm_vector"],
+        "global_prior": result["global_prior"],
+        "relation_consistency": {
+            "criteria": result["criteria"]["relation_consistency"][0],
+            "alternatives": result["alternatives"]["relation_consistency"],
+        },
+        "ranking": ranking,
+    }
+
+
+def solve_binary(parsed, **options):
+    values = np.asarray(parsed["matrix"])
+    if values.ndim != 2 or values.shape[0] != values.shape[1]:
+        raise ValueError("Binary relation matrix must be square")
+    if not np.isin(values, (-1, 0, 1)).all():
+        raise ValueError("Only -1, 0 and 1 are allowed in a binary relation")
+    # Як у веб-формі: верхній трикутник задає відношення, нижній - протилежний
+    matrix = binary.process_matrix(values.ravel().tolist(), len(values))
+    names = parsed["alternative_names"] or [f"a{i + 1}" for i in range(len(matrix))]
+    checkable, row_counts = binary.transitivity_counts(matrix)
+    total = int(row_counts.sum())
+    violations = binary.violation_triples(matrix, row_counts, 0, VIOLATIONS_SAVED)
+    structure = binary.structure_summary(matrix, names)
+    sums = matrix.sum(axis=1, dtype=int)
+    ranking = _ranking(names, sums)
+    return {
+        "best": ranking[0],
+        "details": f"порушень транзитивності: {total} з {checkable}",
+        "alternative_names": names,
+        "sums": sums,
+        "ranking": ranking,
+        "checkable": checkable,
+        "violations_total": total,
+        "violations": violations + 1,
+        "structure": structure,
+    }
+
+
+def solve_experts(parsed, **options):
+    names = parsed["alternative_names"]
+    competency = parsed["competency"]
+    if competency:
+        k_k = [experts_engine.competence(row)[1] for row in competency]
+    else:
+        # Без блоку компетентності всі експерти рівноцінні
+        k_k = [1.0] * len(parsed["matrix"])
+    result = experts_engine.experts_analysis(k_k, parsed["matrix"])
+    ranking = _ranking(names, result["r_i"], largest=False)
+    return {
+        "best": ranking[0],
+        "details": f"W = {result['W']:.4f}, p = {result['p_value']:.4g}",
+        "alternative_names": names,
+        "expert_names": parsed["expert_names"],
+        "k_k": k_k,
+        "m_i": result["m_i"],
+        "r_i": result["r_i"],
+        "lambda_values": result["lambda_values"],
+        "W": result["W"],
+        "chi2": result["chi2"],
+        "p_value": result["p_value"],
+        "significant": result["significant"],
+        "aggregation": {
+            name: [names[i] for i in aggregated["order"].tolist()]
+            for name, aggregated in result["aggregation"].items()
+        },
+        "ranking": ranking,
+    }
+
+
+def solve_uncertainty(parsed, method, matrix_type="profit", alpha=0.5, **options):
+    names = parsed["alternative_names"]
+    criteria = uncertainty.decision_criteria(parsed["matrix"], matrix_type, alpha)
+    best = {name: names[criteria[f"{name}_best"]] for name in uncertainty.CRITERIA}
+    return {
+        "best": best[UNCERTAINTY_CRITERIA[method]],
+        "details": ", ".join(f"{name}: {best[name]}" for name in uncertainty.CRITERIA),
+        "alternative_names": names,
+        "condition_names": parsed["condition_names"],
+        "matrix_type": matrix_type,
+        "alpha": alpha,
+        "criteria": {name: criteria[name] for name in uncertainty.CRITERIA},
+        "regret": criteria["regret"],
+        "best_by_criterion": best,
+    }
+
+
+SOLVERS = {
+    "hierarchy": solve_hierarchy,
+    "binary": solve_binary,
+    "experts": solve_experts,
+}
+
+
+def solve_file(path, method="auto", **options):
+    """
+    Parse and solve one decision file.
+
+    Returns (method, result) where result is a JSON-ready dict from the
+    method's solver; raises ValueError when the file cannot be parsed.
+    """
+    parser = FileParser()
+    if method == "auto":
+        method = detect_method(path, parser)
+    if method not in METHODS:
+        raise ValueError(f"Unsupported method type: {method}")
+
+    parsed = parser.parse_file(path, method)
+    if not parsed["success"]:
+        raise ValueError(parsed["error"])
+    if method in SOLVERS:
+        return method, SOLVERS[method](parsed, **options)
+    return method, solve_uncertainty(parsed, method, **options)
+
+
+def _to_json(value):
+    """json.dump default: NumPy arrays and scalars -> Python values"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _process_file(task):
+    """
+    Pool task: solve one file and write it to <out_dir>/<output>.
+
+    Never raises - any error ends up in the returned summary row, so one
+    broken file does not cancel the rest of the batch.
+    """
+    path, name, output_name, out_dir, method, options = task
+    row = dict.fromkeys(SUMMARY_FIELDS, "")
+    row.update(file=name, method=method)
+    start = time.perf_counter()
+    try:
+        row["method"], result = solve_file(path, method, **options)
+        row.update(status="ok", best=result["best"], details=result["details"])
+        output = {"file": name, "method": row["method"], "result": result}
+        with open(os.path.join(out_dir, output_name), "w", encoding="utf-8") as file:
+            json.dump(output, file, ensure_ascii=False, indent=2, default=_to_json)
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def collect_files(folder, formats=None):
+    """Supported files under folder (recursively), as sorted relative paths"""
+    formats = tuple(formats or FileParser().supported_formats)
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for filename in files:
+            # ~$name.xlsx - файли блокування Excel
+            if filename.lower().endswith(formats) and not filename.startswith("~$"):
+                path = os.path.join(root, filename)
+                found.append(os.path.relpath(path, folder).replace(os.sep, "/"))
+    return sorted(found)
+
+
+def output_names(names):
+    """
+    JSON file name for every relative path: "/" -> "__" plus .json. Names
+    that would collide ("a/b.csv" and "a__b.csv", or names differing only
+    in case on Windows/macOS) get the first 8 hex digits of the path's
+    SHA-1 as a suffix.
+    """
+    flat = {name: name.replace("/", "__") for name in names}
+    taken = Counter(value.lower() for value in flat.values())
+    result = {}
+    for name, value in flat.items():
+        if taken[value.lower()] > 1:
+            digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+            value = f"{value}-{digest}"
+        result[name] = value + ".json"
+    return result
+
+
+def write_summary(rows, path):
+    """summary.csv; utf-8-sig so that Excel shows Cyrillic names correctly"""
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_batch(source, out_dir, method="auto", workers=None, progress=None, **options):
+    """
+    Solve every decision file in a folder or zip archive.
+
+    workers=1 solves the files in this process, otherwise they are spread
+    over a process pool (None - all cores). progress(done, total, row) is
+    called as each file finishes. options (matrix_type, alpha) go to the
+    solvers.
+
+    Returns the summary rows sorted by file name; summary.csv and one JSON
+    per solved file are written to out_dir. Raises ValueError when source
+    does not exist or is neither a folder nor a zip archive.
+    """
+    if not os.path.exists(source):
+        raise ValueError(f"{source} does not exist")
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as extracted:
+        folder = source
+        if os.path.isfile(source):
+            if not zipfile.is_zipfile(source):
+                raise ValueError(f"{source} is neither a folder nor a zip archive")
+            with zipfile.ZipFile(source) as archive:
+                archive.extractall(extracted)
+            folder = extracted
+
+        names = collect_files(folder)
+        outputs = output_names(names)
+        tasks = [
+            (os.path.join(folder, name), name, outputs[name], out_dir, method, options)
+            for name in names
+        ]
+        rows = []
+
+        def finished(row):
+            rows.append(row)
+            if progress:
+                progress(len(rows), len(tasks), row)
+
+        if workers == 1 or len(tasks) < 2:
+            for task in tasks:
+                finished(_process_file(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_process_file, task) for task in tasks]
+                for future in as_completed(futures):
+                    finished(future.result())
+
+    rows.sort(key=lambda row: row["file"])
+    write_summary(rows, os.path.join(out_dir, "summary.csv"))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mymodules.batch",
+        description="Solve a folder or zip archive of decision files.",
+    )
+    parser.add_argument("source", help="folder or .zip with .xlsx/.xls/.csv files")
+    parser.add_argument("--out", default="batch_results", help="output folder")
+    parser.add_argument(
+        "--method",
+        default="auto",
+        choices=("auto",) + METHODS,
+        help="method for all files; auto - by file name or contents",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    parser.add_argument("--matrix-type", default="profit", choices=("profit", "cost"))
+    parser.add_argument("--alpha", type=float, default=0.5, help="Hurwitz alpha")
+    parser.add_argument("--quiet", action="store_true", help="no per-file progress")
+    args = parser.parse_args(argv)
+
+    def progress(done, total, row):
+        status = row["status"] if row["status"] == "ok" else row["error"]
+        print(f"[{done}/{total}] {row['file']}: {status}", file=sys.stderr)
+
+    start = time.perf_counter()
+    try:
+        rows = run_batch(
+            args.source,
+            args.out,
+            method=args.method,
+            workers=args.workers,
+            progress=None if args.quiet else progress,
+            matrix_type=args.matrix_type,
+            alpha=args.alpha,
+        )
+    except ValueError as e:
+        # Код виходу 2 і повідомлення у stderr, як для невірних аргументів
+        parser.error(str(e))
+    failed = sum(row["status"] != "ok" for row in rows)
+    print(
+        f"{len(rows)} files, {len(rows) - failed} solved, {failed} failed "
+        f"in {time.perf_counter() - start:.2f} s -> "
+        f"{os.path.join(args.out, 'summary.csv')}",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
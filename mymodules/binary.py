@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def check_tranz(a1, a2, a3, i, j, k):
     res = []
     i += 1
@@ -76,17 +79,392 @@ def check_tranz(a1, a2, a3, i, j, k):
     return res
 
 
-# функція для обробки матриці
+# функція для обробки матриці: значення з форми (num * num, по рядках)
+# -> масив int8; використовується лише верхній трикутник
 def process_matrix(matrix, num):
-    processed_matrix = []
-    for i in range(0, len(matrix), num):
-        processed_matrix.append(matrix[i:i + num])
-    for i in range(num):
-        for j in range(num):
-            if i > j:
-                processed_matrix[i][j] = -int(processed_matrix[j][i])
-            elif i == j:
-                processed_matrix[i][j] = 0
-            else:
-                processed_matrix[i][j] = int(processed_matrix[i][j])
+    cells = np.asarray(matrix, dtype=object).reshape(num, num)
+    i, j = np.triu_indices(num, k=1)
+    processed_matrix = np.zeros((num, num), dtype=np.int8)
+    processed_matrix[i, j] = np.asarray(cells[i, j], dtype=str).astype(np.int8)
+    processed_matrix[j, i] = -processed_matrix[i, j]
     return processed_matrix
+
+
+def to_relation(matrix):
+    """Матриця відношень (списки чисел або рядків) -> масив int8"""
+    return np.asarray(matrix).astype(np.int8)
+
+
+def pack_relation(matrix):
+    """
+    Матриця відношень -> bytes: дві бітові площини ("= 1" і "= 0"),
+    по два біти на клітинку замість JSON зі списками чисел.
+    """
+    values = to_relation(matrix)
+    return np.packbits(np.stack((values == 1, values == 0))).tobytes()
+
+
+def unpack_relation(data, num):
+    """bytes з pack_relation -> масив int8 (num, num)"""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=2 * num * num)
+    greater, equal = bits.view(np.int8).reshape(2, num, num)
+    # 1 -> 2 + 0 - 1, 0 -> 0 + 1 - 1, -1 -> 0 + 0 - 1
+    return 2 * greater + equal - 1
+
+
+def _row_masks(values, i):
+    """
+    Трійки з першим індексом i: маски (same, broken) розміру
+    (n - i - 1, n - i - 1) по парах (j, k), j, k > i, з k > j.
+    Трійку можна перевірити, якщо a_ij == a_jk; вона порушує
+    транзитивність, якщо при цьому a_ik != a_ij.
+    """
+    row = values[i, i + 1 :]
+    rest = values[i + 1 :, i + 1 :]
+    upper = np.triu(np.ones(rest.shape, dtype=bool), k=1)
+    same = (row[:, None] == rest) & upper
+    broken = same & (row[None, :] != row[:, None])
+    return same, broken
+
+
+def packed_bytes(matrix, cells):
+    """
+    Байти pack_relation(matrix), у яких лежать біти клітинок cells
+    [(i, j), ...]: {зміщення байта: значення}. Після зміни однієї оцінки
+    перезаписати треба лише ці байти, а не всю матрицю.
+    """
+    values = to_relation(matrix)
+    size = values.size
+    flat = values.ravel()
+    positions = set()
+    for i, j in cells:
+        cell = int(i) * len(values) + int(j)
+        positions.update((cell, size + cell))
+
+    updates = {}
+    for offset in sorted(position // 8 for position in positions):
+        bits = np.arange(offset * 8, min(offset * 8 + 8, 2 * size))
+        plane, cell = np.divmod(bits, size)
+        flags = np.where(plane == 0, flat[cell] == 1, flat[cell] == 0)
+        updates[offset] = int(np.packbits(flags)[0])
+    return updates
+
+
+def transitivity_check(matrix):
+    """
+    Класифікує всі трійки i < j < k матриці відношень (1 / 0 / -1).
+
+    Для кожного i порівнюються всі пари (j, k) одразу, тож пам'ять -
+    O(n^2) плюс самі порушення.
+
+    Повертає (checkable, violations): кількість трійок, які можна
+    перевірити, та масив (m, 3) індексів (з нуля) трійок з порушенням,
+    упорядкованих лексикографічно.
+    """
+    values = np.asarray(matrix, dtype=np.int8)
+    num = len(values)
+
+    checkable = 0
+    violations = []
+    for i in range(num - 2):
+        same, broken = _row_masks(values, i)
+        checkable += int(same.sum())
+        j, k = np.nonzero(broken)
+        if j.size:
+            violations.append(
+                np.column_stack((np.full(j.size, i), j + i + 1, k + i + 1))
+            )
+
+    if violations:
+        violations = np.concatenate(violations)
+    else:
+        violations = np.empty((0, 3), dtype=np.intp)
+    return checkable, violations
+
+
+def transitivity_counts(matrix):
+    """
+    Те саме, що transitivity_check, але без списку трійок: повертає
+    (checkable, row_counts), де row_counts[i] - кількість порушень з
+    першим індексом i. Пам'ять - O(n^2) за будь-якої кількості порушень.
+    """
+    values = np.asarray(matrix, dtype=np.int8)
+    num = len(values)
+
+    checkable = 0
+    row_counts = np.zeros(num, dtype=np.int64)
+    for i in range(num - 2):
+        same, broken = _row_masks(values, i)
+        checkable += int(same.sum())
+        row_counts[i] = int(broken.sum())
+    return checkable, row_counts
+
+
+def violation_triples(matrix, row_counts, start=0, count=None):
+    """
+    Порушення транзитивності з номерами start .. start + count - 1 у
+    лексикографічному порядку, масив (m, 3). Рядки i перед потрібним
+    пропускаються за row_counts, тож обчислюються лише ті, що
+    потрапляють на сторінку.
+    """
+    values = np.asarray(matrix, dtype=np.int8)
+    counts = np.asarray(row_counts, dtype=np.int64)
+    ends = np.cumsum(counts)
+    total = int(ends[-1]) if ends.size else 0
+    stop = total if count is None else min(total, start + count)
+
+    found = []
+    position = start
+    i = int(np.searchsorted(ends, start, side="right"))
+    while position < stop:
+        first = position - int(ends[i] - counts[i])
+        take = min(stop - position, int(counts[i]) - first)
+        if take > 0:
+            _, broken = _row_masks(values, i)
+            j, k = np.nonzero(broken)
+            j, k = j[first : first + take], k[first : first + take]
+            found.append(np.column_stack((np.full(j.size, i), j + i + 1, k + i + 1)))
+            position += take
+        i += 1
+
+    if found:
+        return np.concatenate(found)
+    return np.empty((0, 3), dtype=np.intp)
+
+
+def triple_rows(matrix, triples):
+    """
+    Рядки таблиці транзитивності лише для заданих трійок:
+    (комбінація, умова, відношення, примітка).
+    """
+    rows = []
+    for i, j, k in triples:
+        i, j, k = int(i), int(j), int(k)
+        res = check_tranz(
+            int(matrix[i][j]), int(matrix[j][k]), int(matrix[i][k]), i, j, k
+        )
+        rows.append((f"a{i + 1}, a{j + 1}, a{k + 1}", res[0], res[1], res[2]))
+    return rows
+
+
+def _pairs_after(count):
+    return count * (count - 1) // 2
+
+
+def iter_triples(num, start=0):
+    """
+    Трійки i < j < k (з нуля) у лексикографічному порядку, починаючи з
+    трійки з номером start; попередні трійки не перебираються.
+    """
+    i = 0
+    while i < num - 2 and start >= _pairs_after(num - 1 - i):
+        start -= _pairs_after(num - 1 - i)
+        i += 1
+    j = i + 1
+    while j < num - 1 and start >= num - 1 - j:
+        start -= num - 1 - j
+        j += 1
+    k = j + 1 + start
+
+    while i < num - 2:
+        while j < num - 1:
+            while k < num:
+                yield i, j, k
+                k += 1
+            j += 1
+            k = j + 1
+        i += 1
+        j = i + 1
+        k = j + 1
+
+
+def count_triples(num):
+    return num * (num - 1) * (num - 2) // 6 if num >= 3 else 0
+
+
+def _dfs_order(graph, order):
+    """
+    Ітеративний DFS по щільній матриці суміжності у порядку order.
+    Повертає дерева обходу як списки вершин (кожна - у порядку завершення).
+    Наступний невідвіданий сусід шукається по рядку матриці, тож
+    весь обхід - O(n^2), тобто лінійний за кількістю дуг.
+    """
+    unvisited = np.ones(len(graph), dtype=bool)
+    trees = []
+    for root in order:
+        if not unvisited[root]:
+            continue
+        unvisited[root] = False
+        finished = []
+        stack = [root]
+        while stack:
+            v = stack[-1]
+            candidates = graph[v] & unvisited
+            if candidates.any():
+                w = int(candidates.argmax())
+                unvisited[w] = False
+                stack.append(w)
+            else:
+                finished.append(stack.pop())
+        trees.append(finished)
+    return trees
+
+
+def _shortest_path(graph, source, target, allowed):
+    """Найкоротший шлях source -> target по вершинах allowed (BFS)"""
+    parent = np.full(len(graph), -1)
+    visited = ~allowed
+    visited[source] = True
+    frontier = np.array([source])
+    while frontier.size and not visited[target]:
+        reach = graph[frontier] & ~visited
+        new = np.flatnonzero(reach.any(axis=0))
+        parent[new] = frontier[reach[:, new].argmax(axis=0)]
+        visited[new] = True
+        frontier = new
+    path = [target]
+    while path[-1] != source:
+        path.append(int(parent[path[-1]]))
+    return path[::-1]
+
+
+def relation_structure(matrix):
+    """
+    Компоненти сильної зв'язності орграфа домінування "a_i >= a_j".
+
+    Для послідовного експерта компоненти - це класи рівноцінних об'єктів.
+    Компонента, всередині якої є строга перевага, містить цикл
+    (a1 > a2 > ... > a1) - її об'єкти між собою непорівнянні.
+    Конденсація (компоненти як вершини) - ациклічна, тож порядок
+    компонент дає узгоджений частковий порядок об'єктів.
+
+    Повертає словник:
+        components - списки індексів (з нуля), від кращої компоненти до гіршої,
+        cyclic - чи містить компоненту цикл,
+        level - номер компоненти кожного об'єкта,
+        cycles - для циклічних компонент: {"component", "objects", "witness"},
+            де witness - найкоротший цикл через одну строгу перевагу
+            (перша вершина повторюється в кінці).
+    """
+    values = np.asarray(matrix, dtype=np.int8)
+    num = len(values)
+    graph = values >= 0
+    np.fill_diagonal(graph, False)
+
+    # Косарайю: порядок завершення на графі, потім обхід транспонованого
+    # графа у зворотному порядку - компоненти виходять топологічно
+    finish = [v for tree in _dfs_order(graph, range(num)) for v in tree]
+    reverse = np.ascontiguousarray(graph.T)
+    components = [sorted(tree) for tree in _dfs_order(reverse, finish[::-1])]
+
+    level = np.empty(num, dtype=int)
+    for position, members in enumerate(components):
+        level[members] = position
+
+    cyclic = []
+    cycles = []
+    for position, members in enumerate(components):
+        strict = values[np.ix_(members, members)] == 1
+        if not strict.any():
+            cyclic.append(False)
+            continue
+        cyclic.append(True)
+        u, v = np.unravel_index(int(strict.argmax()), strict.shape)
+        u, v = members[u], members[v]
+        path = _shortest_path(graph, v, u, level == position)
+        cycles.append(
+            {"component": position, "objects": members, "witness": [u] + path}
+        )
+
+    return {
+        "components": components,
+        "cyclic": cyclic,
+        "level": level.tolist(),
+        "cycles": cycles,
+    }
+
+
+def cycle_str(matrix, witness, names=None):
+    """Цикл у вигляді "a1 > a2 = a3 > a1" """
+    label = (lambda i: names[i]) if names else (lambda i: f"a{i + 1}")
+    text = label(witness[0])
+    for i, j in zip(witness, witness[1:]):
+        text += (" > " if int(matrix[i][j]) == 1 else " = ") + label(j)
+    return text
+
+
+def structure_summary(matrix, names):
+    """
+    Компактний опис relation_structure для сторінки результату та експорту.
+
+    order - узгоджений частковий порядок: класи рівноцінних об'єктів
+    через " = ", циклічні компоненти - у фігурних дужках (непорівнянні).
+    """
+    structure = relation_structure(matrix)
+    parts = []
+    for members, cyclic in zip(structure["components"], structure["cyclic"]):
+        labels = [names[i] for i in members]
+        parts.append("{" + ", ".join(labels) + "}" if cyclic else " = ".join(labels))
+
+    cycles = [
+        {
+            "objects": ", ".join(names[i] for i in cycle["objects"]),
+            "size": len(cycle["objects"]),
+            "witness": cycle_str(matrix, cycle["witness"], names),
+        }
+        for cycle in structure["cycles"]
+    ]
+    return {
+        "order": " > ".join(parts),
+        "components": len(structure["components"]),
+        "cycles": cycles,
+        "in_cycles": sum(cycle["size"] for cycle in cycles),
+    }
+
+
+def pair_triples(num, a, b):
+    """Усі n - 2 трійки i < j < k, що містять обидва об'єкти a і b"""
+    others = np.setdiff1d(np.arange(num), (a, b))
+    triples = np.sort(
+        np.column_stack((np.full(others.size, a), np.full(others.size, b), others)),
+        axis=1,
+    )
+    return triples[np.lexsort(triples.T[::-1])]
+
+
+def classify_triples(matrix, triples):
+    """
+    Для кожної трійки (i, j, k): чи можна її перевірити (a_ij == a_jk)
+    і чи порушено транзитивність (до того ж a_ik != a_ij).
+    """
+    values = np.asarray(matrix)
+    i, j, k = np.asarray(triples, dtype=np.intp).reshape(-1, 3).T
+    checkable = values[i, j] == values[j, k]
+    return checkable, checkable & (values[i, k] != values[i, j])
+
+
+def update_transitivity(matrix, a, b, value, checkable, row_counts):
+    """
+    Змінює клітинку (a, b) матриці відношень (і дзеркальну) на місці та
+    оновлює результат transitivity_counts без повного перерахунку:
+    змінитися можуть лише n - 2 трійки, що містять пару (a, b), тож
+    оновлення коштує O(n) незалежно від кількості порушень.
+
+    Повертає (checkable, row_counts, added, removed), де added / removed -
+    трійки, що з'явилися серед порушень / зникли з них.
+    """
+    num = len(matrix)
+    triples = pair_triples(num, a, b)
+    checkable_before, broken_before = classify_triples(matrix, triples)
+    matrix[a, b] = value
+    matrix[b, a] = -value
+    checkable_after, broken_after = classify_triples(matrix, triples)
+
+    checkable += int(checkable_after.sum()) - int(checkable_before.sum())
+    added = triples[broken_after & ~broken_before]
+    removed = triples[broken_before & ~broken_after]
+
+    row_counts = np.array(row_counts, dtype=np.int64)
+    np.add.at(row_counts, added[:, 0], 1)
+    np.subtract.at(row_counts, removed[:, 0], 1)
+    return checkable, row_counts, added, removed
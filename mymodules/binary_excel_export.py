@@ -244,6 +244,16 @@ class BinaryExcelExporter:
         title_cell.value = "Перевірка на транзитивність"
         self.set_header_style(title_cell)
 
+        # Новий формат зберігання: у таблиці лише трійки з порушенням
+        summary = analysis_data.get("transitivity_summary")
+        if summary:
+            ws.merge_cells("A2:F2")
+            ws["A2"] = (
+                f"Усього трійок: {summary['total']}, можна перевірити: "
+                f"{summary['checkable']}, з порушенням: {summary['violated']}"
+                f" (у таблиці - {len(analysis_data['comb'])})"
+            )
+
         # Headers
         headers = [
             "№",
@@ -291,6 +301,41 @@ class BinaryExcelExporter:
 
         self.auto_adjust_columns(ws)
 
+    def create_cycles_sheet(self, analysis_data):
+        """Create preference cycles sheet"""
+        structure = analysis_data.get("structure")
+        if not structure:
+            return
+        ws = self.workbook.create_sheet("Цикли переваг")
+
+        # Title
+        ws.merge_cells("A1:D1")
+        title_cell = ws["A1"]
+        title_cell.value = "Цикли переваг"
+        self.set_header_style(title_cell)
+
+        ws["A3"] = "Узгоджений порядок:"
+        ws["B3"] = structure["order"]
+        self.set_data_style(ws["A3"])
+        self.set_data_style(ws["B3"])
+
+        headers = ["№", "Об'єкти компоненти", "Кількість", "Приклад циклу"]
+        for i, header in enumerate(headers):
+            col_letter = get_column_letter(i + 1)
+            ws[f"{col_letter}5"] = header
+            self.set_subheader_style(ws[f"{col_letter}5"])
+
+        for i, cycle in enumerate(structure["cycles"]):
+            row = i + 6
+            ws[f"A{row}"] = i + 1
+            ws[f"B{row}"] = cycle["objects"]
+            ws[f"C{row}"] = cycle["size"]
+            ws[f"D{row}"] = cycle["witness"]
+            for col in "ABCD":
+                self.set_data_style(ws[f"{col}{row}"])
+
+        self.auto_adjust_columns(ws)
+
     def create_formal_notation_sheet(self, analysis_data):
         """Create formal notation sheet"""
         ws = self.workbook.create_sheet("Формальні позначки")
@@ -411,6 +456,7 @@ class BinaryExcelExporter:
         self.create_matrix_sheet(analysis_data)
         self.create_ranking_sheet(analysis_data)
         self.create_transitivity_sheet(analysis_data)
+        self.create_cycles_sheet(analysis_data)
         self.create_formal_notation_sheet(analysis_data)
         self.create_chart_sheet(analysis_data)
         self.create_conclusion_sheet(analysis_data)
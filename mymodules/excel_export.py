@@ -8,6 +8,7 @@ from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, Reference
 from openpyxl.drawing.image import Image
 from mymodules.mai import generate_hierarchy_tree
+from mymodules.ahp_engine import random_index
 
 
 class HierarchyExcelExporter:
@@ -360,19 +361,7 @@ class HierarchyExcelExporter:
         # Calculate consistency
         n = len(criteria_names)
         ci = (l_max - n) / (n - 1) if n > 1 else 0
-        ri_values = {
-            1: 0,
-            2: 0,
-            3: 0.58,
-            4: 0.9,
-            5: 1.12,
-            6: 1.24,
-            7: 1.32,
-            8: 1.41,
-            9: 1.45,
-            10: 1.49,
-        }
-        ri = ri_values.get(n, 1.49)
+        ri = random_index(n) if n > 0 else 0
         cr = ci / ri if ri > 0 else 0
 
         self.set_subheader_style(
@@ -537,19 +526,7 @@ class HierarchyExcelExporter:
         # Calculate consistency
         n = len(alternatives_names)
         ci = (l_max - n) / (n - 1) if n > 1 else 0
-        ri_values = {
-            1: 0,
-            2: 0,
-            3: 0.58,
-            4: 0.9,
-            5: 1.12,
-            6: 1.24,
-            7: 1.32,
-            8: 1.41,
-            9: 1.45,
-            10: 1.49,
-        }
-        ri = ri_values.get(n, 1.49)
+        ri = random_index(n) if n > 0 else 0
         cr = ci / ri if ri > 0 else 0
 
         self.set_subheader_style(
@@ -0,0 +1,360 @@
+import math
+
+import numpy as np
+
+# Рівень значущості для перевірки узгодженості експертів
+SIGNIFICANCE = 0.05
+
+# Межа кількості проходів локального пошуку для консенсусу Кемені
+KEMENY_MAX_SWEEPS = 50
+
+# Скільки експертів обробляти за раз при побудові матриці попарних переваг
+PAIRWISE_CHUNK = 64
+
+
+def to_table(values, num_experts=None, num_research=None):
+    """
+    Expert scores (nested lists or a flat form list of numbers/strings) ->
+    float array of shape (experts, research directions). Empty cells are 0.
+    """
+    values = np.asarray(values, dtype=object)
+    values = np.where(values == "", 0, values).astype(float)
+    if num_experts is not None:
+        values = values.reshape(num_experts, num_research)
+    if values.ndim != 2 or 0 in values.shape:
+        raise ValueError(f"Expected a non-empty 2-D table, got {values.shape}")
+    return values
+
+
+def average_ranks(values):
+    """
+    Tie-aware ranks along the last axis, rank 1 for the largest value.
+    Tied values share the mean of the positions they occupy ("2.5, 2.5"),
+    so every row of ranks sums to n(n + 1) / 2.
+
+    Returns (ranks, ties) where ties[e] = sum(t^3 - t) over the tie groups
+    of row e (Kendall's tie correction).
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    rows, n = values.shape
+    order = np.argsort(-values, axis=1, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=1)
+
+    # Номер групи рівних значень, наскрізний для всіх рядків
+    starts = np.ones((rows, n), dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group = np.cumsum(starts.ravel()) - 1
+    size = np.bincount(group)
+    position = np.tile(np.arange(1, n + 1, dtype=float), rows)
+    mean = np.bincount(group, weights=position) / size
+
+    ranks = np.empty((rows, n))
+    np.put_along_axis(ranks, order, mean[group].reshape(rows, n), axis=1)
+
+    group_row = np.repeat(np.arange(rows), n)[starts.ravel()]
+    ties = np.bincount(group_row, weights=size**3 - size, minlength=rows)
+    return ranks, ties
+
+
+def chi2_sf(x, df):
+    """
+    P(chi^2_df >= x) for integer df, without scipy: closed-form series
+    of the regularized upper incomplete gamma function, summed in logs.
+    """
+    if x <= 0:
+        return 1.0
+    half = x / 2
+    if df % 2 == 0:
+        total, log_term, k = 0.0, -half, 0
+    else:
+        total = math.erfc(math.sqrt(half))
+        log_term, k = -half + 0.5 * math.log(x) + 0.5 * math.log(2 / math.pi), 1
+    # Парні df: e^(-x/2) * sum (x/2)^k / k!, k < df/2
+    # Непарні: erfc + sqrt(2/pi) e^(-x/2) * sum x^(k-1/2) / (1*3*...*(2k-1))
+    while (df % 2 == 0 and k < df // 2) or (df % 2 == 1 and k <= (df - 1) // 2):
+        total += math.exp(log_term)
+        if df % 2 == 0:
+            k += 1
+            log_term += math.log(half / k)
+        else:
+            log_term += math.log(x / (2 * k + 1))
+            k += 1
+    return min(total, 1.0)
+
+
+def concordance(table):
+    """
+    Kendall's coefficient of concordance W of the experts' rankings with
+    the tie correction, chi^2 = m (n - 1) W with n - 1 degrees of freedom
+    and its p-value. W is None when it is undefined (one research
+    direction, or every expert tied every direction).
+    """
+    return _concordance(*average_ranks(table))
+
+
+def _concordance(ranks, ties):
+    return _kendall(ranks.sum(axis=0), len(ranks), float(ties.sum()))
+
+
+def _kendall(rank_sums, m, ties):
+    """W from the per-item rank sums of m experts and their tie correction"""
+    n = rank_sums.size
+    s = float(((rank_sums - rank_sums.mean()) ** 2).sum())
+    denominator = m**2 * (n**3 - n) - m * ties
+
+    result = {
+        "rank_sums": rank_sums,
+        "S": s,
+        "W": None,
+        "chi2": None,
+        "df": n - 1,
+        "p_value": None,
+        "significant": False,
+    }
+    if n < 2 or denominator <= 0:
+        return result
+    w = 12 * s / denominator
+    chi2 = m * (n - 1) * w
+    p_value = chi2_sf(chi2, n - 1)
+    result.update(W=w, chi2=chi2, p_value=p_value, significant=p_value < SIGNIFICANCE)
+    return result
+
+
+def experts_analysis(k_k, table):
+    """
+    Whole experts method in one vectorized pass over the
+    (experts, research directions) table:
+        m_i - competence-weighted mean score, sum_j k_j x_ji / m,
+        r_i - tie-aware rank of m_i (1 = best),
+        lambda - 2 (n + 1 - r_i) / (n (n + 1)), sums to 1,
+    plus Kendall's W of the individual rankings (see concordance).
+    """
+    values = to_table(table)
+    weights = np.asarray(k_k, dtype=float)
+    if weights.shape != (values.shape[0],):
+        raise ValueError("k_k must hold one coefficient per expert")
+
+    m, n = values.shape
+    m_i = weights @ values / m
+    r_i = average_ranks(m_i)[0][0]
+    lambda_values = 2 * (n + 1 - r_i) / (n * (n + 1))
+
+    # Ранги експертів обчислюються один раз для W і для агрегування
+    ranks, ties = average_ranks(values)
+    result = _concordance(ranks, ties)
+    result.update(
+        m_i=m_i,
+        r_i=r_i,
+        lambda_values=lambda_values,
+        aggregation=aggregate_rankings(ranks, weights),
+    )
+    return result
+
+
+def plain_ranks(ranks):
+    """Ranks -> list; whole ranks become int so that they show as "2", not "2.0"."""
+    return [int(r) if float(r).is_integer() else float(r) for r in ranks]
+
+
+def pairwise_preferences(ranks, weights=None, chunk=PAIRWISE_CHUNK):
+    """
+    P[i, j] - total weight of the experts that put item i strictly above
+    item j. Built from chunks of experts, so memory is O(chunk * n^2).
+    """
+    m, n = ranks.shape
+    weights = np.ones(m) if weights is None else np.asarray(weights, dtype=float)
+    preferences = np.zeros((n, n))
+    for start in range(0, m, chunk):
+        block = ranks[start : start + chunk]
+        above = block[:, :, None] < block[:, None, :]
+        preferences += np.tensordot(weights[start : start + chunk], above, axes=1)
+    return preferences
+
+
+def kemeny_local_search(preferences, order, max_sweeps=KEMENY_MAX_SWEEPS):
+    """
+    Approximate Kemeny consensus: starting from order, move single items to
+    the position that lowers the disagreement most (insertion moves) until
+    a sweep changes nothing or max_sweeps sweeps are done. Each sweep is
+    O(n^2), so the running time is bounded by max_sweeps * n^2.
+
+    Disagreement of an order = total weight of the pairwise preferences
+    it reverses. Returns (order, disagreement, converged).
+    """
+    order = list(order)
+    n = len(order)
+    # gain[x, y] - how much the disagreement grows if x moves in front of y
+    gain = preferences.T - preferences
+
+    converged = False
+    for _ in range(max_sweeps):
+        moved = False
+        for x in list(order):
+            p = order.index(x)
+            d = gain[x, order]
+            delta = np.zeros(n)
+            # Ліворуч на позицію q < p: x обганяє order[q:p]
+            delta[:p] = np.cumsum(d[:p][::-1])[::-1]
+            # Праворуч на позицію q > p: order[p+1:q+1] обганяють x
+            delta[p + 1 :] = -np.cumsum(d[p + 1 :])
+            q = int(delta.argmin())
+            if delta[q] < -1e-12:
+                order.pop(p)
+                order.insert(q, x)
+                moved = True
+        if not moved:
+            converged = True
+            break
+
+    position = np.empty(n, dtype=int)
+    position[order] = np.arange(n)
+    disagreement = float(preferences[position[:, None] > position[None, :]].sum())
+    return order, disagreement, converged
+
+
+def aggregate_rankings(ranks, weights=None, max_sweeps=KEMENY_MAX_SWEEPS):
+    """
+    Borda, Copeland and approximate Kemeny consensus of the experts'
+    rankings (ranks from average_ranks, 1 = best), optionally weighted by
+    the experts' competence. Zero total weight falls back to equal weights.
+
+    Returns {"borda", "copeland", "kemeny"}, each with "scores" (larger is
+    better) and "order" (item indices, best first); Kemeny also carries
+    "disagreement" and "converged".
+    """
+    m, n = ranks.shape
+    weights = np.ones(m) if weights is None else np.asarray(weights, dtype=float)
+    if weights.sum() <= 0:
+        weights = np.ones(m)
+
+    # Борда: n - ранг балів від кожного експерта
+    borda = weights @ (n - ranks)
+    preferences = pairwise_preferences(ranks, weights)
+    # Копленд: перемоги мінус поразки у попарних "виборах"
+    copeland = np.sign(preferences - preferences.T).sum(axis=1)
+
+    start = np.lexsort((-borda, -copeland))
+    order, disagreement, converged = kemeny_local_search(preferences, start, max_sweeps)
+    kemeny = np.empty(n)
+    kemeny[order] = n - np.arange(n)
+
+    def best_first(scores):
+        return np.argsort(-scores, kind="stable")
+
+    return {
+        "borda": {"scores": borda, "order": best_first(borda)},
+        "copeland": {"scores": copeland, "order": best_first(copeland)},
+        "kemeny": {
+            "scores": kemeny,
+            "order": np.array(order),
+            "disagreement": disagreement,
+            "converged": converged,
+        },
+    }
+
+
+def competence(row):
+    """
+    Competence of one expert from [familiarity, argument sources...]:
+    k_a = sum of the argument coefficients, k_k = (k_a + familiarity) / 2.
+    """
+    values = to_table([row])[0]
+    familiarity, k_a = float(values[0]), float(values[1:].sum())
+    if k_a > 1:
+        raise ValueError("Коефіцієнт аргументованості рішень експерта має бути <= 1.")
+    if familiarity > 1:
+        raise ValueError(
+            "Коефіцієнт ступеня знайомства експерта з проблемою має бути <= 1."
+        )
+    return k_a, (k_a + familiarity) / 2
+
+
+class ExpertsAccumulator:
+    """
+    Streaming experts method: experts are added one row at a time and only
+    per-item running statistics are kept, so memory is O(items) whatever
+    the panel size. The state is a plain dict (state() / from_state()), so
+    a saved study can be extended with more experts later without
+    revisiting the earlier ones.
+
+    Kept per item: the running mean of k_k * score (this is m_i), Welford
+    mean and M2 of the raw scores, the sum of the experts' tie-aware ranks
+    and the competence-weighted Borda points; plus the number of experts,
+    the sum of k_k and Kendall's tie correction sum.
+    """
+
+    FIELDS = ("weighted_mean", "score_mean", "score_m2", "rank_sums", "borda")
+
+    def __init__(self, items):
+        self.items = int(items)
+        self.count = 0
+        self.k_k_sum = 0.0
+        self.ties = 0.0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(self.items))
+
+    @classmethod
+    def from_state(cls, state):
+        accumulator = cls(state["items"])
+        accumulator.count = int(state["count"])
+        accumulator.k_k_sum = float(state["k_k_sum"])
+        accumulator.ties = float(state["ties"])
+        for name in cls.FIELDS:
+            setattr(accumulator, name, np.asarray(state[name], dtype=float))
+        return accumulator
+
+    def state(self):
+        state = {
+            "items": self.items,
+            "count": self.count,
+            "k_k_sum": self.k_k_sum,
+            "ties": self.ties,
+        }
+        for name in self.FIELDS:
+            state[name] = getattr(self, name).tolist()
+        return state
+
+    def add(self, competence_row, scores):
+        """Add one expert: competence row and one score per item"""
+        scores = to_table([scores])[0]
+        if scores.size != self.items:
+            raise ValueError(
+                f"Очікувалося {self.items} оцінок експерта, отримано {scores.size}"
+            )
+        k_a, k_k = competence(competence_row)
+        ranks, ties = average_ranks(scores)
+
+        self.count += 1
+        # Welford: середнє і сума квадратів відхилень без зберігання рядків
+        self.weighted_mean += (k_k * scores - self.weighted_mean) / self.count
+        delta = scores - self.score_mean
+        self.score_mean += delta / self.count
+        self.score_m2 += delta * (scores - self.score_mean)
+
+        self.rank_sums += ranks[0]
+        self.ties += float(ties[0])
+        self.borda += k_k * (self.items - ranks[0])
+        self.k_k_sum += k_k
+        return k_a, k_k
+
+    def result(self):
+        """m_i, r_i, lambda, Kendall's W and Borda from the running state"""
+        if not self.count:
+            raise ValueError("Файл не містить жодного експерта")
+        m, n = self.count, self.items
+        m_i = self.weighted_mean.copy()
+        r_i = average_ranks(m_i)[0][0]
+        result = _kendall(self.rank_sums.copy(), m, self.ties)
+
+        # Нульова сумарна компетентність - рівні ваги, як в aggregate_rankings
+        borda = self.borda if self.k_k_sum > 0 else m * n - self.rank_sums
+        result.update(
+            m_i=m_i,
+            r_i=r_i,
+            lambda_values=2 * (n + 1 - r_i) / (n * (n + 1)),
+            borda={"scores": borda.copy(), "order": np.argsort(-borda, kind="stable")},
+            score_mean=self.score_mean.copy(),
+            score_std=np.sqrt(self.score_m2 / m),
+            experts=m,
+        )
+        return result
@@ -423,6 +423,50 @@ class ExpertsExcelExporter:
                 adjusted_width = min(max_length + 2, 20)
                 ws.column_dimensions[column_letter].width = adjusted_width
 
+    def create_aggregation_sheet(self, analysis_data):
+        aggregation = analysis_data.get("aggregation")
+        if not aggregation:
+            return
+        ws = self.workbook.create_sheet("Агрегування")
+        name_research = analysis_data.get("name_research", [])
+
+        # Header
+        ws["A1"] = "Агрегування ранжувань"
+        self.set_header_style(ws["A1"])
+        ws.merge_cells(
+            start_row=1, start_column=1, end_row=1, end_column=len(name_research) + 2
+        )
+
+        headers = ["Метод"] + list(name_research) + ["Ранжування"]
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=3, column=col, value=header)
+            self.set_subheader_style(cell)
+
+        for offset, row in enumerate(aggregation):
+            row_num = 4 + offset
+            cell = ws.cell(row=row_num, column=1, value=row["method"])
+            self.set_subheader_style(cell)
+            for col, score in enumerate(row["scores"], 2):
+                self.set_number_style(ws.cell(row=row_num, column=col), score)
+            cell = ws.cell(row=row_num, column=len(headers), value=row["ranking"])
+            self.set_data_style(cell)
+
+        # Auto-adjust column widths
+        for column in ws.columns:
+            max_length = 0
+            column_letter = None
+            for cell in column:
+                try:
+                    if column_letter is None and hasattr(cell, "column_letter"):
+                        column_letter = cell.column_letter
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except (TypeError, ValueError, AttributeError):
+                    pass
+            if column_letter:
+                adjusted_width = min(max_length + 2, 50)
+                ws.column_dimensions[column_letter].width = adjusted_width
+
     def create_conclusion_sheet(self, analysis_data):
         ws = self.workbook.create_sheet("Висновки")
 
@@ -441,6 +485,28 @@ class ExpertsExcelExporter:
         ws.merge_cells("A4:D4")
         self.set_row_height_for_text(ws, 4, rank_str)
 
+        # Узгодженість думок експертів
+        agreement = analysis_data.get("concordance")
+        if agreement and agreement.get("W") is not None:
+            ws["A6"] = "Узгодженість експертів:"
+            self.set_subheader_style(ws["A6"])
+            rows = [
+                ("Коефіцієнт конкордації W", agreement["W"]),
+                ("χ²", agreement["chi2"]),
+                ("Ступені свободи", agreement["df"]),
+                ("p", agreement["p_value"]),
+                (
+                    "Висновок",
+                    "узгоджені" if agreement["significant"] else "не узгоджені",
+                ),
+            ]
+            for offset, (label, value) in enumerate(rows):
+                row = 7 + offset
+                ws[f"A{row}"] = label
+                ws[f"B{row}"] = value
+                self.set_data_style(ws[f"A{row}"])
+                self.set_data_style(ws[f"B{row}"])
+
         # Auto-adjust column widths
         for column in ws.columns:
             max_length = 0
@@ -465,6 +531,7 @@ class ExpertsExcelExporter:
         self.create_competency_sheet(analysis_data)
         self.create_experts_data_sheet(analysis_data)
         self.create_ranking_sheet(analysis_data)
+        self.create_aggregation_sheet(analysis_data)
         self.create_chart_sheet(analysis_data)
         self.create_conclusion_sheet(analysis_data)
 
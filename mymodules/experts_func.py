@@ -1,38 +1,87 @@
-def make_table(num_experts, num_research, original_table):
-    new_table = []
-    for _ in range(num_experts):
-        expert_sublist = []
-        for _ in range(num_research):
-            expert_sublist.append(original_table.pop(0))
-        new_table.append(expert_sublist)
+import numpy as np
 
-    return new_table
+from mymodules.experts_engine import (
+    to_table,
+    average_ranks,
+    experts_analysis,
+    plain_ranks,
+)
 
 
-def make_m_i(k_k, experts_data_table, num_experts, num_research):
-    m_i = []
-    for i in range(num_research):
-        tmp_value = 0
-        for j in range(num_experts):
-            tmp_value += float(k_k[j]) * float(experts_data_table[j][i])
-        tmp_value /= num_experts
-        m_i.append(tmp_value)
+def make_table(num_experts, num_research, original_table):
+    return [
+        list(original_table[i * num_research : (i + 1) * num_research])
+        for i in range(num_experts)
+    ]
 
-    return m_i
+
+def make_m_i(k_k, experts_data_table, num_experts, num_research):
+    values = to_table(experts_data_table)[:num_experts, :num_research]
+    return (np.asarray(k_k[:num_experts], dtype=float) @ values / num_experts).tolist()
 
 
 def make_r_i(m_i):
-    sorted_m_i = sorted(m_i)[::-1]
-    r_i = [sorted_m_i.index(x) + 1 for x in m_i]
-    return r_i
+    # Рівні значення отримують середній ранг
+    return plain_ranks(average_ranks(m_i)[0][0])
 
 
 def make_lambda(num_research, r_i):
-    lambda_values = []
-    for i in range(num_research):
-        tmp_value = 2 * (((num_research + 1) - r_i[i]) / (num_research * (num_research + 1)))
-        lambda_values.append(tmp_value)
-    return lambda_values
+    r_i = np.asarray(r_i, dtype=float)
+    lambda_values = 2 * ((num_research + 1) - r_i) / (num_research * (num_research + 1))
+    return lambda_values.tolist()
+
+
+def analyze_experts(k_k, experts_data_table):
+    """
+    m_i, r_i, λ і узгодженість експертів (коефіцієнт конкордації Кендалла)
+    за один прохід; значення - списки та числа, придатні для JSON.
+    """
+    result = experts_analysis(k_k, experts_data_table)
+    return {
+        "m_i": result["m_i"].tolist(),
+        "r_i": plain_ranks(result["r_i"]),
+        "l_value": result["lambda_values"].tolist(),
+        "concordance": {
+            "W": result["W"],
+            "chi2": result["chi2"],
+            "df": result["df"],
+            "p_value": result["p_value"],
+            "significant": bool(result["significant"]),
+        },
+        "aggregation": {
+            method: {
+                key: value.tolist() if isinstance(value, np.ndarray) else value
+                for key, value in values.items()
+            }
+            for method, values in result["aggregation"].items()
+        },
+    }
+
+
+AGGREGATION_METHODS = {
+    "borda": "Борда",
+    "copeland": "Копленд",
+    "kemeny": "Кемені (наближено)",
+}
+
+
+def aggregation_rows(aggregation, name_research):
+    """
+    Рядки таблиці агрегування: назва методу, ранжування ("A > B = C"),
+    бали кожного напрямку досліджень у порядку name_research.
+    """
+    rows = []
+    for method, title in AGGREGATION_METHODS.items():
+        if method not in aggregation:
+            continue
+        scores = aggregation[method]["scores"]
+        order = aggregation[method]["order"]
+        ranking = name_research[order[0]]
+        for prev, cur in zip(order, order[1:]):
+            ranking += " = " if scores[prev] == scores[cur] else " > "
+            ranking += name_research[cur]
+        rows.append({"method": title, "ranking": ranking, "scores": scores})
+    return rows
 
 
 def rank_results(r_i, m_i, name_research):
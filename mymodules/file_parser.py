@@ -1,5 +1,5 @@
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -100,11 +100,7 @@ class FileParser:
             in_matrix = False
 
             for _, row in df.iterrows():
-                row_values = [
-                    str(val).strip()
-                    for val in row.values
-                    if str(val).strip() != "" and str(val).strip().lower() != "nan"
-                ]
+                label, row_values = self._split_row(row)
 
                 if not row_values:
                     # Empty row - end current matrix if we're in one
@@ -123,11 +119,11 @@ class FileParser:
 
                 if all_names and len(row_values) >= 2:
                     # This is a header row with names
-                    print(f"DEBUG: Found header row: {row_values}")
+                    logger.debug("Found header row: %s", row_values)
                     if in_matrix and current_matrix:
                         # End current matrix and start new one
-                        print(
-                            f"DEBUG: Ending current matrix with {len(current_matrix)} rows"
+                        logger.debug(
+                            "Ending current matrix with %d rows", len(current_matrix)
                         )
                         matrices.append(
                             {"names": current_names, "matrix": current_matrix}
@@ -135,14 +131,14 @@ class FileParser:
                     current_names = row_values
                     in_matrix = True
                     current_matrix = []
-                    print(f"DEBUG: Started new matrix with names: {current_names}")
+                    logger.debug("Started new matrix with names: %s", current_names)
                 elif (
                     in_matrix
                     and len(row_values) == len(current_names)
                     and not all_names
                 ):
                     # This is a data row
-                    print(f"DEBUG: Found data row: {row_values}")
+                    logger.debug("Found data row: %s", row_values)
                     matrix_row = []
                     for val in row_values:
                         if self._is_numeric(val):
@@ -151,8 +147,8 @@ class FileParser:
                             # Skip non-numeric values in data rows
                             matrix_row.append(1.0)
                     current_matrix.append(matrix_row)
-                    print(
-                        f"DEBUG: Added row to matrix, total rows: {len(current_matrix)}"
+                    logger.debug(
+                        "Added row to matrix, total rows: %d", len(current_matrix)
                     )
                 elif in_matrix and len(row_values) != len(current_names):
                     # End of current matrix due to size mismatch
@@ -216,37 +212,22 @@ class FileParser:
 
             # Look for names in first row and first column
             for _, row in df.iterrows():
-                row_values = [
-                    str(val).strip()
-                    for val in row.values
-                    if str(val).strip() != "" and str(val).strip().lower() != "nan"
-                ]
+                label, row_values = self._split_row(row)
                 if not row_values:
                     continue
 
                 # Check if this row has names (non-numeric values)
                 has_names = any(not self._is_numeric(val) for val in row_values)
 
-                if has_names and not alternative_names:
+                if has_names and not condition_names and not matrix_data:
                     # This is likely the header row
-                    alternative_names = [
-                        val for val in row_values[1:] if not self._is_numeric(val)
-                    ]
-                    condition_names = [
-                        val for val in row_values[1:] if not self._is_numeric(val)
-                    ]
-                elif not has_names and len(row_values) > 1:
-                    # This is a data row
-                    row_name = (
-                        row_values[0]
-                        if not self._is_numeric(row_values[0])
-                        else f"Row {len(matrix_data) + 1}"
-                    )
-                    if not alternative_names:
-                        alternative_names.append(row_name)
+                    condition_names = row_values
+                elif not has_names:
+                    # This is a data row, its label is the alternative name
+                    alternative_names.append(label or f"Row {len(matrix_data) + 1}")
 
                     matrix_row = []
-                    for val in row_values[1:]:
+                    for val in row_values:
                         if self._is_numeric(val):
                             matrix_row.append(self._convert_to_float(val))
                         else:
@@ -290,35 +271,35 @@ class FileParser:
         try:
             matrix_data = []
             alternative_names = []
+            row_labels = []
 
             # Find the matrix data
             for _, row in df.iterrows():
-                row_values = [
-                    str(val).strip()
-                    for val in row.values
-                    if str(val).strip() != "" and str(val).strip().lower() != "nan"
-                ]
+                label, row_values = self._split_row(row)
                 if not row_values:
                     continue
 
                 # Check if this row has names
                 has_names = any(not self._is_numeric(val) for val in row_values)
 
-                if has_names and not alternative_names:
+                if has_names and not alternative_names and not matrix_data:
                     # Header row
-                    alternative_names = [
-                        val for val in row_values[1:] if not self._is_numeric(val)
-                    ]
-                elif not has_names and len(row_values) > 1:
+                    alternative_names = row_values
+                elif not has_names:
                     # Data row
+                    row_labels.append(label)
                     matrix_row = []
-                    for val in row_values[1:]:
+                    for val in row_values:
                         if self._is_numeric(val):
                             matrix_row.append(int(self._convert_to_float(val)))
                         else:
                             matrix_row.append(0)
                     matrix_data.append(matrix_row)
 
+            # Without a header row the alternatives are named by row labels
+            if not alternative_names and all(row_labels):
+                alternative_names = row_labels
+
             # Validate dimensions
             validation_result = self._validate_binary_data(
                 matrix_data, expected_alternatives
@@ -344,35 +325,39 @@ class FileParser:
     def _parse_experts_file(
         self, df: pd.DataFrame, expected_alternatives: int
     ) -> Dict[str, Any]:
-        """Parse experts evaluation file"""
+        """
+        Parse experts evaluation file: an optional competency block (experts x
+        arguments) followed by the evaluation block (experts x objects), each
+        starting with its own header row
+        """
         try:
-            matrix_data = []
-            alternative_names = []
+            blocks = []
 
-            # Similar to binary parsing but for experts data
             for _, row in df.iterrows():
-                row_values = [
-                    str(val).strip()
-                    for val in row.values
-                    if str(val).strip() != "" and str(val).strip().lower() != "nan"
-                ]
+                label, row_values = self._split_row(row)
                 if not row_values:
                     continue
 
                 has_names = any(not self._is_numeric(val) for val in row_values)
 
-                if has_names and not alternative_names:
-                    alternative_names = [
-                        val for val in row_values[1:] if not self._is_numeric(val)
-                    ]
-                elif not has_names and len(row_values) > 1:
-                    matrix_row = []
-                    for val in row_values[1:]:
-                        if self._is_numeric(val):
-                            matrix_row.append(self._convert_to_float(val))
-                        else:
-                            matrix_row.append(0.0)
-                    matrix_data.append(matrix_row)
+                if has_names:
+                    # Header row starts a new block
+                    blocks.append({"names": row_values, "labels": [], "matrix": []})
+                else:
+                    if not blocks:
+                        blocks.append({"names": [], "labels": [], "matrix": []})
+                    blocks[-1]["labels"].append(label)
+                    blocks[-1]["matrix"].append(
+                        [self._convert_to_float(val) for val in row_values]
+                    )
+
+            blocks = [block for block in blocks if block["matrix"]]
+            evaluation = (
+                blocks[-1] if blocks else {"names": [], "labels": [], "matrix": []}
+            )
+            competency = blocks[0] if len(blocks) > 1 else None
+            alternative_names = evaluation["names"]
+            matrix_data = evaluation["matrix"]
 
             validation_result = self._validate_experts_data(
                 matrix_data, expected_alternatives
@@ -382,7 +367,10 @@ class FileParser:
                 "success": validation_result["success"],
                 "error": validation_result.get("error", ""),
                 "alternative_names": alternative_names,
+                "expert_names": evaluation["labels"],
                 "matrix": matrix_data,
+                "competency_names": competency["names"] if competency else [],
+                "competency": competency["matrix"] if competency else [],
                 "validation": validation_result,
             }
 
@@ -395,6 +383,19 @@ class FileParser:
                 "matrix": [],
             }
 
+    def _split_row(self, row: pd.Series) -> Tuple[str, List[str]]:
+        """
+        Split a sheet row into its label (first cell, when it is not a number)
+        and the remaining non-empty cells, so that labelled data rows and
+        header rows with an empty corner cell keep their positions
+        """
+        values = [str(val).strip() for val in row.values]
+        values = ["" if val.lower() == "nan" else val for val in values]
+        label = ""
+        if values and not self._is_numeric(values[0]):
+            label, values = values[0], values[1:]
+        return label, [val for val in values if val != ""]
+
     def _is_numeric(self, value: str) -> bool:
         """Check if a string represents a numeric value (including fractions)"""
         if not value or value.strip() == "":
@@ -452,6 +453,11 @@ class FileParser:
             errors.append("No matrices found in file")
             return {"success": False, "error": "; ".join(errors)}
 
+        # Sizes that were not given are taken from the file itself
+        expected_criteria = expected_criteria or len(matrices[0]["names"])
+        if not expected_alternatives and len(matrices) > 1:
+            expected_alternatives = len(matrices[1]["names"])
+
         # Check criteria matrix (first matrix)
         if len(matrices) < 1:
             errors.append("Criteria comparison matrix not found")
@@ -504,12 +510,16 @@ class FileParser:
             errors.append("No matrix data found")
             return {"success": False, "error": "; ".join(errors)}
 
+        # Sizes that were not given are taken from the file itself
+        expected_alternatives = expected_alternatives or len(matrix)
+        expected_conditions = expected_conditions or len(matrix[0])
+
         if len(matrix) != expected_alternatives:
             errors.append(
                 f"Expected {expected_alternatives} alternatives, found {len(matrix)}"
             )
 
-        if matrix and len(matrix[0]) != expected_conditions:
+        if any(len(row) != expected_conditions for row in matrix):
             errors.append(
                 f"Expected {expected_conditions} conditions, found {len(matrix[0])}"
             )
@@ -530,12 +540,14 @@ class FileParser:
             errors.append("No matrix data found")
             return {"success": False, "error": "; ".join(errors)}
 
+        expected_alternatives = expected_alternatives or len(matrix)
+
         if len(matrix) != expected_alternatives:
             errors.append(
                 f"Expected {expected_alternatives} alternatives, found {len(matrix)}"
             )
 
-        if matrix and len(matrix[0]) != expected_alternatives:
+        if any(len(row) != expected_alternatives for row in matrix):
             errors.append(
                 f"Matrix should be {expected_alternatives}x{expected_alternatives}"
             )
@@ -556,11 +568,14 @@ class FileParser:
             errors.append("No matrix data found")
             return {"success": False, "error": "; ".join(errors)}
 
-        if len(matrix) != expected_alternatives:
+        if expected_alternatives and len(matrix) != expected_alternatives:
             errors.append(
                 f"Expected {expected_alternatives} alternatives, found {len(matrix)}"
             )
 
+        if any(len(row) != len(matrix[0]) for row in matrix):
+            errors.append("Evaluation rows have different lengths")
+
         return {
             "success": len(errors) == 0,
             "error": "; ".join(errors) if errors else "",
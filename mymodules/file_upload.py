@@ -1,8 +1,12 @@
+import csv
+import io
 import os
 import pandas as pd
 import openpyxl
 from werkzeug.utils import secure_filename
 from flask import current_app
+from mymodules.uncertainty import stream_criteria
+from mymodules.experts_engine import ExpertsAccumulator
 
 
 class FileUploadError(Exception):
@@ -1845,6 +1849,119 @@ def extract_hurwitz_matrix(data, num_alternatives, num_conditions):
     }
 
 
+def process_large_matrix_file(
+    file, criterion, matrix_type="profit", alpha=0.5, top_k=10, upload_folder="uploads"
+):
+    """
+    Stream a very large CSV cost matrix and evaluate one uncertainty criterion
+
+    Args:
+        file: Uploaded CSV file object (header row + names column)
+        criterion: "laplace", "wald", "savage" or "hurwitz"
+        matrix_type: "profit" or "cost"
+        alpha: Hurwitz optimism coefficient
+        top_k: Number of best alternatives to return
+        upload_folder: Folder to save uploaded files
+
+    Returns:
+        dict: {'success': bool, 'alternatives': int, 'conditions': int,
+               'best': str, 'top': list, 'stats': dict, 'error': str}
+    """
+    if not file.filename.lower().endswith(".csv"):
+        return {"success": False, "error": "Large matrix mode supports CSV only"}
+
+    file_path = save_uploaded_file(file, upload_folder)
+    try:
+        result = stream_criteria(
+            file_path,
+            matrix_type=matrix_type,
+            alpha=alpha,
+            top_k=top_k,
+            chunk_rows=current_app.config.get("LARGE_MATRIX_CHUNK_ROWS", 2048),
+            workdir=upload_folder,
+        )
+    except Exception as e:
+        return {"success": False, "error": f"Error processing file: {str(e)}"}
+    finally:
+        cleanup_file(file_path)
+
+    names = result["names"]
+    summary = result["criteria"][criterion]
+    return {
+        "success": True,
+        "alternatives": result["alternatives"],
+        "conditions": result["conditions"],
+        "matrix_type": matrix_type,
+        "best": names[summary["best"]],
+        "top": [{"name": names[i], "value": value} for i, value in summary["top"]],
+        "stats": summary["stats"],
+        "error": None,
+    }
+
+
+def process_experts_stream(file, competence_columns, state=None, names=None):
+    """
+    Read an experts CSV one row at a time and fold every expert into the
+    running statistics, without keeping the rows
+
+    Args:
+        file: Uploaded CSV file object. Header: competence columns, then
+              the research directions; one row per expert
+        competence_columns: Number of competence columns (familiarity and
+                            argument sources)
+        state: ExpertsAccumulator state of an existing study to append to
+        names: Research directions of that study (must match the header)
+
+    Returns:
+        dict: {'success': bool, 'names': list, 'state': dict,
+               'added': int, 'error': str}
+    """
+    if not file.filename.lower().endswith(".csv"):
+        return {"success": False, "error": "Потокове завантаження підтримує лише CSV"}
+
+    text = io.TextIOWrapper(file.stream, encoding="utf-8-sig", newline="")
+    header_line = text.readline()
+    separator = max((",", ";", "\t", "|"), key=header_line.count)
+    header = next(csv.reader([header_line], delimiter=separator), [])
+    items = [name.strip() for name in header[competence_columns:]]
+
+    if not items:
+        return {"success": False, "error": "У заголовку немає напрямків досліджень"}
+    if names is not None and items != list(names):
+        return {
+            "success": False,
+            "error": "Напрямки досліджень у файлі не збігаються з дослідженням",
+        }
+
+    accumulator = (
+        ExpertsAccumulator.from_state(state)
+        if state
+        else ExpertsAccumulator(len(items))
+    )
+    added = 0
+    for number, row in enumerate(csv.reader(text, delimiter=separator), start=2):
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        if separator != ",":
+            cells = [cell.replace(",", ".") for cell in cells]
+        try:
+            accumulator.add(cells[:competence_columns], cells[competence_columns:])
+        except ValueError as e:
+            return {"success": False, "error": f"Рядок {number}: {e}"}
+        added += 1
+
+    if not added:
+        return {"success": False, "error": "Файл не містить жодного експерта"}
+    return {
+        "success": True,
+        "names": items,
+        "state": accumulator.state(),
+        "added": added,
+        "error": None,
+    }
+
+
 def process_experts_file(file, num_experts, num_alternatives, upload_folder="uploads"):
     """
     Process uploaded file specifically for experts evaluation analysis
@@ -1,7 +1,22 @@
 import operator
 from fractions import Fraction
+import numpy as np
 from graphviz import Digraph
-from jinja2.runtime import Undefined
+from mymodules.ahp_engine import (
+    parse_values,
+    fill_reciprocal,
+    complete_matrices,
+    to_stack,
+    geometric_mean_vectors,
+    normalize,
+    consistency,
+    evaluate,
+    global_priorities,
+    update_judgment,
+    weight_sensitivity,
+    inconsistent_judgments,
+    saaty_label,
+)
 
 
 def convert_to_fraction(value, precision=0.001):
@@ -22,6 +37,11 @@ def convert_to_fraction(value, precision=0.001):
             elif abs(value) < precision:
                 return "0"
 
+            # Значення шкали Сааті - без арифметики дробів
+            label = saaty_label(value)
+            if label is not None:
+                return label
+
             # Convert to fraction
             frac = Fraction(value).limit_denominator(1000)
 
@@ -38,412 +58,114 @@ def convert_to_fraction(value, precision=0.001):
 
 
 # Створення списку з матриць по рівнях
-def do_matrix(krit=0, matrix=0, criteria=0, num_alt=0):
-    print(
-        f"[DEBUG] do_matrix called with krit={krit}, criteria={criteria}, "
-        f"num_alt={num_alt}"
-    )
-    matrix_len = len(matrix) if hasattr(matrix, "__len__") else "N/A"
-    print(f"[DEBUG] matrix type: {type(matrix)}, length: {matrix_len}")
-    print(f"[DEBUG] matrix content: {matrix}")
-
-    def process_matrix_element(matr, i, j):
-        print(f"[DEBUG] process_matrix_element called with i={i}, j={j}")
-        matr_len = len(matr) if hasattr(matr, "__len__") else "N/A"
-        print(f"[DEBUG] matr type: {type(matr)}, length: {matr_len}")
-        print(f"[DEBUG] matr[j] type: {type(matr[j])}, value: {matr[j]}")
-        print(f"[DEBUG] Full matr structure: {matr}")
-
-        if not isinstance(matr[j], list):
-            error_msg = f"matr[{j}] is not a list: {matr[j]}, " f"type: {type(matr[j])}"
-            print(f"[ERROR] {error_msg}")
-            print(f"[ERROR] Full matrix structure at error point: {matr}")
-            print(f"[ERROR] Matrix indices: i={i}, j={j}")
-            raise ValueError(f"matr[{j}] is not a list")
-
-        value = matr[j][i]
-        print(f"[DEBUG] Current value: {value}, type: {type(value)}")
-
-        # Если значение пустое или Undefined — ставим 1.0 по умолчанию
-        if value is None or isinstance(value, Undefined) or str(value).strip() == "":
-            matr[i][j] = 1.0
-            print(f"[DEBUG] Empty value, setting matr[{i}][{j}] = 1.0")
-            return
-
-        # Обрабатываем значение как float
-        try:
-            if isinstance(value, str):
-                if "/" in value:
-                    frac = Fraction(value)
-                    result = float(frac)
-                    matr[i][j] = result
-                    matr[j][i] = 1.0 / result if result != 0 else 1.0
-                    print(
-                        f"[DEBUG] Fraction {value} -> {result}, setting matr[{i}][{j}] = {result}, matr[{j}][{i}] = {1.0/result if result != 0 else 1.0}"
-                    )
-                else:
-                    n = float(value)
-                    if n == 0:
-                        matr[i][j] = 1.0
-                        matr[j][i] = 1.0
-                        print(
-                            f"[DEBUG] Zero value, setting matr[{i}][{j}] = 1.0, matr[{j}][{i}] = 1.0"
-                        )
-                    elif n >= 1:
-                        result = 1.0 / n
-                        matr[i][j] = result
-                        matr[j][i] = n
-                        print(
-                            f"[DEBUG] Value {n} >= 1, setting matr[{i}][{j}] = 1/{n} = {result}, matr[{j}][{i}] = {n}"
-                        )
-                    else:
-                        matr[i][j] = n
-                        matr[j][i] = 1.0 / n if n != 0 else 1.0
-                        print(
-                            f"[DEBUG] Value {n} < 1, setting matr[{i}][{j}] = {n}, matr[{j}][{i}] = {1.0/n if n != 0 else 1.0}"
-                        )
-            else:
-                # Если уже число, конвертируем в float
-                n = float(value)
-                if n == 0:
-                    matr[i][j] = 1.0
-                    matr[j][i] = 1.0
-                    print(
-                        f"[DEBUG] Zero value, setting matr[{i}][{j}] = 1.0, matr[{j}][{i}] = 1.0"
-                    )
-                elif n >= 1:
-                    result = 1.0 / n
-                    matr[i][j] = result
-                    matr[j][i] = n
-                    print(
-                        f"[DEBUG] Value {n} >= 1, setting matr[{i}][{j}] = 1/{n} = {result}, matr[{j}][{i}] = {n}"
-                    )
-                else:
-                    matr[i][j] = n
-                    matr[j][i] = 1.0 / n if n != 0 else 1.0
-                    print(
-                        f"[DEBUG] Value {n} < 1, setting matr[{i}][{j}] = {n}, matr[{j}][{i}] = {1.0/n if n != 0 else 1.0}"
-                    )
-        except (ValueError, TypeError) as e:
-            print(f"[WARNING] Failed to process value {value}: {e}, using 1.0")
-            matr[i][j] = 1.0
-            matr[j][i] = 1.0
-
-    matr = []
+def do_matrix(krit=0, matrix=0, criteria=0, num_alt=0, incomplete=False):
+    # incomplete - пропущені судження добудовуються методом найменших квадратів
+    missing = np.nan if incomplete else 1.0
     if krit:
-        print("[DEBUG] Processing criteria matrix (krit=1)")
-        print(f"[DEBUG] Input matrix: {matrix}")
-        print(f"[DEBUG] Criteria count: {criteria}")
-
-        # Преобразуем в матрицу float чисел
-        matr = []
-        for i in range(criteria):
-            row = []
-            for j in range(criteria):
-                idx = i * criteria + j
-                if idx < len(matrix):
-                    try:
-                        row.append(float(matrix[idx]))
-                    except (ValueError, TypeError):
-                        row.append(1.0)
-                else:
-                    row.append(1.0)
-            matr.append(row)
-
-        print(f"[DEBUG] Created matr: {matr}")
-        dims = f"{len(matr)}x{len(matr[0]) if matr else 'N/A'}"
-        print(f"[DEBUG] Matrix dimensions: {dims}")
-
-        # Process only lower triangular part to set reciprocal values
-        for i in range(len(matr)):
-            for j in range(len(matr[i])):
-                if i > j:
-                    pos = f"({i}, {j})"
-                    msg = f"[DEBUG] About to process element at position {pos}"
-                    print(msg)
-                    # Get the original value from upper triangular position
-                    original_value = matr[j][i]
-                    print(f"[DEBUG] Original value at ({j},{i}): {original_value}")
-
-                    # Set the reciprocal value in lower triangular position
-                    if original_value != 0:
-                        reciprocal_value = 1.0 / original_value
-                        matr[i][j] = reciprocal_value
-                        print(
-                            f"[DEBUG] Setting reciprocal at ({i},{j}): {reciprocal_value}"
-                        )
-                    else:
-                        matr[i][j] = 1.0
-                        print(f"[DEBUG] Zero original value, setting ({i},{j}): 1.0")
+        stack = fill_reciprocal(parse_values(matrix, 1, criteria, missing))
     else:
-        print("[DEBUG] Processing alternatives matrix (krit=0)")
-        print(f"[DEBUG] Total matrix elements: {len(matrix)}")
-        print(f"[DEBUG] Expected elements per matrix: {num_alt * num_alt}")
-        print(f"[DEBUG] Number of criteria: {criteria}")
-        for i in range(criteria):
-            print(f"[DEBUG] Creating matrix for criterion {i}")
-            new_matrix = []
-            for row_idx in range(num_alt):
-                row = []
-                for col_idx in range(num_alt):
-                    idx = i * num_alt * num_alt + row_idx * num_alt + col_idx
-                    if idx < len(matrix):
-                        try:
-                            value = float(matrix[idx])
-                            row.append(value)
-                            if i in [1, 4]:  # Debug matrices 2 and 5 (0-indexed)
-                                print(
-                                    f"[DEBUG] Matrix {i+1}, pos ({row_idx},{col_idx}): {matrix[idx]} -> {value}"
-                                )
-                        except (ValueError, TypeError):
-                            row.append(1.0)
-                            if i in [1, 4]:
-                                print(
-                                    f"[DEBUG] Matrix {i+1}, pos ({row_idx},{col_idx}): {matrix[idx]} -> 1.0 (conversion error)"
-                                )
-                    else:
-                        row.append(1.0)
-                        if i in [1, 4]:
-                            print(
-                                f"[DEBUG] Matrix {i+1}, pos ({row_idx},{col_idx}): index {idx} out of range -> 1.0"
-                            )
-                new_matrix.append(row)
-            matr.append(new_matrix)
-            if i in [1, 4]:  # Debug matrices 2 and 5
-                print(f"[DEBUG] Final matrix {i+1}: {new_matrix}")
-
-        print(f"[DEBUG] Final matr structure: {matr}")
-        # Змінюємо елементи нижньої трикутної матриці
-        for m_idx, m in enumerate(matr):
-            print(f"[DEBUG] Processing matrix {m_idx}: {m}")
-            m_type = type(m)
-            m_len = len(m) if hasattr(m, "__len__") else "N/A"
-            print(f"[DEBUG] Matrix {m_idx} type: {m_type}, length: {m_len}")
-            for i in range(len(m)):
-                for j in range(len(m[i])):
-                    if i > j:
-                        pos = f"matrix {m_idx}, position ({i}, {j})"
-                        msg = (
-                            f"[DEBUG] About to process alternatives "
-                            f"element at {pos}"
-                        )
-                        print(msg)
-                        original_value = m[j][i]
-                        print(f"[DEBUG] Original value at ({j},{i}): {original_value}")
-
-                        # Set the reciprocal value in lower triangular position
-                        if original_value != 0:
-                            reciprocal_value = 1.0 / original_value
-                            m[i][j] = reciprocal_value
-                            print(
-                                f"[DEBUG] Setting reciprocal at ({i},{j}): {reciprocal_value}"
-                            )
-                        else:
-                            m[i][j] = 1.0
-                            print(
-                                f"[DEBUG] Zero original value, setting ({i},{j}): 1.0"
-                            )
-
-    return matr
+        stack = fill_reciprocal(parse_values(matrix, criteria, num_alt, missing))
+    if incomplete:
+        stack = complete_matrices(stack)
+    # Змінюємо елементи нижньої трикутної матриці
+    return stack[0].tolist() if krit else stack.tolist()
+
+
+def _stack(krit, matr):
+    # Матриця критеріїв - одна матриця, матриці альтернатив - стек по критеріях
+    return to_stack(matr if not krit else [matr])
 
 
 # Оцінки компонент власного вектора
 def do_comp_vector(krit=0, criteria=0, matr=0, num_alt=0):
-    comp_vector = [[] for _ in range(criteria)] if krit == 0 else []
-    if krit:
-        for c in range(criteria):
-            dob = 1
-            for num in matr[c]:
-                try:
-                    # Теперь matr содержит float числа, не нужно eval
-                    dob *= float(num)
-                except Exception as e:
-                    print(f"ERROR: Failed to convert '{num}' to float: {e}")
-                    raise e
-            result = dob ** (1 / criteria)
-            comp_vector.append(result)
-    else:
-        for count in range(criteria):
-            for c in range(num_alt):
-                dob = 1
-                for num in matr[count][c]:
-                    try:
-                        # Теперь matr содержит float числа, не нужно eval
-                        dob *= float(num)
-                    except Exception as e:
-                        print(f"ERROR: Failed to convert '{num}' to float: {e}")
-                        raise e
-                result = dob ** (1 / num_alt)
-                comp_vector[count].append(result)
-
-    return comp_vector
+    comp_vector = geometric_mean_vectors(_stack(krit, matr))
+    return comp_vector[0].tolist() if krit else comp_vector.tolist()
 
 
 # Нормалізовані оцінки вектора пріоритету
 def do_norm_vector(krit=0, comp_vector=0, criteria=0, num_alt=0):
-    norm_vector = [] if krit else [[] for _ in range(criteria)]
-    if krit:
-        for c in range(criteria):
-            try:
-                result = comp_vector[c] / sum(comp_vector)
-                norm_vector.append(result)
-            except Exception as e:
-                print(f"ERROR: Division failed for criteria {c}: {e}")
-                raise e
-    else:
-        for i in range(criteria):
-            norm_vector[i] = []
-            for c in range(num_alt):
-                try:
-                    result = comp_vector[i][c] / sum(comp_vector[i])
-                    norm_vector[i].append(result)
-                except Exception as e:
-                    print(
-                        f"ERROR: Division failed for criteria {i}, alternative {c}: {e}"
-                    )
-                    raise e
-
-    return norm_vector
+    norm_vector = normalize(np.asarray(comp_vector, dtype=float))
+    return norm_vector.tolist()
 
 
 # Сума по стовпцям
 def do_sum_col(krit=0, matr=0, criteria=0, num_alt=0):
-    sum_col = [] if krit else [[] for _ in range(criteria)]
-    if krit:
-        for i in range(criteria):
-            s = 0
-            for j in range(criteria):
-                try:
-                    # Теперь matr содержит float числа, не нужно eval
-                    s += float(matr[j][i])
-                except Exception as e:
-                    print(f"ERROR: Failed to convert '{matr[j][i]}' to float: {e}")
-                    raise e
-            sum_col.append(s)
-    else:
-        for c in range(criteria):
-            sum_col[c] = []
-            for i in range(num_alt):
-                column_sum = 0
-                for j in range(num_alt):
-                    try:
-                        # Теперь matr содержит float числа, не нужно eval
-                        column_sum += float(matr[c][j][i])
-                    except Exception as e:
-                        print(
-                            f"ERROR: Failed to convert '{matr[c][j][i]}' to float: {e}"
-                        )
-                        raise e
-                sum_col[c].append(column_sum)
-
-    return sum_col
+    sum_col = _stack(krit, matr).sum(axis=-2)
+    return sum_col[0].tolist() if krit else sum_col.tolist()
 
 
 # Добуток додатку по стовпцях і нормалізованої оцінки вектора пріоритету
 def do_prod_col(krit=0, criteria=0, sum_col=0, norm_vector=0, num_alt=0):
-    prod_col = [] if krit else [[] for _ in range(criteria)]
-    if krit:
-        for i in range(criteria):
-            try:
-                result = sum_col[i] * norm_vector[i]
-                prod_col.append(result)
-            except Exception as e:
-                print(f"ERROR: Multiplication failed for criteria {i}: {e}")
-                raise e
-    else:
-        for c in range(criteria):
-            prod_col[c] = []
-            for i in range(num_alt):
-                try:
-                    result = sum_col[c][i] * norm_vector[c][i]
-                    prod_col[c].append(result)
-                except Exception as e:
-                    print(
-                        f"ERROR: Multiplication failed for criteria {c}, alternative {i}: {e}"
-                    )
-                    raise e
-
-    return prod_col
+    prod_col = np.asarray(sum_col, dtype=float) * np.asarray(norm_vector, dtype=float)
+    return prod_col.tolist()
 
 
 # Разом (Lmax)
 def do_l_max(krit=0, prod_col=0, criteria=0):
-    l_max = [] if krit else [[] for _ in range(criteria)]
-    if krit:
-        try:
-            result = sum(prod_col)
-            l_max = [result]
-        except Exception as e:
-            print(f"ERROR: Sum failed for prod_col: {e}")
-            raise e
-    else:
-        for c in range(criteria):
-            try:
-                result = sum(prod_col[c])
-                l_max[c].append(result)
-            except Exception as e:
-                print(f"ERROR: Sum failed for criteria {c}: {e}")
-                raise e
-
-    return l_max
+    l_max = np.asarray(prod_col, dtype=float).sum(axis=-1)
+    return [float(l_max)] if krit else [[value] for value in l_max.tolist()]
 
 
 # Індекс узгодженості i Відношення узгодженості
 def do_consistency(krit=0, l_max=0, criteria=0, num_alt=0):
-    # Випадкова узгодженість
-    random_consistency = {
-        "1": 0,
-        "2": 0,
-        "3": 0.58,
-        "4": 0.9,
-        "5": 1.12,
-        "6": 1.24,
-        "7": 1.32,
-        "8": 1.41,
-        "9": 1.45,
-        "10": 1.49,
+    if krit:
+        index, relation = consistency(l_max[0], criteria)
+        return [float(index)], [float(relation)]
+
+    values = [item[0] for item in l_max]
+    index, relation = consistency(values, num_alt)
+    return (
+        [[value] for value in index.tolist()],
+        [[value] for value in relation.tolist()],
+    )
+
+
+# Усі оцінки рівня ієрархії за один прохід (у форматі, що зберігається в БД)
+def _single_result(result, k=0):
+    # Оцінки однієї матриці стеку у форматі матриці критеріїв
+    return {
+        "iterations": int(result["iterations"][k]),
+        "components_eigenvector": result["comp_vector"][k].tolist(),
+        "normalized_eigenvector": result["norm_vector"][k].tolist(),
+        "sum_col": result["sum_col"][k].tolist(),
+        "prod_col": result["prod_col"][k].tolist(),
+        "l_max": [float(result["l_max"][k])],
+        "index_consistency": [float(result["index_consistency"][k])],
+        "relation_consistency": [float(result["relation_consistency"][k])],
     }
-    index_consistency = [] if krit else [[] for _ in range(criteria)]
-    relation_consistency = [] if krit else [[] for _ in range(criteria)]
+
+
+def do_evaluate(krit=0, matr=0, mode="geometric", tol=1e-10):
+    result = evaluate(_stack(krit, matr), mode=mode, tol=tol)
     if krit:
-        if criteria >= 3:
-            try:
-                index_result = (l_max[0] - criteria) / (criteria - 1)
-                index_consistency.append(index_result)
-
-                relation_result = (
-                    index_consistency[0] / (random_consistency[str(criteria)])
-                ) * 100
-                relation_consistency.append(relation_result)
-            except Exception as e:
-                print(f"ERROR: Consistency calculation failed for criteria: {e}")
-                raise e
-        else:
-            index_consistency.append(0)
-            relation_consistency.append(0)
+        return _single_result(result)
+
+    return {
+        "iterations": result["iterations"].tolist(),
+        "components_eigenvector": result["comp_vector"].tolist(),
+        "normalized_eigenvector": result["norm_vector"].tolist(),
+        "sum_col": result["sum_col"].tolist(),
+        "prod_col": result["prod_col"].tolist(),
+        "l_max": [[value] for value in result["l_max"].tolist()],
+        "index_consistency": [
+            [value] for value in result["index_consistency"].tolist()
+        ],
+        "relation_consistency": [
+            [value] for value in result["relation_consistency"].tolist()
+        ],
+    }
 
-    else:
-        if num_alt >= 3:
-            for c in range(criteria):
-                try:
-                    index_result = (l_max[c][0] - num_alt) / (num_alt - 1)
-                    index_consistency[c].append(index_result)
-
-                    relation_result = (
-                        index_consistency[c][0] / (random_consistency[str(num_alt)])
-                    ) * 100
-                    relation_consistency[c].append(relation_result)
-                except Exception as e:
-                    print(
-                        f"ERROR: Consistency calculation failed for criteria {c}: {e}"
-                    )
-                    raise e
-        else:
-            for c in range(criteria):
-                index_consistency[c].append(0)
-                relation_consistency[c].append(0)
 
-    return index_consistency, relation_consistency
+# Зміна одного судження: перераховується лише матриця, що його містить
+def do_update_judgment(
+    krit=0, matr=0, index=0, i=0, j=0, value=1, mode="geometric", tol=1e-10
+):
+    matrix, result = update_judgment(
+        _stack(krit, matr), 0 if krit else index, i, j, value, mode=mode, tol=tol
+    )
+    updated = _single_result(result)
+    updated["comparison_matrix"] = matrix.tolist()
+    return updated
 
 
 # список для Нормалізованих оцінок вектора пріоритету (для висновку)
@@ -584,45 +306,56 @@ def do_ranj(krit=0, lst_norm_vector=0, criteria=0, g=0):
 
 # Глобальні пріоритети
 def do_global_prior(norm_vector=0, norm_vector_alt=0, num_alt=0):
-    print(f"[DEBUG] do_global_prior called with:")
-    print(f"[DEBUG] norm_vector: {norm_vector}, type: {type(norm_vector)}")
-    print(f"[DEBUG] norm_vector_alt: {norm_vector_alt}, type: {type(norm_vector_alt)}")
-    print(f"[DEBUG] num_alt: {num_alt}")
-
-    global_prior = []
-    for i in range(num_alt):
-        g_pr = 0
-        for j in range(len(norm_vector_alt)):
-            try:
-                print(f"[DEBUG] Processing criteria {j}, alternative {i}")
-                nv_j = norm_vector[j]
-                nv_alt_j = norm_vector_alt[j]
-                print(f"[DEBUG] norm_vector[{j}]: {nv_j}, type: {type(nv_j)}")
-                print(
-                    f"[DEBUG] norm_vector_alt[{j}]: {nv_alt_j}, "
-                    f"type: {type(nv_alt_j)}"
-                )
-
-                if isinstance(norm_vector_alt[j], list) and len(norm_vector_alt[j]) > i:
-                    product = norm_vector[j] * norm_vector_alt[j][i]
-                    g_pr += product
-                else:
-                    error_msg = (
-                        f"norm_vector_alt[{j}] is not a list or too short: "
-                        f"{norm_vector_alt[j]}"
-                    )
-                    print(f"[ERROR] {error_msg}")
-                    raise ValueError(f"norm_vector_alt[{j}] is not a list or too short")
-
-            except Exception as e:
-                error_msg = (
-                    f"Multiplication failed for criteria {j}, " f"alternative {i}: {e}"
-                )
-                print(f"ERROR: {error_msg}")
-                raise e
-        global_prior.append(g_pr)
-
-    return global_prior
+    local = [vector[:num_alt] for vector in norm_vector_alt]
+    if any(len(vector) < num_alt for vector in local):
+        raise ValueError("norm_vector_alt is not a list or too short")
+    weights = list(norm_vector)[: len(local)]
+    return global_priorities(weights, local).tolist()
+
+
+# Судження, що найбільше псують узгодженість (для підказок на сторінці результату)
+def do_inconsistency(krit=0, matr=0, norm_vector=0, top=3):
+    stack = _stack(krit, matr)
+    vectors = [norm_vector] if krit else norm_vector
+    result = inconsistent_judgments(stack, vectors, top=top)
+    suggestions = [
+        [
+            {
+                "row": int(result["row"][k][t]),
+                "col": int(result["col"][k][t]),
+                "value": convert_to_fraction(float(result["value"][k][t])),
+                "implied": float(result["implied"][k][t]),
+                "suggested": convert_to_fraction(float(result["suggested"][k][t])),
+                "score": float(result["score"][k][t]),
+            }
+            for t in range(result["row"].shape[1])
+            if result["score"][k][t] > 1e-9
+        ]
+        for k in range(stack.shape[0])
+    ]
+    return suggestions[0] if krit else suggestions
+
+
+# Чутливість глобальних пріоритетів до ваг критеріїв
+def do_sensitivity(norm_vector=0, norm_vector_alt=0, num_alt=0, steps=21):
+    local = [vector[:num_alt] for vector in norm_vector_alt]
+    weights = list(norm_vector)[: len(local)]
+    result = weight_sensitivity(weights, local, steps=steps)
+
+    def thresholds(values, rivals):
+        return [
+            None if rival < 0 else {"weight": float(value), "rival": int(rival)}
+            for value, rival in zip(values.tolist(), rivals.tolist())
+        ]
+
+    return {
+        "grid": result["grid"].tolist(),
+        "priorities": result["priorities"].tolist(),
+        "winners": result["winners"].tolist(),
+        "best": result["best"],
+        "lower": thresholds(result["lower"], result["lower_rival"]),
+        "upper": thresholds(result["upper"], result["upper_rival"]),
+    }
 
 
 # дерево
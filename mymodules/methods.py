@@ -414,9 +414,9 @@ def generate_plot(
 
 # Функція для додавання об'єкту в базу даних та повернення його ID
 def add_object_to_db(db, object_class, **kwargs):
-    # Debug logging
+    # Debug logging: лише імена полів - значення (матриці, трійки) бувають великими
     print(
-        f"DEBUG: add_object_to_db called with class={object_class.__name__}, kwargs={kwargs}"
+        f"DEBUG: add_object_to_db called with class={object_class.__name__}, fields={list(kwargs)}"
     )
 
     # Проверяем, есть ли уже запись с таким ID
@@ -440,7 +440,6 @@ def add_object_to_db(db, object_class, **kwargs):
             return object_instance.id
     else:
         print(f"DEBUG: No ID provided, creating new record")
-        print(f"DEBUG: kwargs before creating object: {kwargs}")
         # Создаем новую запись без указания ID
         object_instance = object_class(**kwargs)
         print(
@@ -506,3 +505,105 @@ def add_object_to_db(db, object_class, **kwargs):
                     raise e
             else:
                 raise e
+
+
+# Версія формату DerivedResult.data для кожного методу; збільшується при
+# зміні складу полів цього методу, після чого лише його старі записи
+# вважаються відсутніми і перераховуються
+DERIVED_RESULT_VERSIONS = {
+    "Experts": 1,
+    "Laplasa": 1,
+    "Maximin": 1,
+    "Savage": 1,
+    "Hurwitz": 1,
+}
+
+
+def derived_result_version(method_name):
+    return DERIVED_RESULT_VERSIONS.get(method_name, 1)
+
+
+def save_derived_result(db, method_name, method_id, data):
+    """Зберігає (або замінює) обчислений результат методу"""
+    from models import DerivedResult
+
+    record = DerivedResult.query.filter_by(
+        method_name=method_name, method_id=method_id
+    ).first()
+    if record is None:
+        record = DerivedResult(method_name=method_name, method_id=method_id)
+        db.session.add(record)
+    record.version = derived_result_version(method_name)
+    record.data = data
+    db.session.commit()
+
+
+def load_derived_result(method_name, method_id):
+    """Збережений результат методу або None, якщо його немає чи він застарів"""
+    from models import DerivedResult
+
+    record = DerivedResult.query.filter_by(
+        method_name=method_name, method_id=method_id
+    ).first()
+    if record is None or record.version != derived_result_version(method_name):
+        return None
+    return record.data
+
+
+def owns_result(method_name, method_id):
+    """Чи має поточний користувач доступ до результату (адмін - до всіх)"""
+    from flask_login import current_user
+    from models import Result
+
+    if current_user.get_name() == "admin":
+        return True
+    return (
+        Result.query.filter_by(
+            method_id=method_id,
+            method_name=method_name,
+            user_id=current_user.get_id(),
+        ).first()
+        is not None
+    )
+
+
+def large_matrix_result(criterion, with_alpha=False):
+    """
+    Критерій criterion ("laplace", "wald", "savage", "hurwitz") для великої
+    матриці (CSV), що обробляється частинами.
+    Повертає лише top_k найкращих альтернатив та статистику критерію.
+    """
+    from flask import request
+    from mymodules.file_upload import process_large_matrix_file
+
+    if "matrix_file" not in request.files:
+        return {"success": False, "error": "Файл не завантажено"}, 400
+    file = request.files["matrix_file"]
+    if file.filename == "":
+        return {"success": False, "error": "Файл не вибрано"}, 400
+
+    matrix_type = request.form.get("matrix_type", "profit")
+    if matrix_type not in ("profit", "cost"):
+        return {"success": False, "error": "Невідомий тип матриці"}, 400
+    alpha = 0.5
+    try:
+        top_k = int(request.form.get("top_k", 10))
+        if with_alpha:
+            alpha = float(request.form.get("alpha", 0.5))
+    except ValueError:
+        return {"success": False, "error": "Невірні параметри"}, 400
+    if top_k < 1:
+        return {"success": False, "error": "top_k має бути додатним"}, 400
+    if not 0 <= alpha <= 1:
+        return {"success": False, "error": "α має бути від 0 до 1"}, 400
+
+    result = process_large_matrix_file(
+        file,
+        criterion,
+        matrix_type=matrix_type,
+        alpha=alpha,
+        top_k=top_k,
+    )
+    if not result["success"]:
+        return result, 400
+    return result
@@ -0,0 +1,314 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CRITERIA = ("laplace", "wald", "savage", "hurwitz")
+
+
+def to_matrix(matrix):
+    """
+    Convert a cost/profit matrix (lists of numbers or numeric strings) to a
+    float array of shape (alternatives, conditions).
+    """
+    values = np.array(matrix, dtype=float)
+    if values.ndim != 2 or 0 in values.shape:
+        raise ValueError(f"Expected a non-empty 2-D matrix, got {values.shape}")
+    return values
+
+
+def plain(values):
+    """
+    Array -> list of Python numbers; integral values become int so that
+    integer matrices keep being shown as "5", not "5.0".
+    """
+    values = np.asarray(values, dtype=float)
+    if np.all(np.mod(values, 1) == 0):
+        return values.astype(int).tolist()
+    return values.tolist()
+
+
+def decision_criteria(matrix, matrix_type="profit", alpha=0.5):
+    """
+    All decision-under-uncertainty criteria of one matrix in a single pass.
+
+    Row minima, maxima and means and the column optima are computed once
+    and shared by every criterion. For matrix_type="profit" larger values
+    are better, for "cost" smaller values are better.
+
+    Returns a dict of arrays (one value per alternative unless noted):
+        row_min, row_max, laplace (row means),
+        wald - maximin for profit, minimax for cost,
+        regret (alternatives, conditions) - Savage's loss matrix,
+        savage - maximum regret of every alternative,
+        hurwitz - alpha * best + (1 - alpha) * worst outcome,
+    and the index of the optimal alternative for each criterion:
+        laplace_best, wald_best, savage_best, hurwitz_best.
+    """
+    values = to_matrix(matrix)
+    profit = matrix_type == "profit"
+
+    # Втрати: відстань до найкращого значення у стовпці
+    column_best = values.max(axis=0) if profit else values.min(axis=0)
+    regret = np.abs(column_best - values)
+
+    criteria = _criteria_from_rows(
+        values.min(axis=1),
+        values.max(axis=1),
+        values.mean(axis=1),
+        regret.max(axis=1),
+        profit,
+        alpha,
+    )
+    criteria["regret"] = regret
+    return criteria
+
+
+def _criteria_from_rows(row_min, row_max, laplace, savage, profit, alpha):
+    """Scores and optimal indices of every criterion from per-row reductions"""
+    alpha = float(alpha)
+    if profit:
+        wald = row_min
+        hurwitz = alpha * row_max + (1 - alpha) * row_min
+    else:
+        wald = row_max
+        hurwitz = alpha * row_min + (1 - alpha) * row_max
+
+    best = np.argmax if profit else np.argmin
+    return {
+        "row_min": row_min,
+        "row_max": row_max,
+        "laplace": laplace,
+        "laplace_best": int(best(laplace)),
+        "wald": wald,
+        "wald_best": int(best(wald)),
+        "savage": savage,
+        "savage_best": int(np.argmin(savage)),
+        "hurwitz": hurwitz,
+        "hurwitz_best": int(best(hurwitz)),
+    }
+
+
+def hurwitz_envelope(row_min, row_max, matrix_type="profit", tol=1e-12):
+    """
+    Optimal alternative of the Hurwitz criterion for every alpha in [0, 1].
+
+    H_i(alpha) is linear in alpha for every row, so the optimum is the upper
+    (profit) or lower (cost) envelope of n lines. It is built exactly with a
+    monotone stack over the lines sorted by slope: O(n log n), no grid.
+
+    Returns a list of intervals ordered by alpha:
+        {"alpha_from", "alpha_to", "best", "value_from", "value_to"}
+    where "best" is the row index that is optimal on the whole interval and
+    value_* are its H values at the interval ends. Adjacent interval bounds
+    are the breakpoints where the optimal alternative changes.
+    """
+    low = np.asarray(row_min, dtype=float)
+    high = np.asarray(row_max, dtype=float)
+    if low.shape != high.shape or low.ndim != 1 or low.size == 0:
+        raise ValueError("row_min and row_max must be non-empty 1-D of equal length")
+    profit = matrix_type == "profit"
+
+    # Profit: H = low + alpha * (high - low) -> max.
+    # Cost:  -H = -high + alpha * (high - low) -> max.
+    slope = high - low
+    intercept = low if profit else -high
+
+    def cross(a, b):
+        return (intercept[a] - intercept[b]) / (slope[b] - slope[a])
+
+    hull = []
+    for k in np.lexsort((intercept, slope)).tolist():
+        if hull and slope[hull[-1]] == slope[k]:
+            # Паралельні прямі: лишається вища (при рівності - перша)
+            if intercept[k] <= intercept[hull[-1]]:
+                continue
+            hull.pop()
+        while len(hull) >= 2 and cross(hull[-2], k) <= cross(hull[-2], hull[-1]):
+            hull.pop()
+        hull.append(k)
+
+    def value(k, alpha):
+        if profit:
+            return float(low[k] + alpha * (high[k] - low[k]))
+        return float(high[k] + alpha * (low[k] - high[k]))
+
+    intervals = []
+    start = 0.0
+    for position, k in enumerate(hull):
+        end = cross(k, hull[position + 1]) if position + 1 < len(hull) else 1.0
+        end = min(max(end, 0.0), 1.0)
+        if end - start > tol or (position + 1 == len(hull) and not intervals):
+            intervals.append(
+                {
+                    "alpha_from": start,
+                    "alpha_to": end,
+                    "best": int(k),
+                    "value_from": value(k, start),
+                    "value_to": value(k, end),
+                }
+            )
+            start = end
+    return intervals
+
+
+def _detect_separator(path, separators=(",", ";", "\t", "|")):
+    """Separator that splits the header line into the most fields"""
+    with open(path, encoding="utf-8-sig") as file:
+        header = file.readline()
+    return max(separators, key=header.count)
+
+
+def _top(scores, k, largest):
+    """Indices of the k best scores, best first, without a full sort"""
+    k = min(k, scores.size)
+    keys = -scores if largest else scores
+    top = np.argpartition(keys, k - 1)[:k]
+    return top[np.lexsort((top, keys[top]))]
+
+
+def stream_criteria(
+    path,
+    matrix_type="profit",
+    alpha=0.5,
+    top_k=10,
+    chunk_rows=2048,
+    workdir=None,
+):
+    """
+    Laplace, Wald, Savage and Hurwitz for a cost matrix too large for lists.
+
+    The CSV (header row with condition names, first column with alternative
+    names) is read in chunks of chunk_rows rows and spilled into a float64
+    memory-mapped file, so at most one chunk is parsed in memory. Row
+    min/max/sum and the column optima are accumulated on the way; Savage's
+    maximum regret needs the final column optima and is computed in a
+    second chunked pass over the memmap.
+
+    Returns {"alternatives", "conditions", "names", "criteria"} where
+    criteria[name] = {"best", "top": [(row index, score), ...], "stats"}
+    and stats holds min/max/mean/std of the criterion over all rows.
+    """
+    profit = matrix_type == "profit"
+    sep = _detect_separator(path)
+    fd, raw_path = tempfile.mkstemp(suffix=".f64", dir=workdir)
+    names, row_min, row_max, row_sum = [], [], [], []
+    column_best = None
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            reader = pd.read_csv(
+                path,
+                sep=sep,
+                index_col=0,
+                chunksize=chunk_rows,
+                encoding="utf-8-sig",
+            )
+            for chunk in reader:
+                block = chunk.to_numpy(dtype=np.float64)
+                if np.isnan(block).any():
+                    row = int(np.isnan(block).any(axis=1).argmax())
+                    raise ValueError(f"Порожнє значення у рядку {len(names) + row + 2}")
+                block.tofile(raw)
+                names.extend(str(name) for name in chunk.index)
+                row_min.append(block.min(axis=1))
+                row_max.append(block.max(axis=1))
+                row_sum.append(block.sum(axis=1))
+                best = block.max(axis=0) if profit else block.min(axis=0)
+                column_best = (
+                    best
+                    if column_best is None
+                    else (np.maximum if profit else np.minimum)(column_best, best)
+                )
+
+        if column_best is None or column_best.size == 0:
+            raise ValueError("Файл не містить даних")
+
+        rows, columns = len(names), column_best.size
+        values = np.memmap(raw_path, dtype=np.float64, mode="r", shape=(rows, columns))
+        savage = np.empty(rows)
+        for start in range(0, rows, chunk_rows):
+            block = values[start : start + chunk_rows]
+            savage[start : start + len(block)] = np.abs(column_best - block).max(axis=1)
+        del values
+    finally:
+        os.remove(raw_path)
+
+    criteria = _criteria_from_rows(
+        np.concatenate(row_min),
+        np.concatenate(row_max),
+        np.concatenate(row_sum) / columns,
+        savage,
+        profit,
+        alpha,
+    )
+    summary = {}
+    for name in CRITERIA:
+        scores = criteria[name]
+        largest = profit and name != "savage"
+        top = _top(scores, top_k, largest)
+        summary[name] = {
+            "best": criteria[f"{name}_best"],
+            "top": [(int(i), float(scores[i])) for i in top],
+            "stats": {
+                "min": float(scores.min()),
+                "max": float(scores.max()),
+                "mean": float(scores.mean()),
+                "std": float(scores.std()),
+            },
+        }
+    return {
+        "alternatives": rows,
+        "conditions": columns,
+        "names": names,
+        "criteria": summary,
+    }
+
+
+def pareto_front(matrix, matrix_type="profit"):
+    """
+    Non-dominated rows of a cost/profit matrix (sort-filter skyline).
+
+    A dominated alternative is never optimal under Laplace, Wald, Savage or
+    Hurwitz, and removing it changes no column optimum. Rows are visited
+    best row sum first, so a row can only be dominated by one visited
+    before it and is compared with the skyline found so far only.
+
+    Returns (keep, dominated_by): sorted indices of the non-dominated rows
+    and {pruned row index: index of a skyline row that dominates it}.
+    """
+    values = to_matrix(matrix)
+    if matrix_type != "profit":
+        values = -values
+
+    skyline = []
+    dominated_by = {}
+    for i in np.argsort(-values.sum(axis=1), kind="stable").tolist():
+        row = values[i]
+        if skyline:
+            front = values[skyline]
+            dominates = (front >= row).all(axis=1) & (front > row).any(axis=1)
+            if dominates.any():
+                dominated_by[i] = skyline[int(dominates.argmax())]
+                continue
+        skyline.append(i)
+    return sorted(skyline), dominated_by
+
+
+def prune_dominated(cost_matrix, names, matrix_type="profit"):
+    """
+    Drop dominated alternatives before evaluation.
+
+    Returns the kept rows, their names and a report
+    [{"alternative", "dominated_by"}, ...] of what was removed and why.
+    """
+    keep, dominated_by = pareto_front(cost_matrix, matrix_type)
+    pruned = [
+        {"alternative": names[i], "dominated_by": names[dominated_by[i]]}
+        for i in sorted(dominated_by)
+    ]
+    return (
+        [cost_matrix[i] for i in keep],
+        [names[i] for i in keep],
+        pruned,
+    )
@@ -0,0 +1,383 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from mymodules import ahp_engine, mai
+
+
+def consistent_matrix(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights[:, None] / weights[None, :]
+
+
+def random_reciprocal(rng, count, size):
+    stack = np.ones((count, size, size))
+    rows, cols = np.triu_indices(size, k=1)
+    upper = rng.choice(ahp_engine.SAATY_SCALE, size=(count, rows.size))
+    stack[:, rows, cols] = upper
+    stack[:, cols, rows] = 1 / upper
+    return stack
+
+
+@pytest.mark.parametrize("count", [1, 2, 4])
+def test_complete_matrices_restores_consistent_matrix(count):
+    # count == n (4) раніше мовчки давав хибний результат
+    weights = np.random.default_rng(count).uniform(1, 9, size=(count, 4))
+    full = np.stack([consistent_matrix(w) for w in weights])
+    partial = full.copy()
+    for i, j in [(0, 2), (1, 3), (0, 3)]:
+        partial[:, i, j] = partial[:, j, i] = np.nan
+
+    np.testing.assert_allclose(ahp_engine.complete_matrices(partial), full)
+
+
+def test_complete_matrices_rejects_disconnected_judgments():
+    partial = consistent_matrix([4, 2, 1, 1])
+    partial[[0, 0, 1, 1, 2, 3, 2, 3], [2, 3, 2, 3, 0, 0, 1, 1]] = np.nan
+    with pytest.raises(ValueError):
+        ahp_engine.complete_matrices([partial])
+
+
+def test_do_matrix_fills_missing_form_judgment():
+    # a_12 = 2, a_23 = 3, a_13 пропущено -> 6
+    matrix = mai.do_matrix(krit=1, matrix=["2", "", "3"], criteria=3, incomplete=True)
+    np.testing.assert_allclose(matrix, consistent_matrix([6, 3, 1]))
+
+
+def test_evaluate_matches_per_matrix_computation():
+    stack = random_reciprocal(np.random.default_rng(0), 6, 5)
+    result = ahp_engine.evaluate(stack)
+    for k, matrix in enumerate(stack):
+        vector = np.prod(matrix, axis=1) ** (1 / 5)
+        weights = vector / vector.sum()
+        l_max = (matrix.sum(axis=0) * weights).sum()
+        np.testing.assert_allclose(result["norm_vector"][k], weights)
+        assert result["l_max"][k] == pytest.approx(l_max)
+        assert result["relation_consistency"][k] == pytest.approx(
+            (l_max - 5) / 4 / ahp_engine.RANDOM_CONSISTENCY[5] * 100
+        )
+
+
+def test_solve_hierarchy_weights_local_priorities():
+    rng = np.random.default_rng(1)
+    criteria = random_reciprocal(rng, 1, 3)[0]
+    alternatives = random_reciprocal(rng, 3, 4)
+    result = ahp_engine.solve_hierarchy(criteria, alternatives)
+    expected = sum(
+        w * v
+        for w, v in zip(
+            ahp_engine.evaluate(criteria)["norm_vector"][0],
+            ahp_engine.evaluate(alternatives)["norm_vector"],
+        )
+    )
+    np.testing.assert_allclose(result["global_prior"], expected)
+    assert result["global_prior"].sum() == pytest.approx(1)
+
+
+@pytest.mark.parametrize("size", [3, 5, 9])
+def test_power_iteration_matches_eig(size):
+    stack = random_reciprocal(np.random.default_rng(size), 20, size)
+    vectors, l_max, iterations = ahp_engine.power_iteration(stack, tol=1e-12)
+
+    for matrix, vector, value in zip(stack, vectors, l_max):
+        eigenvalues, eigenvectors = np.linalg.eig(matrix)
+        k = np.argmax(eigenvalues.real)
+        expected = np.abs(eigenvectors[:, k].real)
+        np.testing.assert_allclose(vector, expected / expected.sum(), atol=1e-9)
+        assert value == pytest.approx(eigenvalues[k].real, abs=1e-9)
+    assert (iterations >= 1).all()
+
+
+def test_power_iteration_consistent_matrix_converges_at_once():
+    weights = np.array([0.5, 0.3, 0.2])
+    vectors, l_max, iterations = ahp_engine.power_iteration(
+        [consistent_matrix(weights)]
+    )
+    np.testing.assert_allclose(vectors[0], weights)
+    assert l_max[0] == pytest.approx(3)
+    assert iterations[0] == 1
+
+
+def test_exact_mode_is_consistent_with_geometric_for_consistent_matrix():
+    matrix = consistent_matrix([0.4, 0.4, 0.1, 0.1])
+    exact = ahp_engine.evaluate([matrix], mode="exact")
+    geometric = ahp_engine.evaluate([matrix], mode="geometric")
+    np.testing.assert_allclose(exact["norm_vector"], geometric["norm_vector"])
+    assert exact["relation_consistency"][0] == pytest.approx(0, abs=1e-9)
+
+
+def test_evaluate_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        ahp_engine.evaluate([consistent_matrix([1, 2, 3])], mode="arithmetic")
+
+
+def test_random_index_table_and_memoized_fallback():
+    assert ahp_engine.random_index(3) == ahp_engine.RANDOM_CONSISTENCY[3]
+    assert ahp_engine.random_index(50) == ahp_engine.load_random_index()[50]
+
+    ahp_engine._simulated_random_index.cache_clear()
+    first = ahp_engine.random_index(51)
+    assert ahp_engine.random_index(51) == first
+    assert ahp_engine._simulated_random_index.cache_info().hits == 1
+    assert ahp_engine.random_index(50) < first < 2
+
+
+@pytest.mark.parametrize("mode", ["geometric", "exact"])
+def test_update_judgment_matches_full_evaluation(mode):
+    stack = random_reciprocal(np.random.default_rng(4), 3, 5)
+    edited = stack.copy()
+    matrix, result = ahp_engine.update_judgment(stack, 1, 3, 0, 7, mode=mode)
+
+    # Вихідний стек не змінюється
+    np.testing.assert_array_equal(stack, edited)
+    edited[1, 3, 0], edited[1, 0, 3] = 7, 1 / 7
+    np.testing.assert_array_equal(matrix, edited[1])
+    full = ahp_engine.evaluate(edited, mode=mode)
+    for key in ("norm_vector", "l_max", "relation_consistency"):
+        np.testing.assert_allclose(result[key][0], full[key][1])
+
+
+@pytest.mark.parametrize(
+    "cell, value, error",
+    [((1, 1), 3, ValueError), ((0, 5), 3, IndexError), ((0, 1), 0, ValueError)],
+)
+def test_update_judgment_rejects_invalid_cells(cell, value, error):
+    with pytest.raises(error):
+        ahp_engine.update_judgment(consistent_matrix([1, 2, 3]), 0, *cell, value)
+
+
+def rescaled_priorities(weights, local, k, t):
+    weights = np.asarray(weights, dtype=float)
+    others = np.delete(np.arange(weights.size), k)
+    swept = np.empty_like(weights)
+    swept[k] = t
+    swept[others] = weights[others] / weights[others].sum() * (1 - t)
+    return swept @ local
+
+
+def test_weight_sensitivity_matches_rescaled_weights():
+    rng = np.random.default_rng(5)
+    weights = rng.dirichlet(np.ones(4))
+    local = rng.dirichlet(np.ones(6), size=4)
+    result = ahp_engine.weight_sensitivity(weights, local, steps=11)
+
+    assert result["priorities"].shape == (4, 11, 6)
+    assert result["best"] == int(np.argmax(weights @ local))
+    for k in range(4):
+        for step, t in enumerate(result["grid"]):
+            np.testing.assert_allclose(
+                result["priorities"][k, step], rescaled_priorities(weights, local, k, t)
+            )
+        for side in ("lower", "upper"):
+            t, rival = result[side][k], result[f"{side}_rival"][k]
+            if rival < 0:
+                assert np.isnan(t)
+                continue
+            # На порозі поточний лідер і суперник рівні
+            scores = rescaled_priorities(weights, local, k, t)
+            assert scores[rival] == pytest.approx(scores[result["best"]])
+
+
+def test_weight_sensitivity_without_rank_reversal():
+    # Альтернатива 0 найкраща за кожним критерієм - лідер не змінюється
+    local = np.array([[0.6, 0.3, 0.1], [0.5, 0.4, 0.1]])
+    result = ahp_engine.weight_sensitivity([0.7, 0.3], local)
+    assert (result["winners"] == 0).all()
+    assert np.isnan(result["lower"]).all() and np.isnan(result["upper"]).all()
+    assert (result["lower_rival"] == -1).all() and (result["upper_rival"] == -1).all()
+
+
+def test_group_aggregator_matches_batch_means():
+    rng = np.random.default_rng(6)
+    experts = [
+        (random_reciprocal(rng, 1, 3)[0], random_reciprocal(rng, 3, 4))
+        for _ in range(5)
+    ]
+    weights = [1, 2, 1, 3, 0.5]
+    group = ahp_engine.GroupAggregator()
+    for (criteria, alternatives), weight in zip(experts, weights):
+        group.add(criteria, alternatives, weight)
+
+    total = sum(weights)
+    criteria_aij, alternatives_aij = group.aij()
+    np.testing.assert_allclose(
+        criteria_aij,
+        np.prod([c ** (w / total) for (c, _), w in zip(experts, weights)], axis=0),
+    )
+    np.testing.assert_allclose(
+        alternatives_aij,
+        np.prod([a ** (w / total) for (_, a), w in zip(experts, weights)], axis=0),
+    )
+    # AIJ зберігає обернену симетричність
+    np.testing.assert_allclose(criteria_aij * criteria_aij.T, 1)
+
+    criteria_aip, alternatives_aip = group.aip()
+    expected = sum(
+        w * ahp_engine.evaluate(c)["norm_vector"][0]
+        for (c, _), w in zip(experts, weights)
+    )
+    np.testing.assert_allclose(criteria_aip, expected / total)
+    assert alternatives_aip.shape == (3, 4)
+    np.testing.assert_allclose(alternatives_aip.sum(axis=1), 1)
+
+    # Узгоджені матриці AIP відтворюють усереднені пріоритети
+    criteria_matrix, _ = group.matrices("aip")
+    np.testing.assert_allclose(
+        ahp_engine.evaluate(criteria_matrix)["norm_vector"][0], criteria_aip
+    )
+
+
+def test_group_aggregator_rejects_mismatched_experts():
+    group = ahp_engine.GroupAggregator()
+    with pytest.raises(ValueError):
+        group.aij()
+    group.add(consistent_matrix([1, 2]), [consistent_matrix([1, 2, 3])] * 2)
+    with pytest.raises(ValueError):
+        group.add(consistent_matrix([1, 2, 3]), [consistent_matrix([1, 2, 3])] * 3)
+    with pytest.raises(ValueError):
+        group.add(consistent_matrix([1, 2]), [consistent_matrix([1, 2, 3])] * 2, 0)
+
+
+def build_tree(rng):
+    # Ціль -> 2 критерії; перший має 3 підкритерії; 4 альтернативи
+    tree = ahp_engine.PriorityTree(["a", "b", "c", "d"])
+    tree.add_node("goal", "Ціль", matrix=random_reciprocal(rng, 1, 2)[0])
+    tree.add_node("c1", "C1", "goal", random_reciprocal(rng, 1, 3)[0])
+    tree.add_node("c2", "C2", "goal", random_reciprocal(rng, 1, 4)[0])
+    for k in range(3):
+        tree.add_node(f"s{k}", f"S{k}", "c1", random_reciprocal(rng, 1, 4)[0])
+    return tree
+
+
+def test_priority_tree_matches_flattened_hierarchy():
+    tree = build_tree(np.random.default_rng(8))
+    local = {node: tree.local(node)["norm_vector"] for node in tree.nodes}
+    expected = (
+        local["goal"][0] * sum(w * local[f"s{k}"] for k, w in enumerate(local["c1"]))
+        + local["goal"][1] * local["c2"]
+    )
+    np.testing.assert_allclose(tree.priorities(), expected)
+
+    weights = tree.global_weights()
+    assert sum(weights[node] for node in ("s0", "s1", "s2", "c2")) == pytest.approx(1)
+    assert weights["s1"] == pytest.approx(local["goal"][0] * local["c1"][1])
+
+
+def test_priority_tree_recomputes_only_the_edited_branch():
+    rng = np.random.default_rng(9)
+    tree = build_tree(rng)
+    tree.priorities()
+    untouched = tree.priorities("c2")
+
+    tree.set_matrix("s1", random_reciprocal(rng, 1, 4)[0])
+    assert "s1" not in tree._local and "s0" in tree._local
+    assert set(tree._subtree) == {"c2", "s0", "s2"}
+    assert tree.priorities("c2") is untouched
+
+    fresh = ahp_engine.PriorityTree(tree.alternatives)
+    for node_id, node in tree.nodes.items():
+        fresh.add_node(node_id, node["name"], node["parent"], node["matrix"])
+    np.testing.assert_allclose(tree.priorities(), fresh.priorities())
+
+
+def test_priority_tree_rejects_wrong_matrix_size():
+    tree = ahp_engine.PriorityTree(["a", "b", "c"])
+    tree.add_node("goal", "Ціль", matrix=consistent_matrix([1, 2]))
+    tree.add_node("c1", "C1", "goal", consistent_matrix([1, 2, 3]))
+    tree.add_node("c2", "C2", "goal", consistent_matrix([1, 2]))
+    with pytest.raises(ValueError):
+        tree.priorities()
+    with pytest.raises(ValueError):
+        tree.add_node("goal2", "Ціль 2")
+
+
+def test_inconsistent_judgments_finds_the_distorted_cell():
+    matrix = consistent_matrix([8, 4, 2, 1])
+    matrix[0, 3], matrix[3, 0] = 1 / 8, 8
+    result = ahp_engine.inconsistent_judgments([matrix], top=2)
+
+    assert (result["row"][0, 0], result["col"][0, 0]) == (0, 3)
+    assert result["value"][0, 0] == pytest.approx(1 / 8)
+    implied = result["implied"][0, 0]
+    assert implied > result["value"][0, 0]
+    nearest = np.abs(np.log(ahp_engine.SAATY_SCALE / implied)).argmin()
+    assert result["suggested"][0, 0] == ahp_engine.SAATY_SCALE[nearest]
+    assert result["score"][0, 0] >= result["score"][0, 1]
+
+
+def test_inconsistent_judgments_of_consistent_matrix_score_zero():
+    result = ahp_engine.inconsistent_judgments([consistent_matrix([5, 3, 1])])
+    np.testing.assert_allclose(result["score"], 0, atol=1e-12)
+
+
+def test_simulate_priorities_is_reproducible_across_workers():
+    rng = np.random.default_rng(10)
+    criteria = ahp_engine.judgment_bounds(random_reciprocal(rng, 1, 3)[0])
+    alternatives = ahp_engine.judgment_bounds(random_reciprocal(rng, 3, 4))
+    serial = ahp_engine.simulate_priorities(
+        criteria, alternatives, samples=1050, seed=3, chunk_size=200
+    )
+    pooled = ahp_engine.simulate_priorities(
+        criteria, alternatives, samples=1050, seed=3, chunk_size=200, workers=2
+    )
+
+    assert serial["priorities"].shape == (1050, 4)
+    np.testing.assert_array_equal(serial["priorities"], pooled["priorities"])
+    np.testing.assert_allclose(serial["priorities"].sum(axis=1), 1)
+    assert serial["percentiles"].shape == (3, 4)
+    assert serial["first"].sum() == pytest.approx(1)
+
+
+@pytest.mark.parametrize("mode", ["geometric", "exact"])
+def test_simulate_priorities_with_point_judgments(mode):
+    rng = np.random.default_rng(11)
+    criteria = random_reciprocal(rng, 1, 3)[0]
+    alternatives = random_reciprocal(rng, 3, 4)
+    result = ahp_engine.simulate_priorities(
+        (criteria, criteria), (alternatives, alternatives), samples=20, mode=mode
+    )
+    expected = ahp_engine.solve_hierarchy(criteria, alternatives, mode=mode)
+    np.testing.assert_allclose(result["mean"], expected["global_prior"])
+    np.testing.assert_allclose(result["std"], 0, atol=1e-12)
+
+
+def test_simulate_priorities_rejects_invalid_ranges():
+    matrix = consistent_matrix([1, 2, 3])
+    with pytest.raises(ValueError):
+        ahp_engine.simulate_priorities((matrix, matrix / 2), ([matrix], [matrix]))
+    with pytest.raises(ValueError):
+        ahp_engine.simulate_priorities((matrix, matrix), ([matrix], [matrix]), 0)
+
+
+def fraction_reference(value):
+    # Шлях convert_to_fraction без таблиці шкали Сааті
+    frac = Fraction(value).limit_denominator(1000)
+    if frac.denominator == 1:
+        return str(frac.numerator)
+    return f"{frac.numerator}/{frac.denominator}"
+
+
+def test_saaty_label_round_trips_the_scale():
+    for value in ahp_engine.SAATY_SCALE:
+        label = ahp_engine.saaty_label(value)
+        assert ahp_engine.SAATY_VALUES[label] == pytest.approx(value)
+        assert ahp_engine.parse_judgment(label) == ahp_engine.SAATY_VALUES[label]
+        assert ahp_engine.saaty_label(value * (1 + 1e-8)) == label
+    for value in (0, -3, 0.45, 2.5, 1 / 10, 10, 1 / 3 + 1e-4):
+        assert ahp_engine.saaty_label(value) is None
+
+
+def test_convert_to_fraction_keeps_the_fraction_output():
+    rng = np.random.default_rng(24)
+    values = np.concatenate(
+        (
+            ahp_engine.SAATY_SCALE,
+            ahp_engine.SAATY_SCALE * (1 + rng.uniform(-1e-7, 1e-7, 17)),
+            rng.uniform(0.01, 12, 200),
+        )
+    )
+    for value in values.tolist():
+        if abs(value - 1) < 0.001:
+            continue
+        assert mai.convert_to_fraction(value) == fraction_reference(value)
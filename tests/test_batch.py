@@ -0,0 +1,103 @@
+import csv
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from mymodules import ahp_engine, batch, binary
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_files")
+
+EXPECTED_METHODS = {
+    "Binary_Relations_Test_Data.xlsx": "binary",
+    "Expert_Evaluation_Test_Data.xlsx": "experts",
+    "Hierarchy_Test_Data.xlsx": "hierarchy",
+    "Hurwitz_Test_Data.xlsx": "hurwitz",
+    "Laplace_Test_Data.xlsx": "laplasa",
+    "Maximin_Test_Data.xlsx": "maximin",
+    "Savage_Test_Data.xlsx": "savage",
+}
+
+
+def test_cli_solves_test_files(tmp_path):
+    out = tmp_path / "out"
+    assert batch.main([TEST_FILES, "--out", str(out), "--workers", "1", "--quiet"]) == 0
+
+    with open(out / "summary.csv", encoding="utf-8-sig") as file:
+        rows = list(csv.DictReader(file))
+    assert {row["file"]: row["method"] for row in rows} == EXPECTED_METHODS
+    assert all(row["status"] == "ok" and row["best"] for row in rows)
+
+    for name, method in EXPECTED_METHODS.items():
+        with open(out / f"{name}.json", encoding="utf-8") as file:
+            output = json.load(file)
+        assert output["file"] == name
+        assert output["method"] == method
+
+
+def test_cli_fails_on_missing_source(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        batch.main([str(tmp_path / "missing"), "--out", str(tmp_path / "out")])
+    assert exit_info.value.code != 0
+    assert "does not exist" in capsys.readouterr().err
+
+
+def test_output_names_do_not_collide(tmp_path):
+    source = tmp_path / "in"
+    (source / "a").mkdir(parents=True)
+    laplace = os.path.join(TEST_FILES, "Laplace_Test_Data.xlsx")
+    shutil.copy(laplace, source / "a" / "b.xlsx")
+    shutil.copy(laplace, source / "a__b.xlsx")
+    shutil.copy(laplace, source / "c.xlsx")
+
+    out = tmp_path / "out"
+    rows = batch.run_batch(str(source), str(out), workers=1)
+    assert [row["status"] for row in rows] == ["ok"] * 3
+
+    written = [name for name in os.listdir(out) if name.endswith(".json")]
+    assert len(written) == 3
+    assert "c.xlsx.json" in written
+    files = set()
+    for name in written:
+        with open(out / name, encoding="utf-8") as file:
+            files.add(json.load(file)["file"])
+    assert files == {"a/b.xlsx", "a__b.xlsx", "c.xlsx"}
+
+
+def test_hierarchy_uses_web_reciprocal_normalization(tmp_path):
+    # Нижній трикутник округлено (0.33 замість 1/3) - як у веб-версії,
+    # оцінки беруться з верхнього трикутника
+    path = tmp_path / "hierarchy.csv"
+    path.write_text(
+        ",A,B,C\nA,1,3,5\nB,0.33,1,2\nC,0.2,0.5,1\n"
+        ",x,y\nx,1,2\ny,0.5,1\n"
+        ",x,y\nx,1,0.25\ny,4,1\n"
+        ",x,y\nx,1,3\ny,0.33,1\n",
+        encoding="utf-8",
+    )
+    method, result = batch.solve_file(str(path), "hierarchy")
+
+    criteria = np.array([[1, 3, 5], [1 / 3, 1, 2], [1 / 5, 1 / 2, 1]])
+    alternatives = [[[1, 2], [1 / 2, 1]], [[1, 1 / 4], [4, 1]], [[1, 3], [1 / 3, 1]]]
+    expected = ahp_engine.solve_hierarchy(criteria, alternatives)
+    assert method == "hierarchy"
+    np.testing.assert_allclose(result["global_prior"], expected["global_prior"])
+
+
+def test_binary_uses_upper_triangle_like_the_web_form(tmp_path):
+    path = tmp_path / "binary.csv"
+    # Нижній трикутник суперечить верхньому і не враховується
+    path.write_text(",a,b,c\na,0,1,1\nb,1,0,-1\nc,1,1,0\n", encoding="utf-8")
+    _, result = batch.solve_file(str(path), "binary")
+    expected = binary.process_matrix(["0", "1", "1", "0", "0", "-1", "0", "0", "0"], 3)
+    np.testing.assert_array_equal(result["sums"], expected.sum(axis=1))
+    assert result["ranking"][0] == "a"
+
+
+def test_binary_rejects_values_outside_relation(tmp_path):
+    path = tmp_path / "binary.csv"
+    path.write_text(",a,b\na,0,2\nb,-2,0\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        batch.solve_file(str(path), "binary")
@@ -0,0 +1,185 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from mymodules import binary
+
+
+def random_relation(num, seed):
+    rng = np.random.default_rng(seed)
+    matrix = np.zeros((num, num), dtype=np.int8)
+    rows, cols = np.triu_indices(num, k=1)
+    matrix[rows, cols] = rng.integers(-1, 2, rows.size)
+    matrix[cols, rows] = -matrix[rows, cols]
+    return matrix
+
+
+def brute_force(matrix):
+    """Перевірка кожної трійки вихідною функцією check_tranz"""
+    checkable, violations = 0, []
+    for i, j, k in itertools.combinations(range(len(matrix)), 3):
+        mark = binary.check_tranz(matrix[i, j], matrix[j, k], matrix[i, k], i, j, k)
+        if mark[-1]:
+            checkable += 1
+        if mark[-1] == "-":
+            violations.append((i, j, k))
+    return checkable, np.array(violations, dtype=np.intp).reshape(-1, 3)
+
+
+@pytest.mark.parametrize("num, seed", [(3, 0), (7, 1), (15, 2), (30, 3)])
+def test_transitivity_check_matches_brute_force(num, seed):
+    matrix = random_relation(num, seed)
+    checkable, violations = binary.transitivity_check(matrix)
+    expected_checkable, expected = brute_force(matrix)
+    assert checkable == expected_checkable
+    np.testing.assert_array_equal(violations, expected)
+
+
+def test_process_matrix_mirrors_the_upper_triangle():
+    # Форма передає всі клітинки рядками; нижній трикутник ігнорується
+    cells = ["0", "1", "-1", "5", "0", "0", "7", "7", "0"]
+    np.testing.assert_array_equal(
+        binary.process_matrix(cells, 3), [[0, 1, -1], [-1, 0, 0], [1, 0, 0]]
+    )
+
+
+@pytest.mark.parametrize("num, seed", [(8, 4), (25, 5)])
+def test_counts_and_pages_match_full_check(num, seed):
+    matrix = random_relation(num, seed)
+    checkable, violations = binary.transitivity_check(matrix)
+    counts_checkable, row_counts = binary.transitivity_counts(matrix)
+    assert counts_checkable == checkable
+    np.testing.assert_array_equal(
+        row_counts, np.bincount(violations[:, 0], minlength=num)
+    )
+
+    for start, count in [(0, None), (0, 5), (3, 7), (len(violations) - 2, 10)]:
+        stop = None if count is None else start + count
+        np.testing.assert_array_equal(
+            binary.violation_triples(matrix, row_counts, start, count),
+            violations[start:stop],
+        )
+
+
+@pytest.mark.parametrize("num", [0, 3, 4, 9])
+def test_iter_triples_resumes_from_any_position(num):
+    triples = list(itertools.combinations(range(num), 3))
+    assert binary.count_triples(num) == len(triples)
+    for start in range(len(triples) + 1):
+        assert list(binary.iter_triples(num, start)) == triples[start:]
+
+
+def reachability(graph):
+    reach = graph | np.eye(len(graph), dtype=bool)
+    for k in range(len(graph)):
+        reach |= reach[:, [k]] & reach[[k], :]
+    return reach
+
+
+def near_order(num, seed, flips):
+    # Слабкий порядок за балами з кількома оберненими судженнями
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, num // 2 + 1, num)
+    matrix = np.sign(scores[:, None] - scores[None, :]).astype(np.int8)
+    for _ in range(flips):
+        i, j = rng.choice(num, 2, replace=False)
+        matrix[i, j], matrix[j, i] = -matrix[i, j], matrix[i, j]
+    return matrix
+
+
+@pytest.mark.parametrize(
+    "matrix",
+    [
+        random_relation(1, 0),
+        random_relation(12, 10),
+        near_order(10, 12, 0),
+        near_order(15, 13, 2),
+        near_order(30, 14, 4),
+    ],
+)
+def test_relation_structure_matches_reachability(matrix):
+    num = len(matrix)
+    structure = binary.relation_structure(matrix)
+    graph = matrix >= 0
+    np.fill_diagonal(graph, False)
+    reach = reachability(graph)
+    level = np.array(structure["level"])
+
+    assert sorted(sum(structure["components"], [])) == list(range(num))
+    # Одна компонента - взаємна досяжність; дуги ведуть лише вниз
+    np.testing.assert_array_equal(level[:, None] == level[None, :], reach & reach.T)
+    assert (level[:, None] <= level[None, :])[reach].all()
+
+    cyclic_components = []
+    for position, members in enumerate(structure["components"]):
+        strict = (matrix[np.ix_(members, members)] == 1).any()
+        assert structure["cyclic"][position] == strict
+        if strict:
+            cyclic_components.append(position)
+    assert [cycle["component"] for cycle in structure["cycles"]] == cyclic_components
+    for cycle in structure["cycles"]:
+        witness = cycle["witness"]
+        assert witness[0] == witness[-1]
+        steps = list(zip(witness, witness[1:]))
+        assert all(graph[i, j] for i, j in steps)
+        assert any(matrix[i, j] == 1 for i, j in steps)
+
+
+def test_structure_summary_of_a_cycle():
+    # a1 > a2 > a3 > a1, a4 гірший за всіх
+    matrix = np.array([[0, 1, -1, 1], [-1, 0, 1, 1], [1, -1, 0, 1], [-1, -1, -1, 0]])
+    summary = binary.structure_summary(matrix, ["a", "b", "c", "d"])
+    assert summary["order"] == "{a, b, c} > d"
+    assert summary["components"] == 2
+    assert summary["in_cycles"] == 3
+    assert summary["cycles"][0]["witness"] in {
+        "a > b > c > a",
+        "b > c > a > b",
+        "c > a > b > c",
+    }
+
+
+@pytest.mark.parametrize("num", [1, 2, 3, 11, 40])
+def test_pack_relation_round_trip(num):
+    matrix = random_relation(num, num)
+    data = binary.pack_relation(matrix)
+    # Два біти на клітинку
+    assert len(data) == (2 * num * num + 7) // 8
+    np.testing.assert_array_equal(binary.unpack_relation(data, num), matrix)
+    # Матриця зі сторінки приходить списками рядків
+    assert binary.pack_relation(matrix.astype(str).tolist()) == data
+
+
+def test_update_transitivity_matches_recompute():
+    num = 20
+    matrix = random_relation(num, 6)
+    checkable, row_counts = binary.transitivity_counts(matrix)
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        a, b = rng.choice(num, 2, replace=False)
+        value = int(rng.integers(-1, 2))
+        before = {tuple(t) for t in binary.transitivity_check(matrix)[1].tolist()}
+        checkable, row_counts, added, removed = binary.update_transitivity(
+            matrix, a, b, value, checkable, row_counts
+        )
+        expected_checkable, expected_rows = binary.transitivity_counts(matrix)
+        assert checkable == expected_checkable
+        np.testing.assert_array_equal(row_counts, expected_rows)
+
+        after = {tuple(t) for t in binary.transitivity_check(matrix)[1].tolist()}
+        assert {tuple(t) for t in added.tolist()} == after - before
+        assert {tuple(t) for t in removed.tolist()} == before - after
+
+
+def test_packed_bytes_patch_matches_repacking():
+    num = 11
+    matrix = random_relation(num, 8)
+    data = bytearray(binary.pack_relation(matrix))
+
+    # Одна оцінка змінюється: перезаписуються лише байти її двох клітинок
+    matrix[2, 9] = 1 if matrix[2, 9] != 1 else -1
+    matrix[9, 2] = -matrix[2, 9]
+    for offset, value in binary.packed_bytes(matrix, [(2, 9), (9, 2)]).items():
+        data[offset] = value
+    assert bytes(data) == binary.pack_relation(matrix)
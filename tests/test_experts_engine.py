@@ -0,0 +1,199 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from mymodules import experts_engine
+
+# P(chi^2_df >= x), scipy.stats.chi2.sf
+CHI2_SF = [
+    (0.5, 1, 0.47950012218695337),
+    (3.84, 1, 0.05004352124870519),
+    (5.99, 2, 0.05003662708658629),
+    (7.81, 3, 0.05010605635000589),
+    (12.0, 5, 0.03478778050624185),
+    (20.0, 10, 0.029252688076961124),
+    (30.0, 11, 0.0015845952573066058),
+    (100.0, 40, 4.791357300338064e-07),
+]
+
+
+@pytest.mark.parametrize("x, df, expected", CHI2_SF)
+def test_chi2_sf_matches_reference(x, df, expected):
+    assert experts_engine.chi2_sf(x, df) == pytest.approx(expected, rel=1e-9)
+
+
+def test_chi2_sf_edges():
+    assert experts_engine.chi2_sf(0, 3) == 1.0
+    assert experts_engine.chi2_sf(1e4, 2) == pytest.approx(0, abs=1e-300)
+
+
+def reference_concordance(table):
+    """W за означенням: середні ранги рівних оцінок, поправка на зв'язки"""
+    table = np.asarray(table, dtype=float)
+    m, n = table.shape
+    ranks = np.zeros((m, n))
+    ties = 0.0
+    for e, row in enumerate(table):
+        for value in set(row.tolist()):
+            better = int((row > value).sum())
+            tied = int((row == value).sum())
+            ranks[e, row == value] = better + (tied + 1) / 2
+            ties += tied**3 - tied
+    sums = ranks.sum(axis=0)
+    s = ((sums - sums.mean()) ** 2).sum()
+    return 12 * s / (m**2 * (n**3 - n) - m * ties)
+
+
+def test_concordance_full_agreement():
+    result = experts_engine.concordance([[4, 3, 2, 1]] * 5)
+    assert result["W"] == pytest.approx(1)
+    assert result["chi2"] == pytest.approx(5 * 3)
+    assert result["significant"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_concordance_matches_definition(seed):
+    rng = np.random.default_rng(seed)
+    # Оцінки 1..4 для 6 напрямів - багато зв'язаних рангів
+    table = rng.integers(1, 5, size=(7, 6))
+    result = experts_engine.concordance(table)
+    w = reference_concordance(table)
+    assert result["W"] == pytest.approx(w)
+    assert result["chi2"] == pytest.approx(7 * 5 * w)
+    assert result["p_value"] == pytest.approx(experts_engine.chi2_sf(7 * 5 * w, 5))
+
+
+def test_concordance_undefined_when_all_tied():
+    result = experts_engine.concordance([[1, 1, 1], [2, 2, 2]])
+    assert result["W"] is None
+    assert not result["significant"]
+
+
+def test_average_ranks_of_permutations():
+    for row in itertools.permutations([10, 20, 20, 30]):
+        ranks, ties = experts_engine.average_ranks([row])
+        assert sorted(ranks[0].tolist()) == [1, 2.5, 2.5, 4]
+        assert ties[0] == 6
+
+
+def test_experts_analysis_weighted_means_and_lambda():
+    rng = np.random.default_rng(5)
+    table = rng.integers(1, 10, size=(6, 5))
+    k_k = rng.uniform(0.3, 1, 6)
+    result = experts_engine.experts_analysis(k_k, table.tolist())
+
+    m_i = [sum(k * row[i] for k, row in zip(k_k, table)) / 6 for i in range(5)]
+    np.testing.assert_allclose(result["m_i"], m_i)
+    np.testing.assert_allclose(result["r_i"], experts_engine.average_ranks(m_i)[0][0])
+    assert result["lambda_values"].sum() == pytest.approx(1)
+    assert result["W"] == pytest.approx(reference_concordance(table))
+
+    with pytest.raises(ValueError):
+        experts_engine.experts_analysis(k_k[:3], table)
+
+
+def disagreement(preferences, order):
+    return sum(
+        preferences[later, earlier]
+        for position, earlier in enumerate(order)
+        for later in order[position + 1 :]
+    )
+
+
+def test_pairwise_preferences_matches_loop():
+    rng = np.random.default_rng(6)
+    ranks, _ = experts_engine.average_ranks(rng.integers(1, 5, size=(9, 5)))
+    weights = rng.uniform(0, 1, 9)
+    expected = np.zeros((5, 5))
+    for row, weight in zip(ranks, weights):
+        for i, j in itertools.permutations(range(5), 2):
+            expected[i, j] += weight * (row[i] < row[j])
+    # chunk менший за кількість експертів - кілька блоків
+    np.testing.assert_allclose(
+        experts_engine.pairwise_preferences(ranks, weights, chunk=4), expected
+    )
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_kemeny_local_search_is_locally_optimal(seed):
+    rng = np.random.default_rng(seed)
+    n = 6
+    ranks, _ = experts_engine.average_ranks(rng.integers(1, 7, size=(8, n)))
+    preferences = experts_engine.pairwise_preferences(ranks)
+    start = rng.permutation(n).tolist()
+    order, value, converged = experts_engine.kemeny_local_search(preferences, start)
+
+    assert converged and sorted(order) == list(range(n))
+    assert value == pytest.approx(disagreement(preferences, order))
+    best = min(
+        disagreement(preferences, list(candidate))
+        for candidate in itertools.permutations(range(n))
+    )
+    assert value >= best - 1e-9
+    # Жодне окреме переміщення не зменшує розбіжність
+    for x in range(n):
+        rest = [item for item in order if item != x]
+        for q in range(n):
+            moved = rest[:q] + [x] + rest[q:]
+            assert disagreement(preferences, moved) >= value - 1e-9
+
+
+def test_aggregate_rankings_of_unanimous_panel():
+    scores = [[5, 9, 1, 7]] * 4
+    ranks, _ = experts_engine.average_ranks(scores)
+    result = experts_engine.aggregate_rankings(ranks, [0.5, 1, 0.2, 0.9])
+    for method in ("borda", "copeland", "kemeny"):
+        assert result[method]["order"].tolist() == [1, 3, 0, 2]
+    assert result["kemeny"]["disagreement"] == 0
+    assert result["kemeny"]["converged"]
+
+
+def test_aggregate_rankings_zero_weights_fall_back_to_equal():
+    ranks, _ = experts_engine.average_ranks([[3, 1, 2], [1, 3, 2], [3, 2, 1]])
+    zero = experts_engine.aggregate_rankings(ranks, [0, 0, 0])
+    equal = experts_engine.aggregate_rankings(ranks)
+    for method in ("borda", "copeland", "kemeny"):
+        np.testing.assert_array_equal(zero[method]["scores"], equal[method]["scores"])
+
+
+def test_experts_accumulator_matches_batch_analysis():
+    rng = np.random.default_rng(7)
+    table = rng.integers(1, 10, size=(11, 6))
+    competence_rows = np.column_stack(
+        (rng.uniform(0, 1, 11), rng.uniform(0, 0.5, (11, 2)))
+    ).round(2)
+    k_k = [experts_engine.competence(row)[1] for row in competence_rows]
+
+    # Друга половина експертів додається до збереженого стану
+    accumulator = experts_engine.ExpertsAccumulator(6)
+    for row, scores in zip(competence_rows[:5], table[:5]):
+        accumulator.add(row, scores)
+    state = json.loads(json.dumps(accumulator.state()))
+    accumulator = experts_engine.ExpertsAccumulator.from_state(state)
+    for row, scores in zip(competence_rows[5:], table[5:]):
+        accumulator.add(row.tolist(), scores.astype(str).tolist())
+    streamed = accumulator.result()
+
+    batch = experts_engine.experts_analysis(k_k, table)
+    for key in ("m_i", "r_i", "lambda_values"):
+        np.testing.assert_allclose(streamed[key], batch[key])
+    for key in ("W", "chi2", "p_value"):
+        assert streamed[key] == pytest.approx(batch[key])
+    np.testing.assert_allclose(
+        streamed["borda"]["scores"], batch["aggregation"]["borda"]["scores"]
+    )
+    np.testing.assert_allclose(streamed["score_mean"], table.mean(axis=0))
+    np.testing.assert_allclose(streamed["score_std"], table.std(axis=0))
+    assert streamed["experts"] == 11
+
+
+def test_experts_accumulator_rejects_bad_rows():
+    accumulator = experts_engine.ExpertsAccumulator(3)
+    with pytest.raises(ValueError):
+        accumulator.result()
+    with pytest.raises(ValueError):
+        accumulator.add([0.5, 0.2], [1, 2])
+    with pytest.raises(ValueError):
+        accumulator.add([0.5, 0.8, 0.7], [1, 2, 3])
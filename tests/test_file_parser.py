@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+import pytest
+
+from mymodules.file_parser import FileParser
+
+TEST_FILES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_files")
+PHONES = ["iPhone 15", "Samsung Galaxy S24", "Google Pixel 8", "OnePlus 12"]
+
+
+def parse(name, method, *sizes):
+    return FileParser().parse_file(os.path.join(TEST_FILES, name), method, *sizes)
+
+
+@pytest.mark.parametrize(
+    "name, method",
+    [
+        ("Laplace_Test_Data.xlsx", "laplasa"),
+        ("Maximin_Test_Data.xlsx", "maximin"),
+        ("Savage_Test_Data.xlsx", "savage"),
+        ("Hurwitz_Test_Data.xlsx", "hurwitz"),
+    ],
+)
+def test_cost_matrix_test_files(name, method):
+    # Розміри з форми завантаження: умови, альтернативи
+    result = parse(name, method, 4, 4)
+    assert result["success"], result["error"]
+    assert result["alternative_names"] == PHONES
+    assert result["condition_names"] == [
+        "High Demand",
+        "Medium Demand",
+        "Low Demand",
+        "Economic Crisis",
+    ]
+    assert result["matrix"][0] == [641.0, 764.0, 940.0, 1232.0]
+
+
+def test_cost_matrix_size_mismatch_is_reported():
+    result = parse("Laplace_Test_Data.xlsx", "laplasa", 4, 5)
+    assert not result["success"]
+    assert "Expected 5 alternatives" in result["error"]
+
+
+def test_binary_test_file():
+    result = parse("Binary_Relations_Test_Data.xlsx", "binary", 0, 4)
+    assert result["success"], result["error"]
+    assert result["alternative_names"] == PHONES
+    assert result["matrix"] == [
+        [0, 1, 1, -1],
+        [-1, 0, 1, 1],
+        [-1, -1, 0, 1],
+        [1, -1, -1, 0],
+    ]
+
+
+def test_hierarchy_test_file():
+    result = parse("Hierarchy_Test_Data.xlsx", "hierarchy", 5, 4)
+    assert result["success"], result["error"]
+    assert result["criteria_names"][0] == "Price"
+    assert result["alternative_names"] == PHONES
+    assert len(result["matrices"]) == 6
+    assert result["matrices"][0]["matrix"][0] == [1.0, 3.0, 2.0, 4.0, 2.0]
+    assert all(len(block["matrix"]) == 4 for block in result["matrices"][1:])
+
+
+def test_experts_test_file_with_competency_block():
+    result = parse("Expert_Evaluation_Test_Data.xlsx", "experts", 0, 4)
+    assert result["success"], result["error"]
+    assert result["alternative_names"] == PHONES
+    assert result["expert_names"] == [f"Експерт {i}" for i in range(1, 5)]
+    assert result["matrix"][0] == [8.0, 10.0, 8.0, 6.0]
+    assert result["competency"][0] == [0.7, 0.3, 0.5, 0.08, 0.05]
+
+
+@pytest.mark.parametrize("method", ["laplasa", "binary"])
+def test_download_example_layout(tmp_path, method):
+    # Те саме, що віддає /download_example: DataFrame з підписами рядків
+    names = ["Option A", "Option B", "Option C", "Option D"]
+    if method == "binary":
+        matrix = [[0, 1, 1, 0], [0, 0, 1, 1], [0, 0, 0, 1], [1, 0, 0, 0]]
+        columns = names
+    else:
+        matrix = [[100, 200, 150], [120, 180, 160], [90, 220, 140], [110, 190, 170]]
+        columns = ["Condition 1", "Condition 2", "Condition 3"]
+    path = tmp_path / f"example_{method}.xlsx"
+    pd.DataFrame(matrix, index=names, columns=columns).to_excel(path)
+
+    result = FileParser().parse_file(str(path), method, len(columns), 4)
+    assert result["success"], result["error"]
+    assert result["alternative_names"] == names
+    assert [[int(value) for value in row] for row in result["matrix"]] == matrix
+
+
+def test_csv_upload(tmp_path):
+    path = tmp_path / "cost.csv"
+    path.write_text(",c1,c2\na1,1,2\na2,3,4\n", encoding="utf-8")
+    result = FileParser().parse_file(str(path), "laplasa", 2, 2)
+    assert result["success"], result["error"]
+    assert result["alternative_names"] == ["a1", "a2"]
+    assert result["condition_names"] == ["c1", "c2"]
+    assert result["matrix"] == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_unsupported_format_is_an_error(tmp_path):
+    path = tmp_path / "matrix.txt"
+    path.write_text("1 2\n3 4\n", encoding="utf-8")
+    result = FileParser().parse_file(str(path), "laplasa")
+    assert not result["success"]
+    assert "Unsupported file format" in result["error"]
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from mymodules import uncertainty
+
+
+@pytest.mark.parametrize("matrix_type", ["profit", "cost"])
+def test_decision_criteria_matches_textbook_definitions(matrix_type):
+    matrix = np.random.default_rng(3).integers(-5, 20, size=(7, 4)).astype(float)
+    result = uncertainty.decision_criteria(matrix, matrix_type, alpha=0.7)
+    best, worst = (max, min) if matrix_type == "profit" else (min, max)
+    pick = np.argmax if matrix_type == "profit" else np.argmin
+
+    laplace = [row.mean() for row in matrix]
+    wald = [worst(row) for row in matrix]
+    hurwitz = [0.7 * best(row) + 0.3 * worst(row) for row in matrix]
+    columns = [best(column) for column in matrix.T]
+    regret = [[abs(c - v) for c, v in zip(columns, row)] for row in matrix]
+    savage = [max(row) for row in regret]
+
+    np.testing.assert_allclose(result["laplace"], laplace)
+    np.testing.assert_allclose(result["wald"], wald)
+    np.testing.assert_allclose(result["hurwitz"], hurwitz)
+    np.testing.assert_allclose(result["regret"], regret)
+    np.testing.assert_allclose(result["savage"], savage)
+    assert result["laplace_best"] == pick(laplace)
+    assert result["wald_best"] == pick(wald)
+    assert result["hurwitz_best"] == pick(hurwitz)
+    assert result["savage_best"] == np.argmin(savage)
+
+
+def test_to_matrix_rejects_ragged_or_empty_input():
+    with pytest.raises(ValueError):
+        uncertainty.to_matrix([])
+    with pytest.raises(ValueError):
+        uncertainty.to_matrix([1, 2, 3])
+
+
+def test_plain_keeps_integers_integral():
+    assert uncertainty.plain([[1.0, 2.0]]) == [[1, 2]]
+    assert uncertainty.plain([1.5, 2.0]) == [1.5, 2.0]
+
+
+@pytest.mark.parametrize("matrix_type", ["profit", "cost"])
+@pytest.mark.parametrize("seed", range(4))
+def test_hurwitz_envelope_matches_alpha_grid(matrix_type, seed):
+    matrix = np.random.default_rng(seed).uniform(0, 10, size=(30, 5))
+    row_min, row_max = matrix.min(axis=1), matrix.max(axis=1)
+    intervals = uncertainty.hurwitz_envelope(row_min, row_max, matrix_type)
+
+    assert intervals[0]["alpha_from"] == 0 and intervals[-1]["alpha_to"] == 1
+    for left, right in zip(intervals, intervals[1:]):
+        assert left["alpha_to"] == right["alpha_from"]
+        assert left["best"] != right["best"]
+    for alpha in np.linspace(0, 1, 201):
+        scores = uncertainty.decision_criteria(matrix, matrix_type, alpha)["hurwitz"]
+        interval = next(
+            item
+            for item in intervals
+            if item["alpha_from"] <= alpha <= item["alpha_to"]
+        )
+        optimum = scores.max() if matrix_type == "profit" else scores.min()
+        assert scores[interval["best"]] == pytest.approx(optimum)
+
+
+def test_hurwitz_envelope_single_dominant_row():
+    intervals = uncertainty.hurwitz_envelope([1, 5, 2], [4, 9, 3])
+    assert intervals == [
+        {
+            "alpha_from": 0.0,
+            "alpha_to": 1.0,
+            "best": 1,
+            "value_from": 5.0,
+            "value_to": 9.0,
+        }
+    ]
+
+
+def brute_force_front(values):
+    keep, dominated = [], set()
+    for i, row in enumerate(values):
+        for other in values:
+            if (other >= row).all() and (other > row).any():
+                dominated.add(i)
+                break
+        else:
+            keep.append(i)
+    return keep, dominated
+
+
+@pytest.mark.parametrize("matrix_type", ["profit", "cost"])
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_front_matches_brute_force(matrix_type, seed):
+    rng = np.random.default_rng(seed)
+    # Малий діапазон значень - багато рівних рядків і часткових домінувань
+    matrix = rng.integers(0, 4, size=(40, 3)).astype(float)
+    keep, dominated_by = uncertainty.pareto_front(matrix, matrix_type)
+
+    values = matrix if matrix_type == "profit" else -matrix
+    expected_keep, expected_dominated = brute_force_front(values)
+    assert keep == expected_keep
+    assert set(dominated_by) == expected_dominated
+    for row, by in dominated_by.items():
+        assert by in keep
+        assert (values[by] >= values[row]).all() and (values[by] > values[row]).any()
+
+
+def test_pruning_keeps_criteria_optima():
+    rng = np.random.default_rng(0)
+    matrix = rng.integers(0, 10, size=(30, 4)).astype(float)
+    keep, _ = uncertainty.pareto_front(matrix)
+    full = uncertainty.decision_criteria(matrix)
+    pruned = uncertainty.decision_criteria(matrix[keep])
+    for name in uncertainty.CRITERIA:
+        best = full[name][full[f"{name}_best"]]
+        assert pruned[name][pruned[f"{name}_best"]] == pytest.approx(best)
+
+
+def test_prune_dominated_reports_removed_rows():
+    matrix = [[1, 2], [3, 4], [2, 2], [3, 1]]
+    rows, names, pruned = uncertainty.prune_dominated(matrix, ["a", "b", "c", "d"])
+    assert names == ["b"]
+    assert rows == [[3, 4]]
+    assert pruned == [
+        {"alternative": name, "dominated_by": "b"} for name in ["a", "c", "d"]
+    ]
+
+
+@pytest.mark.parametrize("matrix_type", ["profit", "cost"])
+def test_pruning_before_savage_keeps_regret_of_kept_rows(matrix_type):
+    # Екстремуми стовпців не змінюються - втрати решти рядків ті самі
+    matrix = np.random.default_rng(1).integers(0, 6, size=(25, 3)).astype(float)
+    keep, _ = uncertainty.pareto_front(matrix, matrix_type)
+    full = uncertainty.decision_criteria(matrix, matrix_type)
+    pruned = uncertainty.decision_criteria(matrix[keep], matrix_type)
+    np.testing.assert_allclose(pruned["regret"], full["regret"][keep])
+
+
+@pytest.mark.parametrize("matrix_type", ["profit", "cost"])
+def test_stream_criteria_matches_decision_criteria(tmp_path, matrix_type):
+    rng = np.random.default_rng(2)
+    matrix = rng.uniform(-5, 20, size=(53, 6)).round(2)
+    names = [f"A{i}" for i in range(len(matrix))]
+    path = tmp_path / "matrix.csv"
+    lines = ["name," + ",".join(f"C{j}" for j in range(matrix.shape[1]))]
+    lines += [
+        ",".join([name] + [str(value) for value in row])
+        for name, row in zip(names, matrix)
+    ]
+    path.write_text("\n".join(lines))
+
+    # chunk_rows не ділить кількість рядків - останній блок неповний
+    result = uncertainty.stream_criteria(
+        path, matrix_type, alpha=0.3, top_k=5, chunk_rows=8, workdir=tmp_path
+    )
+    full = uncertainty.decision_criteria(matrix, matrix_type, alpha=0.3)
+    assert result["alternatives"] == 53 and result["conditions"] == 6
+    assert result["names"] == names
+    for name in uncertainty.CRITERIA:
+        summary = result["criteria"][name]
+        assert summary["best"] == full[f"{name}_best"]
+        assert summary["stats"]["mean"] == pytest.approx(full[name].mean())
+        for i, value in summary["top"]:
+            assert value == pytest.approx(full[name][i])
+    # Тимчасовий memmap видаляється
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["matrix.csv"]